@@ -3,6 +3,10 @@ from flask import Flask
 from config.config import get_config, logger
 from model.models import init_redis  # Redis连接（用于缓存）
 from model.init_db import init_database  # SQLite数据库初始化
+from model.cache_invalidation import init_cache_invalidation
+from model.cache_warmup import init_cache_warmup
+from model.view_counter import init_view_counter
+from model.popularity import init_popularity
 from auth.extensions import init_auth
 
 
@@ -20,6 +24,9 @@ init_redis(app)
 # 初始化SQLite数据库
 init_database(app)
 
+# 数据变更提交后自动失效相关缓存
+init_cache_invalidation()
+
 # 初始化认证工具
 with app.app_context():
     init_auth()
@@ -39,12 +46,33 @@ app.register_blueprint(question_bank_bp)
 app.register_blueprint(mermaid_bp)
 app.register_blueprint(feedback_bp)
 
+# 注册命令行命令
+from commands import register_commands
+
+register_commands(app)
+
+# 浏览量先累计在 Redis，定时批量写入数据库
+init_view_counter(app)
+
+
+def start_background_jobs():
+    """
+    启动定时任务：缓存预热（启动时一次，之后定时）和每小时的热度汇总
+    只在提供服务的进程中调用（gunicorn 的 post_fork 钩子或直接运行本文件），
+    flask 命令行的维护命令导入 app 时不会启动
+    """
+    init_cache_warmup(app)
+    init_popularity(app)
+
 
 if __name__ == "__main__":
     # 生产环境安全设置
     if os.environ.get("FLASK_ENV") == "production":
         app.config.update(DEBUG=False)
     logger.info("启动应用...")
+    # 调试模式的重载器中只在实际提供服务的子进程启动
+    if not app.config["DEBUG"] or os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        start_background_jobs()
     app.run(
         host=app.config.get("FLASK_HOST", "0.0.0.0"),
         port=int(app.config.get("FLASK_PORT", 5000)),
@@ -0,0 +1,77 @@
+"""
+Flask 命令行命令
+用法: flask --app app <command>
+"""
+import click
+from flask import current_app
+
+from render.bulk import BulkRenderJob, get_checkpoint
+from model.cache_warmup import warm_up
+from model.view_counter import flush_views
+
+
+def register_commands(app):
+    """注册命令行命令"""
+    app.cli.add_command(backfill_articles)
+    app.cli.add_command(rerender_articles)
+    app.cli.add_command(warm_cache)
+    app.cli.add_command(flush_views_command)
+
+
+def _echo_progress(progress):
+    click.echo(
+        f"[{progress['processed']}/{progress['total']}] 最后文章 {progress['last_id']}, "
+        f"已渲染 {progress['rendered']} 篇, {progress['articles_per_second']} 篇/秒"
+    )
+
+
+def _run_job(job):
+    result = job.run(progress=_echo_progress)
+    click.echo(
+        f"{result['status']}: 渲染 {result['rendered']} 篇, 用时 {result['elapsed_seconds']} 秒, "
+        f"{result['articles_per_second']} 篇/秒"
+    )
+    if result["status"] != "completed":
+        click.echo(f"错误: {result['error']}，可用 --resume 从文章 {result['last_id']} 之后继续")
+        raise SystemExit(1)
+
+
+@click.command("backfill-articles")
+@click.option("--force", is_flag=True, help="重新渲染所有文章，而不仅是缺失或过期的")
+@click.option("--batch-size", default=50, show_default=True, help="每批提交的文章数")
+def backfill_articles(force, batch_size):
+    """为已有文章生成 html_content / headings / content_hash 等渲染列"""
+    _run_job(BulkRenderJob(workers=1, batch_size=batch_size, force=force))
+
+
+@click.command("rerender-articles")
+@click.option("--workers", type=int, default=None, help="渲染进程数，默认 CPU 核数 - 1")
+@click.option("--batch-size", default=50, show_default=True, help="每批提交的文章数")
+@click.option("--start-after", type=int, default=0, help="从该文章 id 之后开始")
+@click.option("--resume", is_flag=True, help="从上次中断的位置继续")
+def rerender_articles(workers, batch_size, start_after, resume):
+    """修改 Markdown 扩展或高亮样式后，并行重新渲染所有文章"""
+    if resume:
+        start_after = get_checkpoint()
+        click.echo(f"从文章 {start_after} 之后继续")
+    _run_job(BulkRenderJob(workers=workers, batch_size=batch_size, start_after=start_after, force=True))
+
+
+@click.command("warm-cache")
+def warm_cache():
+    """从数据库预热缓存（分类树、热门文章详情、文章列表第一页），部署后可手动执行"""
+    report = warm_up(current_app._get_current_object(), trigger="manual")
+    if "keys_warmed" not in report:
+        click.echo(report["message"])
+        raise SystemExit(1)
+    click.echo(
+        f"写入 {report['keys_warmed']} 个键，{report['already_cached']} 个已在缓存中，"
+        f"失败 {len(report['failed'])} 项，用时 {report['duration_seconds']} 秒"
+    )
+
+
+@click.command("flush-views")
+def flush_views_command():
+    """立即把累计的浏览量写入数据库（停机维护前可手动执行）"""
+    result = flush_views()
+    click.echo(f"写入 {result['articles']} 篇文章的浏览量，共 {result['views']} 次")
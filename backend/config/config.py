@@ -18,6 +18,55 @@ class Config:
     REDIS_DB = os.environ.get("REDIS_DB") or 0
     REDIS_PASSWORD = os.environ.get("REDIS_PASSWORD") or None
     REDIS_TIMEOUT = 3600  # 连接超时时间（秒）
+    # 每个进程一个共享连接池：连接数上限、连接用尽时的等待时间、读写/建连超时（秒）、空闲连接健康检查间隔（秒）
+    REDIS_MAX_CONNECTIONS = int(os.environ.get("REDIS_MAX_CONNECTIONS", 50))
+    REDIS_POOL_TIMEOUT = float(os.environ.get("REDIS_POOL_TIMEOUT", 5))
+    REDIS_SOCKET_TIMEOUT = float(os.environ.get("REDIS_SOCKET_TIMEOUT", 5))
+    REDIS_SOCKET_CONNECT_TIMEOUT = float(os.environ.get("REDIS_SOCKET_CONNECT_TIMEOUT", 5))
+    REDIS_HEALTH_CHECK_INTERVAL = int(os.environ.get("REDIS_HEALTH_CHECK_INTERVAL", 30))
+    REDIS_SOCKET_KEEPALIVE = os.environ.get("REDIS_SOCKET_KEEPALIVE", "true").lower() in ("true", "1")
+    # 与 Redis 同机部署时可改走 unix socket（填写 socket 路径，此时忽略 REDIS_HOST/REDIS_PORT）
+    REDIS_UNIX_SOCKET = os.environ.get("REDIS_UNIX_SOCKET") or None
+
+    # 进程内一级缓存（BlogCache 在 Redis 前的 LRU），TTL 为 0 时关闭
+    LOCAL_CACHE_TTL = int(os.environ.get("LOCAL_CACHE_TTL", 60))
+    LOCAL_CACHE_MAX_ENTRIES = int(os.environ.get("LOCAL_CACHE_MAX_ENTRIES", 2048))
+    LOCAL_CACHE_MAX_BYTES = int(os.environ.get("LOCAL_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+
+    # Redis 不可用时的内存缓存（仅当前 worker 可见，TTL 上限较短）
+    MEMORY_CACHE_MAX_ENTRIES = int(os.environ.get("MEMORY_CACHE_MAX_ENTRIES", 10000))
+    MEMORY_CACHE_MAX_BYTES = int(os.environ.get("MEMORY_CACHE_MAX_BYTES", 128 * 1024 * 1024))
+    MEMORY_CACHE_MAX_TTL = int(os.environ.get("MEMORY_CACHE_MAX_TTL", 300))
+    # 降级期间逐个记录的改动上限，超出时 Redis 恢复后所有命名空间整体失效
+    MEMORY_CACHE_MAX_DIRTY = int(os.environ.get("MEMORY_CACHE_MAX_DIRTY", 10000))
+    REDIS_RECONNECT_INTERVAL = int(os.environ.get("REDIS_RECONNECT_INTERVAL", 5))  # 重连间隔（秒）
+    # 缓存重建锁：持有上限（毫秒）、拿不到锁时最多等待（秒）、旧值副本保留时间（秒）
+    CACHE_LOCK_TTL_MS = int(os.environ.get("CACHE_LOCK_TTL_MS", 10000))
+    CACHE_LOCK_WAIT = float(os.environ.get("CACHE_LOCK_WAIT", 2.0))
+    CACHE_STALE_TTL = int(os.environ.get("CACHE_STALE_TTL", 86400))
+    # 过期前刷新：条目在 TTL（软过期）后仍保留 TTL × 该倍数（硬过期），期间由后台线程刷新
+    CACHE_HARD_TTL_FACTOR = float(os.environ.get("CACHE_HARD_TTL_FACTOR", 2.0))
+    CACHE_REFRESH_WORKERS = int(os.environ.get("CACHE_REFRESH_WORKERS", 2))
+    # 缓存值编码：json / orjson / msgpack（未安装时退回 json），超过阈值（字节）的数据 zlib 压缩，0 为不压缩
+    CACHE_CODEC = os.environ.get("CACHE_CODEC", "orjson")
+    CACHE_COMPRESS_THRESHOLD = int(os.environ.get("CACHE_COMPRESS_THRESHOLD", 4096))
+    CACHE_COMPRESS_LEVEL = int(os.environ.get("CACHE_COMPRESS_LEVEL", 6))
+    # 响应缓存：保存接口编码好的 JSON 字节，超过 GZIP_MIN_SIZE 字节预先 gzip（0 为不压缩），TTL 上限（秒）
+    RESPONSE_CACHE_ENABLED = os.environ.get("RESPONSE_CACHE_ENABLED", "true").lower() in ("true", "1")
+    RESPONSE_CACHE_GZIP_MIN_SIZE = int(os.environ.get("RESPONSE_CACHE_GZIP_MIN_SIZE", 1024))
+    RESPONSE_CACHE_GZIP_LEVEL = int(os.environ.get("RESPONSE_CACHE_GZIP_LEVEL", 6))
+    RESPONSE_CACHE_MAX_TTL = int(os.environ.get("RESPONSE_CACHE_MAX_TTL", 600))
+    # 各命名空间命中/耗时计数写入 Redis 汇总的间隔（秒）
+    CACHE_METRICS_FLUSH_INTERVAL = float(os.environ.get("CACHE_METRICS_FLUSH_INTERVAL", 10))
+    # 缓存预热：启动时执行一次，之后每隔 CACHE_WARMUP_INTERVAL 秒执行（0 为只在启动时执行）；
+    # 预热浏览量最高的 N 篇文章，并发线程数，多 worker 互斥锁的持有上限（秒）
+    CACHE_WARMUP_ENABLED = os.environ.get("CACHE_WARMUP_ENABLED", "true").lower() in ("true", "1")
+    CACHE_WARMUP_INTERVAL = int(os.environ.get("CACHE_WARMUP_INTERVAL", 1800))
+    CACHE_WARMUP_TOP_ARTICLES = int(os.environ.get("CACHE_WARMUP_TOP_ARTICLES", 50))
+    CACHE_WARMUP_WORKERS = int(os.environ.get("CACHE_WARMUP_WORKERS", 4))
+    CACHE_WARMUP_LOCK_TTL = int(os.environ.get("CACHE_WARMUP_LOCK_TTL", 300))
+    # 浏览量先累计在 Redis（不可用时在进程内），每隔 VIEW_COUNT_FLUSH_INTERVAL 秒批量写入数据库
+    VIEW_COUNT_FLUSH_INTERVAL = float(os.environ.get("VIEW_COUNT_FLUSH_INTERVAL", 30))
 
     # 微信小程序配置
     WECHAT_APP_ID = os.environ.get("WECHAT_APP_ID") or "test_app_id"
@@ -37,19 +86,40 @@ class Config:
     LOG_MAX_BYTES = 1024 * 1024 * 10  # 1MB
     LOG_BACKUP_COUNT = 10
     
-    # 博客分类标签配置
-    BLOG_FEATURED_CATEGORIES = os.environ.get("BLOG_FEATURED_CATEGORIES", "Java面试知识大全,Spring").split(",")  # 精选分类
-    BLOG_TRENDING_CATEGORIES = os.environ.get("BLOG_TRENDING_CATEGORIES", "Java面试知识大全,Spring,实用工具技巧").split(",")  # 热门分类
+    # 博客分类标签配置：长期热度最高的 N 个一级分类标记为精选，近期热度最高的 N 个标记为热门
+    BLOG_FEATURED_COUNT = int(os.environ.get("BLOG_FEATURED_COUNT", 2))
+    BLOG_TRENDING_COUNT = int(os.environ.get("BLOG_TRENDING_COUNT", 3))
     BLOG_LATEST_COUNT = int(os.environ.get("BLOG_LATEST_COUNT", 1))  # 最新分类显示数量（默认1个）
+    # 热度衰减的半衰期（小时）：长期热度（精选、/blog/popular）和近期热度（热门、/blog/trending）
+    POPULARITY_HALF_LIFE_HOURS = float(os.environ.get("POPULARITY_HALF_LIFE_HOURS", 72))
+    TRENDING_HALF_LIFE_HOURS = float(os.environ.get("TRENDING_HALF_LIFE_HOURS", 6))
+    # 每小时阅读数的保留时长（小时）、排行接口的缓存时间（秒）
+    POPULARITY_ROLLUP_HOURS = int(os.environ.get("POPULARITY_ROLLUP_HOURS", 168))
+    POPULARITY_CACHE_TTL = int(os.environ.get("POPULARITY_CACHE_TTL", 60))
 
     # 图片输出配置已移除（mdpng功能已删除）
 
+    # Mermaid 渲染缓存配置
+    MERMAID_CACHE_DIR = os.environ.get("MERMAID_CACHE_DIR")  # 为空时使用 data/mermaid_cache
+    MERMAID_CACHE_MAX_BYTES = int(os.environ.get("MERMAID_CACHE_MAX_BYTES", 200 * 1024 * 1024))
+
+    # Mermaid 常驻渲染进程池配置
+    MERMAID_RENDERER_COMMAND = os.environ.get("MERMAID_RENDERER_COMMAND")  # 为空时使用 node render/mermaid_worker.mjs
+    MERMAID_POOL_SIZE = int(os.environ.get("MERMAID_POOL_SIZE", 2))  # 每个 gunicorn worker 的渲染进程数
+    MERMAID_QUEUE_SIZE = int(os.environ.get("MERMAID_QUEUE_SIZE", 8))  # 等待队列长度，满了返回 503
+    MERMAID_RENDER_TIMEOUT = float(os.environ.get("MERMAID_RENDER_TIMEOUT", 10))  # 单张图超时（秒）
+    MERMAID_HEALTH_INTERVAL = float(os.environ.get("MERMAID_HEALTH_INTERVAL", 30))  # 健康检查间隔（秒）
+    MERMAID_PRERENDER_ON_SAVE = os.environ.get("MERMAID_PRERENDER_ON_SAVE", "false").lower() in ("true", "1")  # 后台保存文章时预渲染图表
+
     MINIO_ENDPOINT = os.getenv("MINIO_ENDPOINT")
     MINIO_ACCESS_KEY = os.getenv("MINIO_ACCESS_KEY")
     MINIO_SECRET_KEY = os.getenv("MINIO_SECRET_KEY")
     MINIO_BUCKET_NAME = os.getenv("MINIO_BUCKET_NAME")
     MINIO_SECURE = os.environ.get("MINIO_SECURE", "true").lower() in ("true", "1")
     CDN_DOMAIN = os.getenv("CDN_DOMAIN")
+    # 分类、文章详情等读接口的 Cache-Control：浏览器缓存秒数（0 为每次用 ETag 校验），配置 CDN_DOMAIN 时 CDN 缓存秒数
+    HTTP_CACHE_MAX_AGE = int(os.environ.get("HTTP_CACHE_MAX_AGE", 0))
+    HTTP_CACHE_S_MAXAGE = int(os.environ.get("HTTP_CACHE_S_MAXAGE", 300))
 
     @staticmethod
     def init_app(app):
@@ -3,16 +3,63 @@
 提供Redis缓存功能来优化博客性能
 """
 
-import redis
+import os
 import json
+import socket
 import hashlib
 import logging
-from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional
-from flask import current_app
+import threading
+import re
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Any, Optional, Tuple, Union
+from flask import current_app, has_request_context, copy_current_request_context
+
+from model import cache_keys
+from model.local_cache import LocalCache
+from model.cache_codec import CacheSerializer
+from model.cache_metrics import CacheMetrics
+from model.redis_pool import get_redis, pool_stats
+from model.cache_backends import CacheBackend, RedisBackend, MemoryBackend, CONNECTION_ERRORS, LOCK_PREFIX
 
 logger = logging.getLogger("rss_app")
 
+# 一级缓存失效通知的频道（所有 worker、所有节点共享）
+INVALIDATION_CHANNEL = "blog:cache:invalidate"
+
+# 命名空间代数计数器的键前缀：blog:gen:{命名空间}
+GENERATION_PREFIX = "blog:gen:"
+# 缓存命名空间；键中带有命名空间当前的代数，代数加 1 即整体失效，旧条目随 TTL 过期
+NAMESPACES = ("categories", "articles", "article", "article_html", "question_bank")
+# 一级缓存中代数的有效期（秒），代数变化时另有失效通知
+GENERATION_LOCAL_TTL = 30
+
+# 旧值副本的键前缀：blog:stale:{去掉代数的缓存键}，重建期间拿不到锁的请求读它
+STALE_PREFIX = "blog:stale:"
+# 等待其他 worker 重建时轮询缓存的间隔（秒）
+LOCK_POLL_INTERVAL = 0.05
+
+# get_or_compute_state 返回的数据状态：当前有效的缓存值、刚重建的值、旧值（重建期间的旧值副本或已软过期的条目）
+STATE_HIT = "hit"
+STATE_COMPUTED = "computed"
+STATE_STALE = "stale"
+
+# 带软过期时间的条目存为 {SOFT_EXPIRES_FIELD: 时间戳, "value": 数据}，get 时自动解包
+SOFT_EXPIRES_FIELD = "_soft_expires_at"
+# 最近若干次后台刷新耗时，用于统计
+REFRESH_LATENCY_WINDOW = 256
+
+
+class _Flight:
+    """进程内正在进行的一次重建，同一进程内的其他线程等待它的结果"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.state = STATE_HIT
+        self.error: Optional[BaseException] = None
+
 
 class BlogCache:
     """博客缓存管理器"""
@@ -22,28 +69,76 @@ class BlogCache:
         初始化缓存管理器
 
         Args:
-            redis_client: Redis客户端实例，如果为None则创建新实例
+            redis_client: Redis客户端实例，如果为None则使用进程共享的连接池（model.redis_pool）
         """
-        if redis_client:
-            self.redis_client = redis_client
-        else:
-            # 尝试连接Redis，如果失败则使用空实现
-            try:
-                self.redis_client = redis.Redis(
-                    host=current_app.config.get("REDIS_HOST", "localhost"),
-                    port=current_app.config.get("REDIS_PORT", 6379),
-                    db=current_app.config.get("REDIS_DB", 0),
-                    password=current_app.config.get("REDIS_PASSWORD", None),
-                    decode_responses=True,
-                    socket_timeout=5,
-                    socket_connect_timeout=5,
-                )
-                # 测试连接
-                self.redis_client.ping()
-                logger.info("Redis连接成功")
-            except Exception as e:
-                logger.warning(f"Redis连接失败，使用内存缓存: {e}")
-                self.redis_client = None
+        # 使用共享连接池时，fork 后的 worker 换成本进程的连接池
+        self._shared_pool = redis_client is None
+        if redis_client is None:
+            redis_client = get_redis()
+        self._redis = redis_client
+
+        # Redis 不可用时使用的进程内后端
+        self.memory = MemoryBackend(
+            max_entries=int(current_app.config.get("MEMORY_CACHE_MAX_ENTRIES", 10000)),
+            max_bytes=int(current_app.config.get("MEMORY_CACHE_MAX_BYTES", 128 * 1024 * 1024)),
+            max_ttl=int(current_app.config.get("MEMORY_CACHE_MAX_TTL", 300)),
+            max_dirty=int(current_app.config.get("MEMORY_CACHE_MAX_DIRTY", 10000)),
+        )
+        self.reconnect_interval = int(current_app.config.get("REDIS_RECONNECT_INTERVAL", 5))
+        self.backend: CacheBackend = self.memory
+        try:
+            # 测试连接
+            self._redis.ping()
+            self.backend = RedisBackend(self._redis)
+            logger.info("Redis连接成功")
+        except Exception as e:
+            logger.warning(f"Redis连接失败，使用内存缓存: {e}")
+
+        # 一级缓存：每个 worker 进程内的 LRU，只在 Redis 后端前使用，TTL 为 0 时关闭
+        local_ttl = int(current_app.config.get("LOCAL_CACHE_TTL", 60))
+        self.local = LocalCache(
+            max_entries=int(current_app.config.get("LOCAL_CACHE_MAX_ENTRIES", 2048)),
+            max_bytes=int(current_app.config.get("LOCAL_CACHE_MAX_BYTES", 64 * 1024 * 1024)),
+            default_ttl=local_ttl,
+        ) if local_ttl > 0 else None
+        self.backend_hits = 0
+        self.backend_misses = 0
+
+        # 按命名空间的命中/耗时计数，后台线程定期写入 Redis 汇总
+        self.metrics = CacheMetrics()
+        self.metrics_flush_interval = float(current_app.config.get("CACHE_METRICS_FLUSH_INTERVAL", 10))
+
+        # 缓存值的编码：结构格式 + 超过阈值时 zlib 压缩
+        self.serializer = CacheSerializer(
+            codec=current_app.config.get("CACHE_CODEC", "orjson"),
+            compress_threshold=int(current_app.config.get("CACHE_COMPRESS_THRESHOLD", 4096)),
+            compress_level=int(current_app.config.get("CACHE_COMPRESS_LEVEL", 6)),
+        )
+
+        # 缓存未命中时的重建：Redis 锁保证所有 worker 中只有一个在算，进程内的线程合并到同一次计算
+        self.lock_ttl_ms = int(current_app.config.get("CACHE_LOCK_TTL_MS", 10000))
+        self.lock_wait = float(current_app.config.get("CACHE_LOCK_WAIT", 2.0))
+        self.stale_ttl = int(current_app.config.get("CACHE_STALE_TTL", 86400))
+        self._flights: Dict[str, _Flight] = {}
+        self._flights_lock = threading.Lock()
+        self.compute_stats = {"computed": 0, "coalesced": 0, "waited": 0, "stale": 0, "fenced_out": 0}
+
+        # 过期前刷新（stale-while-revalidate）：超过软过期时间仍直接返回旧值，同时交给后台线程刷新；
+        # 硬过期时间（Redis TTL）= 软过期时间 × hard_ttl_factor，只有超过硬过期才会阻塞请求
+        self.hard_ttl_factor = float(current_app.config.get("CACHE_HARD_TTL_FACTOR", 2.0))
+        self.refresh_workers = int(current_app.config.get("CACHE_REFRESH_WORKERS", 2))
+        self._refresh_pool = None
+        self._refresh_pid = None
+        self._refreshing: set = set()
+        self._refresh_lock = threading.Lock()
+        self._refresh_latencies = deque(maxlen=REFRESH_LATENCY_WINDOW)
+        self.refresh_stats = {"queued": 0, "refreshed": 0, "skipped": 0, "failed": 0}
+
+        self._background_pid = None
+        self._instance_id = None
+        self._background_lock = threading.Lock()
+        self._switch_lock = threading.Lock()
+        self._reconnect_thread = None
 
         # 缓存键前缀
         self.prefix = "blog:"
@@ -58,47 +153,346 @@ class BlogCache:
             "articles_summary": 1800,  # 文章摘要缓存30分钟
         }
 
-    def _get_cache_key(self, category: str, *args) -> str:
+    @property
+    def redis_client(self):
+        """当前使用的 Redis 客户端；降级为内存缓存时为 None"""
+        return self._redis if self.backend is not self.memory else None
+
+    @property
+    def _use_local(self) -> bool:
+        return self.local is not None and self.backend is not self.memory
+
+    @staticmethod
+    def _key_part(part: Any) -> str:
+        """键中的一段：过长或含空白的参数（如搜索词）取哈希"""
+        text = str(part)
+        if len(text) > 64 or any(ch.isspace() for ch in text):
+            return hashlib.md5(text.encode()).hexdigest()[:12]
+        return text
+
+    def generations(self, *namespaces: str) -> List[int]:
+        """读取命名空间的当前代数（一级缓存中保留 GENERATION_LOCAL_TTL 秒，变化时收到失效通知）"""
+        self._ensure_background()
+        gen_keys = [f"{GENERATION_PREFIX}{namespace}" for namespace in namespaces]
+        values = [self.local.get(key) if self._use_local else None for key in gen_keys]
+        missing = [key for key, value in zip(gen_keys, values) if value is None]
+        if missing:
+            try:
+                fetched = self.backend.get_counters(missing)
+            except CONNECTION_ERRORS as e:
+                self._fallback(e)
+                fetched = self.memory.get_counters(missing)
+            except Exception as e:
+                logger.error(f"读取缓存代数失败 {missing}: {e}")
+                fetched = [0] * len(missing)
+            fetched = dict(zip(missing, fetched))
+            if self._use_local:
+                for key, value in fetched.items():
+                    self.local.set(key, value, 8, GENERATION_LOCAL_TTL)
+            values = [fetched.get(key, value) for key, value in zip(gen_keys, values)]
+        return values
+
+    def key(self, namespace: str, *parts: Any) -> str:
         """
-        生成缓存键
+        生成带命名空间代数的缓存键：blog:{命名空间}:v{代数}[:参数...]
 
         Args:
-            category: 缓存类别
-            *args: 附加参数，用于生成唯一键
+            namespace: 命名空间（见 NAMESPACES）
+            *parts: 附加参数
 
         Returns:
             str: 缓存键
         """
-        if args:
-            # 创建参数的哈希值以确保键的唯一性
-            params_str = ":".join(str(arg) for arg in args)
-            hash_str = hashlib.md5(params_str.encode()).hexdigest()[:8]
-            return f"{self.prefix}{category}:{hash_str}"
-        return f"{self.prefix}{category}"
+        generation = self.generations(namespace)[0]
+        key = f"{self.prefix}{namespace}:v{generation}"
+        if parts:
+            key += ":" + ":".join(self._key_part(part) for part in parts)
+        return key
+
+    def bump_namespaces(self, *namespaces: str) -> Dict[str, int]:
+        """
+        命名空间代数加 1，使其中所有缓存一次性失效（O(1)，不逐个删除键）
+
+        Returns:
+            Dict: {命名空间: 新代数}
+        """
+        if not namespaces:
+            return {}
+        self._ensure_background()
+        gen_keys = [f"{GENERATION_PREFIX}{namespace}" for namespace in namespaces]
+        try:
+            values = self.backend.incr_counters(gen_keys)
+        except CONNECTION_ERRORS as e:
+            self._fallback(e)
+            values = self.memory.incr_counters(gen_keys)
+        except Exception as e:
+            logger.error(f"递增缓存代数失败 {namespaces}: {e}")
+            return {}
+        if self._use_local:
+            for key in gen_keys:
+                self.local.delete(key)
+            self._publish_invalidation(keys=gen_keys)
+        return dict(zip(namespaces, values))
+
+    def _ensure_background(self):
+        """在当前进程中启动后台线程（gunicorn fork 后每个 worker 各自启动）"""
+        if self._background_pid == os.getpid():
+            return
+        with self._background_lock:
+            if self._background_pid == os.getpid():
+                return
+            self._background_pid = os.getpid()
+            self._instance_id = f"{socket.gethostname()}:{os.getpid()}:{id(self)}"
+            if self._shared_pool:
+                self._rebind_redis()
+            if self.local is not None:
+                # fork 前写入的一级缓存收不到失效通知，丢弃
+                self.local.clear()
+                threading.Thread(target=self._listen_invalidations, name="cache-invalidation", daemon=True).start()
+            # fork 前累加的计数属于父进程
+            self.metrics = CacheMetrics()
+            threading.Thread(target=self._flush_metrics_loop, name="cache-metrics", daemon=True).start()
+            if self.backend is self.memory:
+                self._start_reconnect()
+
+    def _rebind_redis(self):
+        """改用当前进程的共享连接池（不沿用 fork 前父进程创建的连接）"""
+        with self._switch_lock:
+            self._redis = get_redis()
+            if self.backend is not self.memory:
+                self.backend = RedisBackend(self._redis)
+
+    def _fallback(self, error: Exception):
+        """Redis 连接异常：切换到内存后端并在后台重连"""
+        with self._switch_lock:
+            if self.backend is self.memory:
+                return
+            self.backend = self.memory
+            if self.local is not None:
+                self.local.clear()
+            logger.warning(f"Redis连接中断，切换到内存缓存: {error}")
+            self._start_reconnect()
+
+    def _start_reconnect(self):
+        if self._reconnect_thread and self._reconnect_thread.is_alive():
+            return
+        self._reconnect_thread = threading.Thread(target=self._reconnect_loop, name="redis-reconnect", daemon=True)
+        self._reconnect_thread.start()
+
+    def _reconnect_loop(self):
+        """定期尝试重连 Redis，恢复后清理降级期间改动过的键再切换回 Redis 后端"""
+        while self.backend is self.memory:
+            time.sleep(self.reconnect_interval)
+            try:
+                self._redis.ping()
+            except Exception as e:
+                logger.debug(f"Redis重连失败: {e}")
+                continue
+            backend = RedisBackend(self._redis)
+            if not self._clean_dirty(backend):
+                continue
+            with self._switch_lock:
+                self.memory.clear()
+                self.backend = backend
+            # 清理期间到切换之前仍写入内存后端的改动，切换后再清理一次
+            if not self._clean_dirty(backend):
+                with self._switch_lock:
+                    self.backend = self.memory
+                    if self.local is not None:
+                        self.local.clear()
+                continue
+            logger.info("Redis已恢复，切换回Redis缓存")
+            return
+
+    def _clean_dirty(self, backend: RedisBackend) -> bool:
+        """在 Redis 中删除降级期间改动过的键（可能是旧值）并递增失效过的代数；失败时放回记录，返回是否成功"""
+        dirty = self.memory.take_dirty()
+        keys, patterns, tags, counters, overflowed = dirty
+        try:
+            if overflowed:
+                # 改动太多未逐个记录：所有命名空间整体失效
+                counters = sorted(set(counters) | {f"{GENERATION_PREFIX}{namespace}" for namespace in NAMESPACES})
+            else:
+                backend.delete_many(keys)
+                for pattern in patterns:
+                    backend.delete_pattern(pattern)
+                backend.delete_tags(tags)
+            if counters:
+                backend.incr_counters(counters)
+        except Exception as e:
+            self.memory.restore_dirty(dirty)
+            logger.debug(f"清理降级期间的缓存失败: {e}")
+            return False
+        if overflowed:
+            logger.info("降级期间的改动超出记录上限，所有缓存命名空间整体失效")
+        elif keys or patterns or tags:
+            logger.info(f"清理降级期间的 {len(keys)} 个键、{len(patterns)} 个模式、{len(tags)} 个标签")
+        return True
+
+    def _flush_metrics_loop(self):
+        """定期把本进程的计数写入 Redis；Redis 不可用时继续在进程内累加"""
+        while True:
+            time.sleep(self.metrics_flush_interval)
+            self._flush_metrics()
+
+    def _flush_metrics(self) -> bool:
+        if self.redis_client is None:
+            return False
+        try:
+            self.metrics.flush(self._redis)
+            return True
+        except Exception as e:
+            logger.debug(f"写入缓存指标失败: {e}")
+            return False
+
+    def _listen_invalidations(self):
+        """订阅失效通知，删除一级缓存中对应的键；断线后重连"""
+        while True:
+            if self.redis_client is None:
+                time.sleep(self.reconnect_interval)
+                continue
+            pubsub = None
+            try:
+                pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(INVALIDATION_CHANNEL)
+                # 断线期间可能错过通知，重新订阅后清空一级缓存
+                self.local.clear()
+                while self.redis_client is not None:
+                    message = pubsub.get_message(timeout=1.0)
+                    if message and message.get("type") == "message":
+                        self._apply_invalidation(message["data"])
+            except Exception as e:
+                logger.warning(f"缓存失效通知订阅中断，稍后重连: {e}")
+                self.local.clear()
+                time.sleep(1)
+            finally:
+                if pubsub is not None:
+                    try:
+                        pubsub.close()
+                    except Exception:
+                        pass
+
+    def _apply_invalidation(self, data: str):
+        try:
+            message = json.loads(data)
+        except ValueError:
+            return
+        if message.get("origin") == self._instance_id:
+            return
+        for key in message.get("keys", []):
+            self.local.delete(key)
+        if message.get("pattern"):
+            self.local.delete_pattern(message["pattern"])
+
+    def _publish_invalidation(self, keys: Optional[List[str]] = None, pattern: Optional[str] = None):
+        """通知其他 worker / 节点删除一级缓存中的键"""
+        if not self._use_local:
+            return
+        message = {"origin": self._instance_id}
+        if keys:
+            message["keys"] = keys
+        if pattern:
+            message["pattern"] = pattern
+        try:
+            self._redis.publish(INVALIDATION_CHANNEL, json.dumps(message, ensure_ascii=False))
+        except Exception as e:
+            logger.error(f"发布缓存失效通知失败: {e}")
 
     def get(self, key: str) -> Optional[Any]:
         """
-        从缓存获取数据
+        从缓存获取数据：先查进程内一级缓存，再查缓存后端
 
         Args:
             key: 缓存键
 
         Returns:
-            Any: 缓存的数据，如果不存在或Redis不可用则返回None
+            Any: 缓存的数据，如果不存在则返回None
         """
-        if not self.redis_client:
-            return None
-
+        return self._get_entry(key)[0]
+
+    def _get_entry(self, key: str) -> Tuple[Optional[Any], Optional[float]]:
+        """读取缓存，返回 (数据, 软过期时间戳)；没有软过期时间的条目为 (数据, None)"""
+        self._ensure_background()
+        start = time.perf_counter()
+        use_local = self._use_local
+        value = None
+        if use_local:
+            value = self.local.get(key)
+            if value is not None:
+                self.metrics.record_get(key, True, time.perf_counter() - start, local=True)
+
+        if value is None:
+            try:
+                data = self.backend.get(key)
+                if data:
+                    self.backend_hits += 1
+                    value = self.serializer.loads(data)
+                    if use_local:
+                        self.local.set(key, value, len(data))
+                    self.metrics.record_get(key, True, time.perf_counter() - start, len(data))
+                else:
+                    self.backend_misses += 1
+                    self.metrics.record_get(key, False, time.perf_counter() - start)
+            except CONNECTION_ERRORS as e:
+                self.metrics.record_error(key)
+                self._fallback(e)
+            except Exception as e:
+                self.metrics.record_error(key)
+                logger.error(f"缓存读取失败 {key}: {e}")
+
+        if isinstance(value, dict) and SOFT_EXPIRES_FIELD in value:
+            return value["value"], value[SOFT_EXPIRES_FIELD]
+        return value, None
+
+    def get_raw(self, key: str) -> Optional[bytes]:
+        """读取 set_raw 写入的原始字节（不反序列化）"""
+        self._ensure_background()
+        start = time.perf_counter()
+        use_local = self._use_local
+        if use_local:
+            data = self.local.get(key)
+            if data is not None:
+                self.metrics.record_get(key, True, time.perf_counter() - start, local=True)
+                return data
         try:
-            data = self.redis_client.get(key)
-            if data:
-                return json.loads(data)
+            data = self.backend.get(key)
+        except CONNECTION_ERRORS as e:
+            self.metrics.record_error(key)
+            self._fallback(e)
+            return None
         except Exception as e:
+            self.metrics.record_error(key)
             logger.error(f"缓存读取失败 {key}: {e}")
+            return None
+        if not data:
+            self.metrics.record_get(key, False, time.perf_counter() - start)
+            return None
+        if use_local:
+            self.local.set(key, data, len(data))
+        self.metrics.record_get(key, True, time.perf_counter() - start, len(data))
+        return data
+
+    def set_raw(self, key: str, data: bytes, ttl: Optional[int] = None, tags: Optional[List[str]] = None) -> bool:
+        """写入原始字节（如已编码好的响应体），不经过序列化"""
+        self._ensure_background()
+        self.metrics.record_write(key, len(data))
+        try:
+            try:
+                result = self.backend.set(key, data, ttl, tags)
+            except CONNECTION_ERRORS as e:
+                self._fallback(e)
+                return self.memory.set(key, data, ttl, tags)
+            if self._use_local:
+                self.local.set(key, data, len(data), ttl)
+                self._publish_invalidation(keys=[key])
+            return result
+        except Exception as e:
+            self.metrics.record_error(key)
+            logger.error(f"缓存写入失败 {key}: {e}")
+            return False
 
-        return None
-
-    def set(self, key: str, value: Any, ttl: Optional[int] = None) -> bool:
+    def set(self, key: str, value: Any, ttl: Optional[int] = None, tags: Optional[List[str]] = None,
+            fence: Optional[tuple] = None, soft_ttl: Optional[int] = None) -> bool:
         """
         设置缓存数据
 
@@ -106,20 +500,36 @@ class BlogCache:
             key: 缓存键
             value: 要缓存的数据
             ttl: 过期时间（秒），如果为None则使用默认时间
+            tags: 失效标签（如 "article:12"、"category:3"、"lists"），invalidate_tags 按标签批量删除
+            fence: (锁键, 令牌)，给出时只有锁仍由该令牌持有才写入
+            soft_ttl: 软过期时间（秒），给出时 get_or_compute 超过它后在后台刷新
 
         Returns:
             bool: 是否设置成功
         """
-        if not self.redis_client:
-            return False
-
+        self._ensure_background()
         try:
-            data = json.dumps(value, ensure_ascii=False, default=str)
-            if ttl:
-                return self.redis_client.setex(key, ttl, data)
-            else:
-                return self.redis_client.set(key, data)
+            if soft_ttl:
+                value = {SOFT_EXPIRES_FIELD: time.time() + soft_ttl, "value": value}
+            data = self.serializer.dumps(value)
+            self.metrics.record_write(key, len(data))
+            try:
+                if fence:
+                    result = self.backend.set_fenced(fence[0], fence[1], key, data, ttl, tags)
+                    if not result:
+                        return False
+                else:
+                    result = self.backend.set(key, data, ttl, tags)
+            except CONNECTION_ERRORS as e:
+                self._fallback(e)
+                return self.memory.set(key, data, ttl, tags)
+            if self._use_local:
+                # 存反序列化后的副本，与从 Redis 读到的值一致（如 datetime 已转为字符串）
+                self.local.set(key, self.serializer.loads(data), len(data), ttl)
+                self._publish_invalidation(keys=[key])
+            return result
         except Exception as e:
+            self.metrics.record_error(key)
             logger.error(f"缓存写入失败 {key}: {e}")
             return False
 
@@ -133,11 +543,15 @@ class BlogCache:
         Returns:
             bool: 是否删除成功
         """
-        if not self.redis_client:
-            return False
-
+        self._ensure_background()
+        if self._use_local:
+            self.local.delete(key)
+            self._publish_invalidation(keys=[key])
         try:
-            return bool(self.redis_client.delete(key))
+            return self.backend.delete(key)
+        except CONNECTION_ERRORS as e:
+            self._fallback(e)
+            return self.memory.delete(key)
         except Exception as e:
             logger.error(f"缓存删除失败 {key}: {e}")
             return False
@@ -152,17 +566,377 @@ class BlogCache:
         Returns:
             int: 删除的键数量
         """
-        if not self.redis_client:
+        self._ensure_background()
+        if self._use_local:
+            self.local.delete_pattern(pattern)
+            self._publish_invalidation(pattern=pattern)
+        try:
+            return self.backend.delete_pattern(pattern)
+        except CONNECTION_ERRORS as e:
+            self._fallback(e)
+            return self.memory.delete_pattern(pattern)
+        except Exception as e:
+            logger.error(f"模式删除失败 {pattern}: {e}")
+            return 0
+
+    def get_many(self, keys: List[str], fresh_only: bool = False) -> Dict[str, Any]:
+        """
+        批量读取：一级缓存未命中的键用一次 MGET 取回
+
+        Args:
+            keys: 缓存键列表
+            fresh_only: 已过软过期时间的条目视为不存在（如预热时重新构建它们）
+
+        Returns:
+            Dict: {键: 数据}，不存在的键不出现在结果中
+        """
+        self._ensure_background()
+        use_local = self._use_local
+        found: Dict[str, Any] = {}
+        missing = []
+        for key in keys:
+            value = self.local.get(key) if use_local else None
+            if value is None:
+                missing.append(key)
+            else:
+                found[key] = value
+                self.metrics.record_hits(key, True)
+
+        if missing:
+            try:
+                for key, data in zip(missing, self.backend.get_many(missing)):
+                    self.metrics.record_hits(key, bool(data), len(data or b""))
+                    if not data:
+                        self.backend_misses += 1
+                        continue
+                    self.backend_hits += 1
+                    value = self.serializer.loads(data)
+                    if use_local:
+                        self.local.set(key, value, len(data))
+                    found[key] = value
+            except CONNECTION_ERRORS as e:
+                self._fallback(e)
+            except Exception as e:
+                logger.error(f"批量读取缓存失败 ({len(missing)} 个键): {e}")
+
+        # 与 get 一致：解开带软过期时间的条目
+        now = time.time()
+        result = {}
+        for key, value in found.items():
+            if isinstance(value, dict) and SOFT_EXPIRES_FIELD in value:
+                if fresh_only and value[SOFT_EXPIRES_FIELD] <= now:
+                    continue
+                value = value["value"]
+            result[key] = value
+        return result
+
+    def set_many(self, items: Dict[str, Any], ttl: Union[int, Dict[str, int], None] = None,
+                 tags: Optional[Dict[str, List[str]]] = None, refresh_ahead: bool = False) -> int:
+        """
+        批量写入：所有 SET 和标签登记在一个管道中完成，一次往返
+
+        Args:
+            items: {键: 数据}
+            ttl: 过期时间（秒），所有键相同；也可按键给出 {键: ttl}
+            tags: {键: 失效标签列表}，可只给出部分键
+            refresh_ahead: 与 get_or_compute 写入的条目一致：ttl 为软过期时间，条目保留 ttl × hard_ttl_factor 秒，
+                并在同一个管道中写入旧值副本
+
+        Returns:
+            int: 写入成功的数量（不含旧值副本）
+        """
+        if not items:
+            return 0
+        self._ensure_background()
+        tags = tags or {}
+        ttls = ttl if isinstance(ttl, dict) else dict.fromkeys(items, ttl)
+        try:
+            # (键, 数据, ttl, 标签)
+            entries = []
+            now = time.time()
+            for key, value in items.items():
+                key_ttl = ttls.get(key)
+                if refresh_ahead and key_ttl:
+                    wrapped = {SOFT_EXPIRES_FIELD: now + key_ttl, "value": value}
+                    entries.append((key, wrapped, int(key_ttl * self.hard_ttl_factor), tags.get(key)))
+                    entries.append((self._stale_key(key), value, self.stale_ttl, None))
+                else:
+                    entries.append((key, value, key_ttl, tags.get(key)))
+            batch = [(key, self.serializer.dumps(value), key_ttl, key_tags) for key, value, key_ttl, key_tags in entries]
+            for key, data, _, _ in batch:
+                self.metrics.record_write(key, len(data))
+            stale_copies = len(batch) - len(items)
+            try:
+                written = self.backend.set_many(batch)
+            except CONNECTION_ERRORS as e:
+                self._fallback(e)
+                return self.memory.set_many(batch) - stale_copies
+            if self._use_local:
+                for key, data, key_ttl, _ in batch:
+                    self.local.set(key, self.serializer.loads(data), len(data), key_ttl)
+                self._publish_invalidation(keys=[key for key, _, _, _ in batch])
+            return written - stale_copies
+        except Exception as e:
+            logger.error(f"批量写入缓存失败 ({len(items)} 个键): {e}")
+            return 0
+
+    def delete_many(self, keys: List[str]) -> int:
+        """
+        批量删除：管道中分批 UNLINK，一次往返
+
+        Args:
+            keys: 缓存键列表
+
+        Returns:
+            int: 删除的键数量
+        """
+        if not keys:
+            return 0
+        self._ensure_background()
+        if self._use_local:
+            for key in keys:
+                self.local.delete(key)
+            self._publish_invalidation(keys=list(keys))
+        try:
+            return self.backend.delete_many(list(keys))
+        except CONNECTION_ERRORS as e:
+            self._fallback(e)
+            return self.memory.delete_many(list(keys))
+        except Exception as e:
+            logger.error(f"批量删除缓存失败 ({len(keys)} 个键): {e}")
             return 0
 
+    @staticmethod
+    def _stale_key(key: str) -> str:
+        # 去掉代数，命名空间整体失效后仍能找到上一代的值
+        return STALE_PREFIX + re.sub(r":v\d+", "", key, count=1)
+
+    def get_or_compute(
+        self, key: str, fn: Callable[[], Any], ttl: Optional[int] = None, tags=None, refresh_ahead: bool = True
+    ) -> Tuple[Any, bool]:
+        """
+        读取缓存，未命中时调用 fn 重建并写入
+
+        同一进程内并发的未命中只调用一次 fn；跨 worker 用 Redis 锁（SET NX PX）保证只有一个在重建，
+        写入时校验防护令牌，锁过期后被他人取得时丢弃自己的结果。拿不到锁的请求优先返回旧值，
+        没有旧值时最多等待 lock_wait 秒，仍未等到则自己计算。
+
+        refresh_ahead 时 ttl 为软过期时间，条目实际保留 ttl × hard_ttl_factor 秒：
+        超过软过期后仍立即返回缓存值，并在后台线程池中刷新。
+
+        Args:
+            key: 缓存键
+            fn: 重建函数，返回 None 时不缓存
+            ttl: 过期时间（秒）
+            tags: 失效标签列表，或根据重建结果返回标签列表的函数
+            refresh_ahead: 是否在软过期后后台刷新
+
+        Returns:
+            tuple: (数据, 是否来自缓存)
+        """
+        value, state = self.get_or_compute_state(key, fn, ttl, tags, refresh_ahead)
+        return value, state != STATE_COMPUTED
+
+    def get_or_compute_state(
+        self, key: str, fn: Callable[[], Any], ttl: Optional[int] = None, tags=None, refresh_ahead: bool = True
+    ) -> Tuple[Any, str]:
+        """
+        同 get_or_compute，但返回数据状态：STATE_HIT / STATE_COMPUTED / STATE_STALE
+        旧值（可能已被失效）只适合临时返回，调用方不应再把它写入其他缓存（如响应缓存）
+
+        Returns:
+            tuple: (数据, 状态)
+        """
+        value, soft_expires_at = self._get_entry(key)
+        if value is not None:
+            if soft_expires_at is not None and soft_expires_at <= time.time():
+                self._schedule_refresh(key, fn, ttl, tags)
+                return value, STATE_STALE
+            return value, STATE_HIT
+
+        with self._flights_lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+        if not leader:
+            self.compute_stats["coalesced"] += 1
+            if flight.done.wait(self.lock_wait + self.lock_ttl_ms / 1000):
+                if flight.error is not None:
+                    raise flight.error
+                return flight.value, STATE_STALE if flight.state == STATE_STALE else STATE_HIT
+            return fn(), STATE_COMPUTED
+
+        try:
+            flight.value, flight.state = self._compute_locked(key, fn, ttl, tags, refresh_ahead)
+            return flight.value, flight.state
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            flight.done.set()
+            with self._flights_lock:
+                self._flights.pop(key, None)
+
+    def _acquire_lock(self, key: str) -> Tuple[Optional[CacheBackend], str, Optional[int]]:
+        """取得重建锁，返回 (锁所在后端, 锁键, 令牌)；锁被他人持有时令牌为 None，出错时后端为 None"""
+        lock_key = f"{LOCK_PREFIX}{key}"
+        backend = self.backend
+        try:
+            return backend, lock_key, backend.acquire_lock(lock_key, self.lock_ttl_ms)
+        except CONNECTION_ERRORS as e:
+            self._fallback(e)
+            return self.memory, lock_key, self.memory.acquire_lock(lock_key, self.lock_ttl_ms)
+        except Exception as e:
+            logger.error(f"获取缓存重建锁失败 {key}: {e}")
+            return None, lock_key, None
+
+    def _compute_locked(self, key: str, fn: Callable[[], Any], ttl: Optional[int], tags,
+                        refresh_ahead: bool) -> Tuple[Any, str]:
+        """在 Redis 锁保护下重建（进程内已合并）"""
+        backend, lock_key, token = self._acquire_lock(key)
+        if token is None and backend is not None:
+            # 其他 worker 正在重建：有旧值直接返回，否则短暂等待它写入
+            stale = self.get(self._stale_key(key))
+            if stale is not None:
+                self.compute_stats["stale"] += 1
+                return stale, STATE_STALE
+            deadline = time.monotonic() + self.lock_wait
+            while time.monotonic() < deadline:
+                time.sleep(LOCK_POLL_INTERVAL)
+                value = self.get(key)
+                if value is not None:
+                    self.compute_stats["waited"] += 1
+                    return value, STATE_HIT
+
+        start = time.perf_counter()
+        value = fn()
+        self.metrics.record_compute(key, time.perf_counter() - start)
+        self.compute_stats["computed"] += 1
+        self._store_computed(key, value, ttl, tags, refresh_ahead, backend, lock_key, token)
+        return value, STATE_COMPUTED
+
+    def _store_computed(self, key: str, value: Any, ttl: Optional[int], tags, refresh_ahead: bool,
+                        backend: Optional[CacheBackend], lock_key: str, token: Optional[int]):
+        """写入重建结果（校验防护令牌）和旧值副本，然后释放锁"""
         try:
-            keys = self.redis_client.keys(pattern)
-            if keys:
-                return self.redis_client.delete(*keys)
+            if value is None:
+                return
+            if callable(tags):
+                tags = tags(value)
+            fence = (lock_key, token) if token is not None and backend is self.backend else None
+            if refresh_ahead and ttl:
+                stored = self.set(key, value, int(ttl * self.hard_ttl_factor), tags, fence=fence, soft_ttl=ttl)
+            else:
+                stored = self.set(key, value, ttl, tags, fence=fence)
+            if stored or fence is None:
+                self.set(self._stale_key(key), value, self.stale_ttl)
+            else:
+                self.compute_stats["fenced_out"] += 1
+                logger.warning(f"缓存重建锁已过期，丢弃本次结果: {key}")
+        finally:
+            if token is not None:
+                self._release_lock(backend, lock_key, token)
+
+    def _schedule_refresh(self, key: str, fn: Callable[[], Any], ttl: Optional[int], tags):
+        """把软过期的条目交给后台线程刷新（同一个键同时只排队一次）"""
+        with self._refresh_lock:
+            if key in self._refreshing:
+                return
+            if self._refresh_pid != os.getpid():
+                # fork 后线程池不可用，每个 worker 各自创建
+                self._refresh_pool = ThreadPoolExecutor(
+                    max_workers=self.refresh_workers, thread_name_prefix="cache-refresh"
+                )
+                self._refresh_pid = os.getpid()
+                self._refreshing.clear()
+            self._refreshing.add(key)
+            self.refresh_stats["queued"] += 1
+
+        def refresh():
+            self._refresh(key, fn, ttl, tags)
+
+        # 重建函数通常要访问数据库、生成 URL，后台线程中沿用当前请求（或应用）上下文
+        if has_request_context():
+            job = copy_current_request_context(refresh)
+        else:
+            app = current_app._get_current_object()
+
+            def job():
+                with app.app_context():
+                    refresh()
+
+        self._refresh_pool.submit(job)
+
+    def _refresh(self, key: str, fn: Callable[[], Any], ttl: Optional[int], tags):
+        started = time.monotonic()
+        try:
+            backend, lock_key, token = self._acquire_lock(key)
+            if token is None:
+                # 其他 worker 正在刷新
+                self.refresh_stats["skipped"] += 1
+                return
+            try:
+                value = fn()
+            except BaseException:
+                self._release_lock(backend, lock_key, token)
+                raise
+            self._store_computed(key, value, ttl, tags, True, backend, lock_key, token)
+            self.refresh_stats["refreshed"] += 1
+            self._refresh_latencies.append(time.monotonic() - started)
+        except Exception as e:
+            self.refresh_stats["failed"] += 1
+            logger.error(f"后台刷新缓存失败 {key}: {e}", exc_info=True)
+        finally:
+            with self._refresh_lock:
+                self._refreshing.discard(key)
+
+    def get_refresh_stats(self) -> Dict[str, Any]:
+        """后台刷新统计：排队/完成/跳过/失败次数、当前队列深度、最近刷新耗时（毫秒）"""
+        latencies = sorted(self._refresh_latencies)
+        stats = dict(self.refresh_stats, queue_depth=len(self._refreshing), workers=self.refresh_workers)
+        if latencies:
+            stats["latency_ms"] = {
+                "avg": round(sum(latencies) / len(latencies) * 1000, 2),
+                "p50": round(latencies[len(latencies) // 2] * 1000, 2),
+                "p95": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000, 2),
+                "max": round(latencies[-1] * 1000, 2),
+            }
+        return stats
+
+    def _release_lock(self, backend: CacheBackend, lock_key: str, token: int):
+        try:
+            backend.release_lock(lock_key, token)
+        except Exception as e:
+            # 释放失败不要紧，锁会按 lock_ttl_ms 过期
+            logger.debug(f"释放缓存重建锁失败 {lock_key}: {e}")
+
+    def invalidate_tags(self, *tags: str) -> int:
+        """
+        删除打了任一标签的所有缓存
+
+        Args:
+            *tags: 标签
+
+        Returns:
+            int: 删除的缓存键数量
+        """
+        if not tags:
             return 0
+        self._ensure_background()
+        try:
+            deleted, keys = self.backend.delete_tags(list(tags))
+        except CONNECTION_ERRORS as e:
+            self._fallback(e)
+            deleted, keys = self.memory.delete_tags(list(tags))
         except Exception as e:
-            logger.error(f"模式删除失败 {pattern}: {e}")
+            logger.error(f"按标签删除缓存失败 {tags}: {e}")
             return 0
+        if self._use_local and keys:
+            for key in keys:
+                self.local.delete(key)
+            self._publish_invalidation(keys=keys)
+        return deleted
 
     def get_categories(self) -> Optional[List[Dict[str, Any]]]:
         """
@@ -171,8 +945,7 @@ class BlogCache:
         Returns:
             List[Dict]: 分类列表，如果缓存不存在则返回None
         """
-        key = self._get_cache_key("categories")
-        return self.get(key)
+        return self.get(cache_keys.blog_categories_key(self))
 
     def set_categories(self, categories: List[Dict[str, Any]]) -> bool:
         """
@@ -184,7 +957,7 @@ class BlogCache:
         Returns:
             bool: 是否设置成功
         """
-        key = self._get_cache_key("categories")
+        key = cache_keys.blog_categories_key(self)
         return self.set(key, categories, self.cache_ttl["categories"])
 
     def get_articles(
@@ -200,8 +973,7 @@ class BlogCache:
         Returns:
             List[Dict]: 文章列表，如果缓存不存在则返回None
         """
-        key = self._get_cache_key("articles", category, search)
-        return self.get(key)
+        return self.get(cache_keys.article_list_key(category, search, self))
 
     def set_articles(
         self, articles: List[Dict[str, Any]], category: str = "", search: str = ""
@@ -217,8 +989,10 @@ class BlogCache:
         Returns:
             bool: 是否设置成功
         """
-        key = self._get_cache_key("articles", category, search)
-        return self.set(key, articles, self.cache_ttl["articles"])
+        key = cache_keys.article_list_key(category, search, self)
+        # 键中已带 articles 命名空间的代数，整体失效靠递增代数，只按分类登记标签
+        tags = [cache_keys.category_tag(category)] if category else None
+        return self.set(key, articles, self.cache_ttl["articles"], tags=tags)
 
     def get_article(self, article_id: str) -> Optional[Dict[str, Any]]:
         """
@@ -230,8 +1004,7 @@ class BlogCache:
         Returns:
             Dict: 文章详情，如果缓存不存在则返回None
         """
-        key = self._get_cache_key("article_detail", article_id)
-        return self.get(key)
+        return self.get(cache_keys.article_key(article_id, self))
 
     def set_article(self, article_id: str, article: Dict[str, Any]) -> bool:
         """
@@ -244,8 +1017,8 @@ class BlogCache:
         Returns:
             bool: 是否设置成功
         """
-        key = self._get_cache_key("article_detail", article_id)
-        return self.set(key, article, self.cache_ttl["article_detail"])
+        key = cache_keys.article_key(article_id, self)
+        return self.set(key, article, self.cache_ttl["article_detail"], tags=[cache_keys.article_tag(article_id)])
 
     def get_article_html(
         self, article_id: str, content_hash: str = ""
@@ -260,8 +1033,7 @@ class BlogCache:
         Returns:
             str: HTML内容，如果缓存不存在则返回None
         """
-        key = self._get_cache_key("article_html", article_id, content_hash)
-        return self.get(key)
+        return self.get(cache_keys.article_html_key(article_id, content_hash, self))
 
     def set_article_html(
         self, article_id: str, html_content: str, content_hash: str = ""
@@ -277,12 +1049,12 @@ class BlogCache:
         Returns:
             bool: 是否设置成功
         """
-        key = self._get_cache_key("article_html", article_id, content_hash)
-        return self.set(key, html_content, self.cache_ttl["article_html"])
+        key = cache_keys.article_html_key(article_id, content_hash, self)
+        return self.set(key, html_content, self.cache_ttl["article_html"], tags=[cache_keys.article_tag(article_id)])
 
     def invalidate_article_cache(self, article_id: str) -> int:
         """
-        失效文章相关的所有缓存
+        失效文章相关的所有缓存（详情、HTML 等打了 article:{id} 标签的键）
 
         Args:
             article_id: 文章ID
@@ -290,53 +1062,81 @@ class BlogCache:
         Returns:
             int: 删除的缓存键数量
         """
-        count = 0
-
-        # 删除文章详情缓存
-        detail_pattern = f"{self.prefix}article_detail:*{article_id}*"
-        count += self.delete_pattern(detail_pattern)
-
-        # 删除文章HTML缓存
-        html_pattern = f"{self.prefix}article_html:*{article_id}*"
-        count += self.delete_pattern(html_pattern)
-
-        return count
+        return self.invalidate_tags(cache_keys.article_tag(article_id))
 
-    def invalidate_category_cache(self, category: str = "") -> int:
+    def invalidate_category_cache(self, *categories: str) -> int:
         """
         失效分类相关的所有缓存
 
         Args:
-            category: 分类名称，为空则失效所有分类缓存
+            *categories: 分类（可多个，一次管道批量删除），为空则失效分类树和所有文章列表缓存
 
         Returns:
             int: 删除的缓存键数量
         """
-        count = 0
+        categories = [category for category in categories if category]
+        if categories:
+            return self.invalidate_tags(*[cache_keys.category_tag(category) for category in categories])
+        # 分类树和所有文章列表：递增命名空间代数，不逐个删除
+        self.bump_namespaces("categories", "articles")
+        return 0
 
-        if category:
-            # 删除特定分类的文章列表缓存
-            articles_pattern = f"{self.prefix}articles:*{category}*"
-            count += self.delete_pattern(articles_pattern)
-        else:
-            # 删除所有分类和文章列表缓存
-            categories_key = self._get_cache_key("categories")
-            count += int(self.delete(categories_key))
+    def invalidate_all_cache(self) -> int:
+        """
+        失效所有博客相关缓存（递增所有命名空间的代数，旧条目随 TTL 过期）
+
+        Returns:
+            int: 失效的命名空间数量
+        """
+        return len(self.bump_namespaces(*NAMESPACES))
 
-            articles_pattern = f"{self.prefix}articles:*"
-            count += self.delete_pattern(articles_pattern)
+    def get_tier_stats(self) -> Dict[str, Any]:
+        """
+        各级缓存命中率（当前 worker 进程）
 
-        return count
+        local 为进程内一级缓存；backend 只统计一级缓存未命中后落到缓存后端（Redis 或降级时的内存）的请求
+        """
+        backend_total = self.backend_hits + self.backend_misses
+        local = self.local.info() if self.local is not None else {"enabled": False}
+        local_hits = local.get("hits", 0)
+        total = local_hits + backend_total
+        return {
+            "pid": os.getpid(),
+            "local": local,
+            "backend": {
+                "name": self.backend.name,
+                "hits": self.backend_hits,
+                "misses": self.backend_misses,
+                "hit_ratio": round(self.backend_hits / backend_total, 4) if backend_total else 0,
+            },
+            "overall_hit_ratio": round((local_hits + self.backend_hits) / total, 4) if total else 0,
+            # get_or_compute：实际重建次数、进程内合并、等待他人重建、返回旧值、锁过期被丢弃的结果
+            "compute": dict(self.compute_stats, in_flight=len(self._flights)),
+            "refresh": self.get_refresh_stats(),
+        }
 
-    def invalidate_all_cache(self) -> int:
+    def get_namespace_stats(self) -> Dict[str, Any]:
         """
-        失效所有博客相关缓存
+        各命名空间的命中、未命中、错误、字节数和耗时分布
 
-        Returns:
-            int: 删除的缓存键数量
+        Redis 可用时先写出本进程的计数，返回所有 worker 的汇总（scope=cluster）；
+        否则只返回本进程尚未写出的计数（scope=worker）
         """
-        pattern = f"{self.prefix}*"
-        return self.delete_pattern(pattern)
+        if self._flush_metrics():
+            try:
+                return self.metrics.read(self._redis)
+            except Exception as e:
+                logger.error(f"读取缓存指标失败: {e}")
+        return self.metrics.read_local()
+
+    def reset_metrics(self) -> bool:
+        """清零命名空间计数（Redis 中的汇总和本进程的计数）"""
+        try:
+            self.metrics.reset(self.redis_client)
+            return True
+        except Exception as e:
+            logger.error(f"清零缓存指标失败: {e}")
+            return False
 
     def get_cache_stats(self) -> Dict[str, Any]:
         """
@@ -346,77 +1146,43 @@ class BlogCache:
             Dict: 缓存统计信息
         """
         if not self.redis_client:
-            return {"available": False, "message": "Redis不可用"}
+            return {
+                "available": True,
+                "backend": self.memory.name,
+                "message": "Redis不可用，使用内存缓存",
+                "memory": self.memory.info(),
+                "cache_ttl_config": self.cache_ttl,
+                "generations": dict(zip(NAMESPACES, self.generations(*NAMESPACES))),
+                "serializer": self.serializer.info(),
+                "redis_pool": pool_stats(),
+                "tiers": self.get_tier_stats(),
+                "metrics": self.get_namespace_stats(),
+            }
 
         try:
             info = self.redis_client.info()
 
-            # 获取博客相关的缓存键数量
-            blog_keys = self.redis_client.keys(f"{self.prefix}*")
+            # 获取博客相关的缓存键数量（SCAN 增量遍历，不阻塞 Redis）
+            blog_keys = self.backend.count_keys(f"{self.prefix}*")
 
             return {
                 "available": True,
+                "backend": self.backend.name,
                 "redis_version": info.get("redis_version"),
                 "used_memory_human": info.get("used_memory_human"),
                 "connected_clients": info.get("connected_clients"),
-                "blog_cache_keys": len(blog_keys),
+                "blog_cache_keys": blog_keys,
                 "cache_ttl_config": self.cache_ttl,
+                "generations": dict(zip(NAMESPACES, self.generations(*NAMESPACES))),
+                "serializer": self.serializer.info(),
+                "redis_pool": pool_stats(),
+                "tiers": self.get_tier_stats(),
+                "metrics": self.get_namespace_stats(),
             }
         except Exception as e:
             logger.error(f"获取缓存统计失败: {e}")
             return {"available": False, "message": f"获取统计信息失败: {e}"}
 
-    def warm_up_cache(
-        self, scan_blog_directory_func, get_all_articles_func
-    ) -> Dict[str, Any]:
-        """
-        预热缓存
-
-        Args:
-            scan_blog_directory_func: 扫描博客目录的函数
-            get_all_articles_func: 获取所有文章的函数
-
-        Returns:
-            Dict: 预热结果
-        """
-        if not self.redis_client:
-            return {"success": False, "message": "Redis不可用"}
-
-        try:
-            start_time = datetime.now()
-
-            # 预热分类缓存
-            categories = scan_blog_directory_func()
-            category_list = [
-                {"name": name, "count": len(articles), "articles": articles}
-                for name, articles in categories.items()
-            ]
-            self.set_categories(category_list)
-
-            # 预热文章列表缓存
-            all_articles = get_all_articles_func()
-            self.set_articles(all_articles)
-
-            # 为每个分类预热文章列表缓存
-            for category_name in categories.keys():
-                category_articles = categories[category_name]
-                self.set_articles(category_articles, category_name)
-
-            end_time = datetime.now()
-            duration = (end_time - start_time).total_seconds()
-
-            return {
-                "success": True,
-                "message": "缓存预热完成",
-                "duration_seconds": duration,
-                "categories_count": len(category_list),
-                "articles_count": len(all_articles),
-            }
-
-        except Exception as e:
-            logger.error(f"缓存预热失败: {e}")
-            return {"success": False, "message": f"缓存预热失败: {e}"}
-
 
 # 全局缓存实例
 cache = None
@@ -0,0 +1,416 @@
+"""
+缓存后端
+BlogCache 通过统一的 get/set/delete/delete_pattern 接口访问存储，存取的都是序列化后的字节串（见 cache_codec）。
+RedisBackend 为正常情况下的后端；Redis 不可用时 BlogCache 切换到进程内的 MemoryBackend，
+Redis 恢复后再切换回来。
+"""
+import time
+import itertools
+import threading
+from typing import Dict, Any, Optional, List, Tuple
+
+import redis
+from redis.client import NEVER_DECODE
+
+from model.local_cache import LocalCache
+
+# 视为 Redis 不可用（需要切换到内存后端）的异常
+CONNECTION_ERRORS = (redis.ConnectionError, redis.TimeoutError)
+
+# 标签索引的键前缀：blog:tags:{标签} 是一个 Redis 有序集合，成员为打了该标签的缓存键，分数为该键的过期时间戳；
+# 每次登记时移除已过期的成员，集合大小保持在仍然有效的键数量
+TAG_PREFIX = "blog:tags:"
+# 标签索引的最短过期时间，保证比其中任何缓存键都活得久
+TAG_MIN_TTL = 86400
+# SCAN / UNLINK 每批处理的键数
+SCAN_BATCH = 500
+# 重建锁的键前缀：blog:lock:{缓存键}，值为持有者的防护令牌
+LOCK_PREFIX = "blog:lock:"
+# 防护令牌计数器，单调递增
+FENCE_KEY = "blog:lock:fence"
+
+# 只有锁仍由自己（令牌相同）持有时才释放
+RELEASE_LOCK_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+# 只有锁仍由自己持有时才写入结果：锁已过期并被其他 worker 取得时，旧持有者的结果被丢弃
+FENCED_SET_SCRIPT = """
+if redis.call('get', KEYS[1]) ~= ARGV[1] then
+    return 0
+end
+if tonumber(ARGV[3]) > 0 then
+    redis.call('set', KEYS[2], ARGV[2], 'EX', ARGV[3])
+else
+    redis.call('set', KEYS[2], ARGV[2])
+end
+return 1
+"""
+
+
+def tag_key(tag: str) -> str:
+    return f"{TAG_PREFIX}{tag}"
+
+
+class CacheBackend:
+    """缓存后端接口"""
+
+    name = "base"
+
+    def get(self, key: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    def set(self, key: str, data: bytes, ttl: Optional[int] = None, tags: Optional[List[str]] = None) -> bool:
+        raise NotImplementedError
+
+    def delete(self, key: str) -> bool:
+        raise NotImplementedError
+
+    def delete_pattern(self, pattern: str) -> int:
+        raise NotImplementedError
+
+    def get_many(self, keys: List[str]) -> List[Optional[bytes]]:
+        """批量读取，结果与 keys 一一对应"""
+        raise NotImplementedError
+
+    def set_many(self, items: List[Tuple[str, bytes, Optional[int], Optional[List[str]]]]) -> int:
+        """批量写入 (键, 数据, ttl, 标签)，返回写入数量"""
+        raise NotImplementedError
+
+    def delete_many(self, keys: List[str]) -> int:
+        """批量删除，返回实际删除数量"""
+        raise NotImplementedError
+
+    def delete_tags(self, tags: List[str]) -> Tuple[int, List[str]]:
+        """删除打了任一标签的所有缓存键，返回 (实际删除数, 标签下登记的全部键)"""
+        raise NotImplementedError
+
+    def count_keys(self, pattern: str) -> int:
+        raise NotImplementedError
+
+    def get_counters(self, keys: List[str]) -> List[int]:
+        """读取计数器（不存在为 0）"""
+        raise NotImplementedError
+
+    def incr_counters(self, keys: List[str]) -> List[int]:
+        """计数器各加 1，返回新值"""
+        raise NotImplementedError
+
+    def acquire_lock(self, lock_key: str, ttl_ms: int) -> Optional[int]:
+        """取得锁，返回防护令牌；锁被他人持有时返回 None"""
+        raise NotImplementedError
+
+    def release_lock(self, lock_key: str, token: int) -> bool:
+        raise NotImplementedError
+
+    def set_fenced(self, lock_key: str, token: int, key: str, data: bytes,
+                   ttl: Optional[int] = None, tags: Optional[List[str]] = None) -> bool:
+        """锁仍由令牌持有者持有时才写入，否则丢弃并返回 False"""
+        raise NotImplementedError
+
+    def info(self) -> Dict[str, Any]:
+        return {"backend": self.name}
+
+
+class RedisBackend(CacheBackend):
+    """Redis 后端；连接异常原样抛出，由 BlogCache 决定是否降级"""
+
+    name = "redis"
+
+    def __init__(self, client: redis.Redis):
+        """
+        Args:
+            client: 共享连接池的客户端（decode_responses=True）；缓存值以 NEVER_DECODE 读取原始字节，
+                不再为二进制数据单独建连接池
+        """
+        self.client = client
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.client.execute_command("GET", key, **{NEVER_DECODE: True})
+
+    def set(self, key: str, data: bytes, ttl: Optional[int] = None, tags: Optional[List[str]] = None) -> bool:
+        if not tags:
+            return bool(self.client.set(key, data, ex=ttl))
+
+        # 写入缓存并登记到各标签集合，一次往返
+        return self.set_many([(key, data, ttl, tags)]) == 1
+
+    @staticmethod
+    def _queue_tags(pipe, key: str, ttl: Optional[int], tags: List[str]):
+        now = time.time()
+        expires_at = now + ttl if ttl else float("inf")
+        for tag in tags:
+            pipe.zadd(tag_key(tag), {key: expires_at})
+            pipe.zremrangebyscore(tag_key(tag), "-inf", now)
+            if ttl:
+                pipe.expire(tag_key(tag), max(ttl, TAG_MIN_TTL))
+            else:
+                pipe.persist(tag_key(tag))
+
+    def delete(self, key: str) -> bool:
+        return bool(self.client.unlink(key))
+
+    def delete_pattern(self, pattern: str) -> int:
+        """SCAN 增量遍历 + UNLINK 分批删除，不会像 KEYS 一样阻塞 Redis"""
+        deleted = 0
+        batch = []
+        for key in self.client.scan_iter(match=pattern, count=SCAN_BATCH):
+            batch.append(key)
+            if len(batch) >= SCAN_BATCH:
+                deleted += self.client.unlink(*batch)
+                batch = []
+        if batch:
+            deleted += self.client.unlink(*batch)
+        return deleted
+
+    def get_many(self, keys: List[str]) -> List[Optional[bytes]]:
+        """MGET，一次往返"""
+        if not keys:
+            return []
+        return self.client.execute_command("MGET", *keys, **{NEVER_DECODE: True})
+
+    def set_many(self, items: List[Tuple[str, bytes, Optional[int], Optional[List[str]]]]) -> int:
+        """所有 SET（带过期时间）和标签登记放在一个管道里，一次往返"""
+        if not items:
+            return 0
+        pipe = self.client.pipeline(transaction=False)
+        positions = []
+        for key, data, ttl, tags in items:
+            positions.append(len(pipe))
+            pipe.set(key, data, ex=ttl)
+            if tags:
+                self._queue_tags(pipe, key, ttl, tags)
+        results = pipe.execute()
+        return sum(1 for position in positions if results[position])
+
+    def delete_many(self, keys: List[str]) -> int:
+        """按 SCAN_BATCH 分批 UNLINK，放在一个管道里，一次往返"""
+        if not keys:
+            return 0
+        pipe = self.client.pipeline(transaction=False)
+        for start in range(0, len(keys), SCAN_BATCH):
+            pipe.unlink(*keys[start:start + SCAN_BATCH])
+        return sum(pipe.execute())
+
+    def delete_tags(self, tags: List[str]) -> Tuple[int, List[str]]:
+        """读取 + 删除标签索引在一个事务中完成，之后 UNLINK 全部成员，共两次往返"""
+        if not tags:
+            return 0, []
+        pipe = self.client.pipeline(transaction=True)
+        for tag in tags:
+            pipe.zrange(tag_key(tag), 0, -1)
+            pipe.unlink(tag_key(tag))
+        results = pipe.execute()
+        keys = sorted(set().union(*results[::2]))
+        return self.delete_many(keys), keys
+
+    def count_keys(self, pattern: str) -> int:
+        return sum(1 for _ in self.client.scan_iter(match=pattern, count=SCAN_BATCH))
+
+    def get_counters(self, keys: List[str]) -> List[int]:
+        return [int(value or 0) for value in self.client.mget(keys)]
+
+    def incr_counters(self, keys: List[str]) -> List[int]:
+        pipe = self.client.pipeline(transaction=False)
+        for key in keys:
+            pipe.incr(key)
+        return pipe.execute()
+
+    def acquire_lock(self, lock_key: str, ttl_ms: int) -> Optional[int]:
+        token = self.client.incr(FENCE_KEY)
+        if self.client.set(lock_key, token, nx=True, px=ttl_ms):
+            return token
+        return None
+
+    def release_lock(self, lock_key: str, token: int) -> bool:
+        return bool(self.client.eval(RELEASE_LOCK_SCRIPT, 1, lock_key, token))
+
+    def set_fenced(self, lock_key: str, token: int, key: str, data: bytes,
+                   ttl: Optional[int] = None, tags: Optional[List[str]] = None) -> bool:
+        if not self.client.eval(FENCED_SET_SCRIPT, 2, lock_key, key, token, data, ttl or 0):
+            return False
+        if tags:
+            pipe = self.client.pipeline(transaction=False)
+            self._queue_tags(pipe, key, ttl, tags)
+            pipe.execute()
+        return True
+
+    def ping(self) -> bool:
+        return bool(self.client.ping())
+
+    def info(self) -> Dict[str, Any]:
+        info = self.client.info()
+        return {
+            "backend": self.name,
+            "redis_version": info.get("redis_version"),
+            "used_memory_human": info.get("used_memory_human"),
+            "connected_clients": info.get("connected_clients"),
+        }
+
+
+class MemoryBackend(CacheBackend):
+    """
+    进程内后端（线程安全，TTL + LRU，按条目数和字节数限制）
+
+    只在当前 worker 进程内有效：其他 worker 的失效操作不可见，因此 TTL 上限较短，
+    以限制多 worker 部署时读到旧数据的时间。
+    """
+
+    name = "memory"
+
+    def __init__(self, max_entries: int = 10000, max_bytes: int = 128 * 1024 * 1024, max_ttl: int = 300,
+                 max_dirty: int = 10000):
+        self.store = LocalCache(max_entries=max_entries, max_bytes=max_bytes, default_ttl=max_ttl)
+        # 标签 -> {缓存键: 过期时间（monotonic）}，登记时移除已过期的键
+        self.tags: Dict[str, Dict[str, float]] = {}
+        # 计数器（命名空间代数）不参与 LRU 淘汰，被淘汰会让旧代数的条目重新可见
+        self.counters: Dict[str, int] = {}
+        self._tags_lock = threading.Lock()
+        # 降级期间写入或删除过的键/模式/标签，Redis 恢复后在 Redis 中删除，避免读到降级前的旧值；
+        # 合计超过 max_dirty 时不再逐个记录（dirty_overflow），恢复时改为所有命名空间整体失效
+        self.max_dirty = max_dirty
+        self.dirty_keys: set = set()
+        self.dirty_patterns: set = set()
+        self.dirty_tags: set = set()
+        self.dirty_counters: set = set()
+        self.dirty_overflow = False
+        self._dirty_lock = threading.Lock()
+        # 锁：键 -> (令牌, 过期时间)
+        self.locks: Dict[str, Tuple[int, float]] = {}
+        self._fence = itertools.count(1)
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.store.get(key)
+
+    def set(self, key: str, data: bytes, ttl: Optional[int] = None, tags: Optional[List[str]] = None) -> bool:
+        self.store.set(key, data, len(data), ttl)
+        if tags:
+            now = time.monotonic()
+            expires_at = now + min(ttl or self.store.default_ttl, self.store.default_ttl)
+            with self._tags_lock:
+                for tag in tags:
+                    members = self.tags.setdefault(tag, {})
+                    for member in [member for member, expiry in members.items() if expiry <= now]:
+                        del members[member]
+                    members[key] = expires_at
+        self._mark_dirty(self.dirty_keys, [key])
+        return True
+
+    def delete(self, key: str) -> bool:
+        self._mark_dirty(self.dirty_keys, [key])
+        return self.store.delete(key)
+
+    def delete_pattern(self, pattern: str) -> int:
+        self._mark_dirty(self.dirty_patterns, [pattern])
+        return self.store.delete_pattern(pattern)
+
+    def get_many(self, keys: List[str]) -> List[Optional[bytes]]:
+        return [self.store.get(key) for key in keys]
+
+    def set_many(self, items: List[Tuple[str, bytes, Optional[int], Optional[List[str]]]]) -> int:
+        return sum(1 for key, data, ttl, tags in items if self.set(key, data, ttl, tags))
+
+    def delete_many(self, keys: List[str]) -> int:
+        return sum(1 for key in keys if self.delete(key))
+
+    def delete_tags(self, tags: List[str]) -> Tuple[int, List[str]]:
+        self._mark_dirty(self.dirty_tags, tags)
+        with self._tags_lock:
+            keys = set()
+            for tag in tags:
+                keys.update(self.tags.pop(tag, {}))
+        keys = sorted(keys)
+        return sum(1 for key in keys if self.store.delete(key)), keys
+
+    def count_keys(self, pattern: str) -> int:
+        return self.store.count(pattern)
+
+    def get_counters(self, keys: List[str]) -> List[int]:
+        return [self.counters.get(key, 0) for key in keys]
+
+    def incr_counters(self, keys: List[str]) -> List[int]:
+        with self._dirty_lock:
+            self.dirty_counters.update(keys)
+        with self._tags_lock:
+            for key in keys:
+                self.counters[key] = self.counters.get(key, 0) + 1
+            return [self.counters[key] for key in keys]
+
+    def acquire_lock(self, lock_key: str, ttl_ms: int) -> Optional[int]:
+        now = time.monotonic()
+        with self._tags_lock:
+            held = self.locks.get(lock_key)
+            if held and held[1] > now:
+                return None
+            token = next(self._fence)
+            self.locks[lock_key] = (token, now + ttl_ms / 1000)
+            return token
+
+    def _holds(self, lock_key: str, token: int) -> bool:
+        held = self.locks.get(lock_key)
+        return bool(held) and held[0] == token and held[1] > time.monotonic()
+
+    def release_lock(self, lock_key: str, token: int) -> bool:
+        with self._tags_lock:
+            if self._holds(lock_key, token):
+                del self.locks[lock_key]
+                return True
+            return False
+
+    def set_fenced(self, lock_key: str, token: int, key: str, data: bytes,
+                   ttl: Optional[int] = None, tags: Optional[List[str]] = None) -> bool:
+        with self._tags_lock:
+            if not self._holds(lock_key, token):
+                return False
+        return self.set(key, data, ttl, tags)
+
+    def _mark_dirty(self, dirty: set, items):
+        with self._dirty_lock:
+            if self.dirty_overflow:
+                return
+            dirty.update(items)
+            if len(self.dirty_keys) + len(self.dirty_patterns) + len(self.dirty_tags) > self.max_dirty:
+                self.dirty_overflow = True
+                self.dirty_keys.clear()
+                self.dirty_patterns.clear()
+                self.dirty_tags.clear()
+
+    def take_dirty(self) -> Tuple[List[str], List[str], List[str], List[str], bool]:
+        """取出并清空降级期间的脏键、脏模式、脏标签、递增过的计数器和是否超出记录上限"""
+        with self._dirty_lock:
+            dirty = (
+                list(self.dirty_keys), list(self.dirty_patterns), list(self.dirty_tags), list(self.dirty_counters),
+                self.dirty_overflow,
+            )
+            self.dirty_keys.clear()
+            self.dirty_patterns.clear()
+            self.dirty_tags.clear()
+            self.dirty_counters.clear()
+            self.dirty_overflow = False
+        return dirty
+
+    def restore_dirty(self, dirty: Tuple[List[str], List[str], List[str], List[str], bool]):
+        """放回 take_dirty 取出的记录（Redis 中的清理失败，下次重试）"""
+        keys, patterns, tags, counters, overflowed = dirty
+        with self._dirty_lock:
+            self.dirty_counters.update(counters)
+            if overflowed:
+                self.dirty_overflow = True
+                self.dirty_keys.clear()
+                self.dirty_patterns.clear()
+                self.dirty_tags.clear()
+                return
+        self._mark_dirty(self.dirty_keys, keys)
+        self._mark_dirty(self.dirty_patterns, patterns)
+        self._mark_dirty(self.dirty_tags, tags)
+
+    def clear(self):
+        self.store.clear()
+        with self._tags_lock:
+            self.tags.clear()
+            self.counters.clear()
+
+    def info(self) -> Dict[str, Any]:
+        return dict(self.store.info(), backend=self.name)
@@ -0,0 +1,142 @@
+"""
+缓存序列化
+缓存值编码为 "1 字节头 + 正文"：头的低 4 位为格式（json / orjson / msgpack），最高位表示正文经过 zlib 压缩。
+超过 compress_threshold 字节的正文才压缩（文章详情同时含 Markdown 和 HTML，压缩比很高）。
+不带头的数据是改造前写入的 JSON 文本，照常读取，新旧格式在滚动发布期间可以共存。
+"""
+import json
+import zlib
+from typing import Any, Dict
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - 可选依赖
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - 可选依赖
+    msgpack = None
+
+# 头字节：低 4 位为格式编号，压缩时再加最高位；这些值都不会是 JSON 文本的首字符（{ [ " 数字 t f n 空白）
+FORMAT_JSON = 0x01
+FORMAT_ORJSON = 0x02
+FORMAT_MSGPACK = 0x03
+COMPRESSED_FLAG = 0x80
+FORMAT_MASK = 0x0F
+KNOWN_FORMATS = (FORMAT_JSON, FORMAT_ORJSON, FORMAT_MSGPACK)
+
+
+class Codec:
+    """结构序列化格式"""
+
+    name = "base"
+    format_id = 0
+
+    def dumps(self, value: Any) -> bytes:
+        raise NotImplementedError
+
+    def loads(self, data: bytes) -> Any:
+        raise NotImplementedError
+
+
+class JsonCodec(Codec):
+    """标准库 json，与改造前写入的数据完全一致"""
+
+    name = "json"
+    format_id = FORMAT_JSON
+
+    def dumps(self, value: Any) -> bytes:
+        return json.dumps(value, ensure_ascii=False, default=str).encode("utf-8")
+
+    def loads(self, data: bytes) -> Any:
+        return json.loads(data)
+
+
+class OrjsonCodec(Codec):
+    """orjson：输出仍是 JSON，编解码快数倍；datetime 按 ISO 8601 输出"""
+
+    name = "orjson"
+    format_id = FORMAT_ORJSON
+
+    def dumps(self, value: Any) -> bytes:
+        return orjson.dumps(value, default=str, option=orjson.OPT_NON_STR_KEYS)
+
+    def loads(self, data: bytes) -> Any:
+        return orjson.loads(data)
+
+
+class MsgpackCodec(Codec):
+    """msgpack：二进制格式，体积最小；注意字典的整数键不会像 JSON 一样变成字符串"""
+
+    name = "msgpack"
+    format_id = FORMAT_MSGPACK
+
+    def dumps(self, value: Any) -> bytes:
+        return msgpack.packb(value, default=str, use_bin_type=True)
+
+    def loads(self, data: bytes) -> Any:
+        return msgpack.unpackb(data, raw=False, strict_map_key=False)
+
+
+def available_codecs() -> Dict[str, Codec]:
+    """当前环境可用的格式（orjson / msgpack 未安装时不可用）"""
+    codecs: Dict[str, Codec] = {"json": JsonCodec()}
+    if orjson is not None:
+        codecs["orjson"] = OrjsonCodec()
+    if msgpack is not None:
+        codecs["msgpack"] = MsgpackCodec()
+    return codecs
+
+
+class CacheSerializer:
+    """按配置的格式编码，按头字节解码（任何格式都能读）"""
+
+    def __init__(self, codec: str = "orjson", compress_threshold: int = 4096, compress_level: int = 6):
+        """
+        Args:
+            codec: 写入使用的格式，不可用时退回 json
+            compress_threshold: 正文超过该字节数时压缩，0 为不压缩
+            compress_level: zlib 压缩级别（1-9）
+        """
+        self.codecs = available_codecs()
+        self.codec = self.codecs.get(codec) or self.codecs["json"]
+        self.compress_threshold = compress_threshold
+        self.compress_level = compress_level
+        self._by_format = {c.format_id: c for c in self.codecs.values()}
+
+    def dumps(self, value: Any) -> bytes:
+        body = self.codec.dumps(value)
+        header = self.codec.format_id
+        if self.compress_threshold and len(body) > self.compress_threshold:
+            compressed = zlib.compress(body, self.compress_level)
+            # 压不小的数据（如已经压缩过的内容）原样存
+            if len(compressed) < len(body):
+                body = compressed
+                header |= COMPRESSED_FLAG
+        return bytes((header,)) + body
+
+    def loads(self, data) -> Any:
+        if isinstance(data, str):
+            # 改造前的 JSON 文本（decode_responses 客户端或内存后端）
+            return json.loads(data)
+        header = data[0] if data else 0
+        fmt = header & FORMAT_MASK
+        if header & ~(COMPRESSED_FLAG | FORMAT_MASK) or fmt not in KNOWN_FORMATS:
+            # 没有头：改造前写入的 JSON 文本
+            return json.loads(data)
+        codec = self._by_format.get(fmt)
+        if codec is None:
+            raise ValueError(f"缓存数据格式 {fmt} 在当前环境不可用（未安装对应的库）")
+        body = data[1:]
+        if header & COMPRESSED_FLAG:
+            body = zlib.decompress(body)
+        return codec.loads(body)
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            "codec": self.codec.name,
+            "available": sorted(self.codecs),
+            "compress_threshold": self.compress_threshold,
+            "compress_level": self.compress_level,
+        }
@@ -0,0 +1,144 @@
+"""
+数据变更后自动失效缓存
+在数据库会话上注册 SQLAlchemy 事件：每次 flush 时记录新增、修改、删除的
+Article / BlogCategory / Question / Category / Tag（以及文章-题目关联），
+以及 ORM 层的批量 UPDATE/DELETE，事务提交后（after_commit）按依赖关系失效缓存，回滚则丢弃记录。
+后台接口、命令行和批量任务的写入因此都不需要再手动失效缓存。
+"""
+import logging
+
+from sqlalchemy import event, inspect
+
+from model import cache_keys
+from model.database import db, Article, BlogCategory, Question, Category, Tag, ArticleQuestionRelation
+
+logger = logging.getLogger("rss_app")
+
+# 会话 info 中记录待失效内容的键
+PENDING_KEY = "cache_invalidation"
+
+# 只修改这些属性不影响任何缓存内容（如阅读时累加的浏览量）
+IGNORED_ATTRS = {
+    Article: {"view_count"},
+}
+
+
+def _changed_attrs(obj) -> set:
+    return {attr.key for attr in inspect(obj).attrs if attr.history.has_changes()}
+
+
+def _dependencies(cls, row):
+    """
+    一行数据变更后需要失效的缓存
+
+    Args:
+        cls: 模型类
+        row: 模型对象，或批量按主键更新时的参数字典
+
+    Returns:
+        tuple: (失效标签列表, 需要递增代数的命名空间列表)
+    """
+    value = row.get if isinstance(row, dict) else lambda name: getattr(row, name, None)
+    if cls is Article:
+        # 文章详情/HTML；分类树中有文章标题和数量，文章列表同样受影响
+        return [cache_keys.article_tag(value("id"))], ["categories", "articles"]
+    if cls is BlogCategory:
+        # 该分类下的文章详情中带有分类名
+        return [cache_keys.category_tag(value("id"))], ["categories", "articles"]
+    if cls is Question:
+        # 关联了该题目的文章详情和文章列表中带有题目标题
+        return [cache_keys.question_tag(value("id"))], ["question_bank", "articles"]
+    if cls is Category:
+        return [], ["question_bank"]
+    if cls is Tag:
+        # 打了该标签的文章详情和文章列表中带有标签名
+        return [cache_keys.tag_tag(value("id"))], ["articles"]
+    if cls is ArticleQuestionRelation:
+        return [cache_keys.article_tag(value("article_id"))], ["articles"]
+    return [], []
+
+
+# 按条件批量 UPDATE/DELETE（如 Query.filter_by(...).delete()）无法得知影响了哪些行，整体失效相关命名空间
+BULK_NAMESPACES = {
+    Article: ["article", "article_html", "categories", "articles"],
+    BlogCategory: ["article", "categories", "articles"],
+    ArticleQuestionRelation: ["article", "articles"],
+    Question: ["article", "articles", "question_bank"],
+    Category: ["question_bank"],
+    Tag: ["article", "articles"],
+}
+
+
+def _pending(session):
+    return session.info.setdefault(PENDING_KEY, (set(), set()))
+
+
+def _record(session, cls, row):
+    tags, namespaces = _pending(session)
+    row_tags, row_namespaces = _dependencies(cls, row)
+    tags.update(row_tags)
+    namespaces.update(row_namespaces)
+
+
+def _after_flush(session, flush_context):
+    for obj in list(session.new) + list(session.deleted):
+        _record(session, type(obj), obj)
+    for obj in session.dirty:
+        ignored = IGNORED_ATTRS.get(type(obj))
+        if ignored and _changed_attrs(obj) <= ignored:
+            continue
+        _record(session, type(obj), obj)
+
+
+def _do_orm_execute(orm_execute_state):
+    """记录 ORM 层的批量 UPDATE/DELETE（不经过 flush）"""
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is None or mapper.class_ not in BULK_NAMESPACES:
+        return
+    cls = mapper.class_
+    params = orm_execute_state.parameters
+    session = orm_execute_state.session
+    if isinstance(params, list) and params and all("id" in row for row in params):
+        # 按主键的批量更新（如批量重新渲染）：逐行精确失效
+        for row in params:
+            ignored = IGNORED_ATTRS.get(cls)
+            if ignored and set(row) - {"id"} <= ignored:
+                continue
+            _record(session, cls, row)
+    else:
+        _pending(session)[1].update(BULK_NAMESPACES[cls])
+
+
+def _after_commit(session):
+    tags, namespaces = session.info.pop(PENDING_KEY, (set(), set()))
+    if not tags and not namespaces:
+        return
+    # 缓存失效失败不能影响已经提交的事务
+    try:
+        from model.blog_cache import get_cache
+        cache = get_cache()
+        if namespaces:
+            cache.bump_namespaces(*sorted(namespaces))
+        if tags:
+            cache.invalidate_tags(*sorted(tags))
+        logger.debug(f"数据变更后失效缓存: 标签 {sorted(tags)}，命名空间 {sorted(namespaces)}")
+    except Exception as e:
+        logger.error(f"数据变更后失效缓存失败: {e}", exc_info=True)
+
+
+def _after_soft_rollback(session, previous_transaction):
+    # 只在最外层事务回滚时丢弃（回滚到保存点时外层事务的记录仍有效）
+    if previous_transaction.parent is None:
+        session.info.pop(PENDING_KEY, None)
+
+
+def init_cache_invalidation():
+    """在 db.session 上注册失效事件（应用启动时调用一次）"""
+    if event.contains(db.session, "after_commit", _after_commit):
+        return
+    event.listen(db.session, "after_flush", _after_flush)
+    event.listen(db.session, "do_orm_execute", _do_orm_execute)
+    event.listen(db.session, "after_commit", _after_commit)
+    event.listen(db.session, "after_soft_rollback", _after_soft_rollback)
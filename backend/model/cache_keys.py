@@ -0,0 +1,90 @@
+"""
+缓存键与失效标签
+所有缓存键都在这里生成（路由、BlogCache 的辅助方法、预热、ORM 失效钩子共用），
+格式为 blog:{命名空间}:v{代数}[:参数...]，见 BlogCache.key。
+失效标签也在这里统一命名，写入缓存时登记、数据变更时按标签删除。
+"""
+from typing import Optional
+
+
+def _cache(cache=None):
+    # 延迟导入：blog_cache 本身也从这里取键
+    if cache is not None:
+        return cache
+    from model.blog_cache import get_cache
+    return get_cache()
+
+
+# ---- 缓存键（cache 默认为全局 BlogCache） ----
+
+def blog_categories_key(cache=None) -> str:
+    """博客分类树"""
+    return _cache(cache).key("categories")
+
+
+def article_list_key(category: str = "", search: str = "", cache=None) -> str:
+    """文章列表（可按分类、搜索词区分）"""
+    parts = [category or "all"]
+    if search:
+        parts.append(search)
+    return _cache(cache).key("articles", *parts)
+
+
+def article_page_key(category_id=None, tag: str = "", page: int = 1, page_size: int = 20, cache=None) -> str:
+    """文章列表的一页（分类 id、标签、页码、每页数量）"""
+    return _cache(cache).key("articles", "page", category_id or "all", tag or "-", page, page_size)
+
+
+def ranking_key(kind: str, limit: int, cache=None) -> str:
+    """热度排行（popular / trending，随文章列表一起失效）"""
+    return _cache(cache).key("articles", "ranking", kind, limit)
+
+
+def article_key(article_id, cache=None) -> str:
+    """文章详情"""
+    return _cache(cache).key("article", article_id)
+
+
+def article_html_key(article_id, content_hash: str, cache=None) -> str:
+    """文章渲染后的 HTML（按内容哈希区分）"""
+    return _cache(cache).key("article_html", article_id, content_hash)
+
+
+def question_bank_categories_key(cache=None) -> str:
+    """题库分类树"""
+    return _cache(cache).key("question_bank", "categories")
+
+
+def response_key(namespace: str, endpoint: str, view_args=None, args=None, cache=None) -> str:
+    """
+    预先编码好的响应体：所在数据的命名空间 + 路由 + 规范化的参数
+
+    Args:
+        namespace: 响应数据所在的命名空间（随它一起失效）
+        endpoint: 路由端点名
+        view_args: 路径参数
+        args: 查询参数，已去掉不影响结果的参数并排序，见 response_cache.normalized_args
+    """
+    parts = ["resp", endpoint]
+    parts += [f"{name}={value}" for name, value in sorted((view_args or {}).items())]
+    if args:
+        parts.append("&".join(f"{name}={value}" for name, value in args))
+    return _cache(cache).key(namespace, *parts)
+
+
+# ---- 失效标签 ----
+
+def article_tag(article_id) -> str:
+    return f"article:{article_id}"
+
+
+def category_tag(category_id: Optional[int]) -> str:
+    return f"category:{category_id}"
+
+
+def question_tag(question_id) -> str:
+    return f"question:{question_id}"
+
+
+def tag_tag(tag_id) -> str:
+    return f"tag:{tag_id}"
@@ -0,0 +1,207 @@
+"""
+缓存指标
+BlogCache 按命名空间（categories、article、article_html、question_bank……）记录命中、未命中、错误、
+读写字节数以及读取和重建的耗时直方图。计数先累加在进程内，由后台线程定期用一个管道 HINCRBY 到
+Redis 的 blog:metrics:{命名空间} 哈希中，所有 worker 的计数在 Redis 中汇总。
+"""
+import time
+import threading
+from collections import Counter, defaultdict
+from datetime import datetime
+from typing import Dict, Any, Optional
+
+# 指标键前缀：blog:metrics:{命名空间} 为计数哈希
+METRICS_PREFIX = "blog:metrics:"
+# 出现过的命名空间集合、开始统计的时间
+METRICS_INDEX_KEY = "blog:metrics-index"
+METRICS_SINCE_KEY = "blog:metrics-since"
+# 耗时直方图的桶上界（毫秒），超过最后一个上界的计入 inf
+LATENCY_BUCKETS_MS = (0.5, 1, 2, 5, 10, 25, 50, 100, 250, 1000)
+# 记录耗时的操作：get 为读取（含反序列化），compute 为未命中后的重建
+LATENCY_KINDS = ("get", "compute")
+
+
+def namespace_of(key: str) -> str:
+    """缓存键所属的命名空间：blog:{命名空间}:... 取第二段；预先编码的响应体（blog:{命名空间}:v{代数}:resp:...）单独统计"""
+    parts = key.split(":", 4)
+    if len(parts) > 1 and parts[0] == "blog":
+        if len(parts) > 3 and parts[3] == "resp":
+            return f"{parts[1]}:resp"
+        return parts[1]
+    return "other"
+
+
+def _bucket_field(kind: str, seconds: float) -> str:
+    ms = seconds * 1000
+    for bound in LATENCY_BUCKETS_MS:
+        if ms <= bound:
+            return f"{kind}_le_{bound}"
+    return f"{kind}_le_inf"
+
+
+def _histogram(counters: Dict[str, int], kind: str) -> Dict[str, Any]:
+    """由桶计数估算平均值和分位数（取所在桶的上界）"""
+    count = counters.get(f"{kind}_count", 0)
+    # [{"le_ms": 上界, "count": 次数}]，最后一个桶的上界为 None（超过 1000ms）
+    buckets = [{"le_ms": bound, "count": counters.get(f"{kind}_le_{bound}", 0)} for bound in LATENCY_BUCKETS_MS]
+    buckets.append({"le_ms": None, "count": counters.get(f"{kind}_le_inf", 0)})
+    result = {"count": count, "buckets": buckets}
+    if not count:
+        return result
+
+    def percentile(ratio):
+        threshold = count * ratio
+        seen = 0
+        for bucket in buckets:
+            seen += bucket["count"]
+            if seen >= threshold:
+                return bucket["le_ms"]
+        return None
+
+    result.update(
+        avg_ms=round(counters.get(f"{kind}_us", 0) / count / 1000, 3),
+        p50_ms=percentile(0.5),
+        p95_ms=percentile(0.95),
+        p99_ms=percentile(0.99),
+    )
+    return result
+
+
+def summarize(counters: Dict[str, int]) -> Dict[str, Any]:
+    """一个命名空间的计数整理为统计结果"""
+    hits = counters.get("hits", 0)
+    misses = counters.get("misses", 0)
+    lookups = hits + misses
+    return {
+        "hits": hits,
+        "local_hits": counters.get("local_hits", 0),
+        "misses": misses,
+        "errors": counters.get("errors", 0),
+        "hit_ratio": round(hits / lookups, 4) if lookups else 0,
+        "bytes_read": counters.get("bytes_read", 0),
+        "bytes_written": counters.get("bytes_written", 0),
+        "writes": counters.get("writes", 0),
+        "latency": {kind: _histogram(counters, kind) for kind in LATENCY_KINDS},
+    }
+
+
+class CacheMetrics:
+    """按命名空间累加的缓存计数（进程内），定期写入 Redis 汇总"""
+
+    def __init__(self):
+        self._pending: Dict[str, Counter] = defaultdict(Counter)
+        self._lock = threading.Lock()
+        self.since = time.time()
+
+    def record_get(self, key: str, hit: bool, seconds: float, size: int = 0, local: bool = False):
+        """一次读取：命中（local 为一级缓存命中）或未命中，读取字节数和耗时"""
+        with self._lock:
+            counter = self._pending[namespace_of(key)]
+            if hit:
+                counter["hits"] += 1
+                counter["bytes_read"] += size
+                if local:
+                    counter["local_hits"] += 1
+            else:
+                counter["misses"] += 1
+            self._observe(counter, "get", seconds)
+
+    def record_hits(self, key: str, hit: bool, size: int = 0):
+        """批量读取中的一个键（批量读取的耗时不计入直方图）"""
+        with self._lock:
+            counter = self._pending[namespace_of(key)]
+            counter["hits" if hit else "misses"] += 1
+            counter["bytes_read"] += size
+
+    def record_write(self, key: str, size: int):
+        with self._lock:
+            counter = self._pending[namespace_of(key)]
+            counter["writes"] += 1
+            counter["bytes_written"] += size
+
+    def record_error(self, key: str):
+        with self._lock:
+            self._pending[namespace_of(key)]["errors"] += 1
+
+    def record_compute(self, key: str, seconds: float):
+        with self._lock:
+            self._observe(self._pending[namespace_of(key)], "compute", seconds)
+
+    @staticmethod
+    def _observe(counter: Counter, kind: str, seconds: float):
+        counter[f"{kind}_count"] += 1
+        counter[f"{kind}_us"] += int(seconds * 1_000_000)
+        counter[_bucket_field(kind, seconds)] += 1
+
+    def _take(self) -> Dict[str, Counter]:
+        with self._lock:
+            pending, self._pending = self._pending, defaultdict(Counter)
+        return pending
+
+    def _restore(self, pending: Dict[str, Counter]):
+        with self._lock:
+            for namespace, counter in pending.items():
+                self._pending[namespace].update(counter)
+
+    def flush(self, client) -> int:
+        """
+        把进程内的计数写入 Redis（一个管道），写入失败时放回，下次重试
+
+        Returns:
+            int: 写入的命名空间数
+        """
+        pending = self._take()
+        if not pending:
+            return 0
+        try:
+            pipe = client.pipeline(transaction=False)
+            pipe.set(METRICS_SINCE_KEY, int(self.since), nx=True)
+            pipe.sadd(METRICS_INDEX_KEY, *pending)
+            for namespace, counter in pending.items():
+                for field, value in counter.items():
+                    pipe.hincrby(f"{METRICS_PREFIX}{namespace}", field, value)
+            pipe.execute()
+        except Exception:
+            self._restore(pending)
+            raise
+        return len(pending)
+
+    def read(self, client) -> Dict[str, Any]:
+        """读取所有 worker 汇总后的计数"""
+        namespaces = sorted(client.smembers(METRICS_INDEX_KEY))
+        pipe = client.pipeline(transaction=False)
+        pipe.get(METRICS_SINCE_KEY)
+        for namespace in namespaces:
+            pipe.hgetall(f"{METRICS_PREFIX}{namespace}")
+        since, *hashes = pipe.execute()
+        return self._report(
+            "cluster",
+            float(since) if since else self.since,
+            {namespace: {field: int(value) for field, value in counters.items()}
+             for namespace, counters in zip(namespaces, hashes)},
+        )
+
+    def read_local(self) -> Dict[str, Any]:
+        """只有本进程尚未写入 Redis 的计数（Redis 不可用时使用）"""
+        with self._lock:
+            counters = {namespace: dict(counter) for namespace, counter in self._pending.items()}
+        return self._report("worker", self.since, counters)
+
+    @staticmethod
+    def _report(scope: str, since: float, counters: Dict[str, Dict[str, int]]) -> Dict[str, Any]:
+        return {
+            "scope": scope,
+            "since": datetime.fromtimestamp(since).isoformat(),
+            "namespaces": {namespace: summarize(values) for namespace, values in sorted(counters.items())},
+        }
+
+    def reset(self, client: Optional[Any] = None):
+        """清零（其他 worker 尚未写入的计数会在它们下一次写入时计入）"""
+        self._take()
+        self.since = time.time()
+        if client is None:
+            return
+        namespaces = client.smembers(METRICS_INDEX_KEY)
+        keys = [f"{METRICS_PREFIX}{namespace}" for namespace in namespaces]
+        client.delete(METRICS_INDEX_KEY, *keys)
+        client.set(METRICS_SINCE_KEY, int(self.since))
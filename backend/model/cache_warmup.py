@@ -0,0 +1,186 @@
+"""
+缓存预热
+从数据库取出读者最先访问的数据写入缓存：博客分类树、题库分类树、浏览量最高的 N 篇文章详情（含渲染后的 HTML）、
+全部文章及每个分类的文章列表第一页。先用一次 MGET 找出不在缓存中（或已软过期）的键，只并发构建这些，
+再用一个管道全部写入。
+应用启动时在后台执行一次，之后按 CACHE_WARMUP_INTERVAL 定时执行；多个 worker 同时触发时通过 Redis 锁只执行一次。
+"""
+import time
+import logging
+import threading
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, Any, List, Optional, Tuple
+
+from apscheduler.schedulers.background import BackgroundScheduler
+
+from model import cache_keys
+from model.blog_cache import get_cache
+from model.cache_backends import LOCK_PREFIX
+from model.database import Article, BlogCategory
+
+logger = logging.getLogger("rss_app")
+
+# 多个 worker 之间互斥的预热锁
+WARMUP_LOCK_KEY = f"{LOCK_PREFIX}warmup"
+# 最近一次预热报告（所有 worker 共享，缓存统计接口中展示）
+WARMUP_REPORT_KEY = "blog:warmup:report"
+# 文章列表第一页的每页数量（与前端默认值一致）
+LIST_PAGE_SIZE = 20
+
+_scheduler: Optional[BackgroundScheduler] = None
+_last_report: Optional[Dict[str, Any]] = None
+_run_lock = threading.Lock()
+
+
+# 预热项：(名称, 缓存键, 构建函数, ttl, 标签)
+Task = Tuple[str, str, Callable, int, Any]
+
+
+def _detail_tasks(cache, top_n: int) -> List[Task]:
+    """浏览量最高的 N 篇文章详情"""
+    # 延迟导入：路由模块导入时会用到缓存
+    from routes.blog import build_article_detail, article_dependency_tags
+
+    details = []
+    article_ids = [
+        article_id for article_id, in Article.query.with_entities(Article.id)
+        .order_by(Article.view_count.desc(), Article.id).limit(top_n)
+    ]
+    for article_id in article_ids:
+        details.append((
+            f"article:{article_id}",
+            cache_keys.article_key(article_id, cache),
+            lambda article_id=article_id: build_article_detail(article_id),
+            14400,
+            article_dependency_tags,
+        ))
+    return details
+
+
+def _list_tasks(cache) -> List[Task]:
+    """分类树和文章列表第一页"""
+    from routes.blog import build_category_list, build_article_page
+    from routes.question_bank import build_category_tree
+
+    lists = [
+        ("blog_categories", cache_keys.blog_categories_key(cache), build_category_list, 7200, None),
+        ("question_bank_categories", cache_keys.question_bank_categories_key(cache), build_category_tree, 300, None),
+    ]
+    category_ids = [None] + [category_id for category_id, in BlogCategory.query.with_entities(BlogCategory.id)]
+    for category_id in category_ids:
+        lists.append((
+            f"articles:{category_id or 'all'}",
+            cache_keys.article_page_key(category_id, "", 1, LIST_PAGE_SIZE, cache),
+            lambda category_id=category_id: build_article_page(category_id, "", "", 1, LIST_PAGE_SIZE),
+            cache.cache_ttl["articles"],
+            None,
+        ))
+    return lists
+
+
+def warm_up(app, trigger: str = "manual") -> Dict[str, Any]:
+    """
+    执行一次预热
+
+    Args:
+        app: Flask 应用
+        trigger: 触发来源（startup / schedule / manual），写入报告
+
+    Returns:
+        Dict: 预热报告（耗时、写入键数、已在缓存中的键数、失败项）
+    """
+    global _last_report
+    if not _run_lock.acquire(blocking=False):
+        return {"success": False, "trigger": trigger, "message": "预热正在进行中"}
+    try:
+        with app.app_context():
+            cache = get_cache()
+            lock_ttl_ms = int(app.config.get("CACHE_WARMUP_LOCK_TTL", 300)) * 1000
+            token = cache.backend.acquire_lock(WARMUP_LOCK_KEY, lock_ttl_ms)
+            if token is None:
+                return {"success": False, "trigger": trigger, "message": "其他 worker 正在预热"}
+            try:
+                report = _run(app, cache, trigger)
+            finally:
+                cache.backend.release_lock(WARMUP_LOCK_KEY, token)
+            cache.set(WARMUP_REPORT_KEY, report)
+        _last_report = report
+        return report
+    except Exception as e:
+        logger.error(f"缓存预热失败: {e}", exc_info=True)
+        return {"success": False, "trigger": trigger, "message": f"缓存预热失败: {e}"}
+    finally:
+        _run_lock.release()
+
+
+def _run(app, cache, trigger: str) -> Dict[str, Any]:
+    start = time.perf_counter()
+    top_n = int(app.config.get("CACHE_WARMUP_TOP_ARTICLES", 50))
+    tasks = _detail_tasks(cache, top_n) + _list_tasks(cache)
+    cached = cache.get_many([task[1] for task in tasks], fresh_only=True)
+    missing = [task for task in tasks if task[1] not in cached]
+
+    def build_task(task):
+        name, key, build, ttl, tags = task
+        # 文章详情中的 Mermaid 图地址需要 url_for，在请求上下文中构建
+        with app.test_request_context():
+            value = build()
+            return value, tags(value) if callable(tags) else tags
+
+    values, ttls, key_tags, failed = {}, {}, {}, []
+    workers = max(1, int(app.config.get("CACHE_WARMUP_WORKERS", 4)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="cache-warmup") as executor:
+        futures = {executor.submit(build_task, task): task for task in missing}
+        for future in as_completed(futures):
+            name, key, _, ttl, _ = futures[future]
+            try:
+                value, tags = future.result()
+            except Exception as e:
+                logger.warning(f"预热 {name} 失败: {e}")
+                failed.append(name)
+                continue
+            if value is None:
+                continue
+            values[key], ttls[key] = value, ttl
+            if tags:
+                key_tags[key] = tags
+    warmed = cache.set_many(values, ttls, key_tags, refresh_ahead=True)
+    already_cached = len(tasks) - len(missing)
+
+    report = {
+        "success": not failed,
+        "trigger": trigger,
+        "finished_at": datetime.now().isoformat(),
+        "duration_seconds": round(time.perf_counter() - start, 3),
+        "keys_warmed": warmed,
+        "already_cached": already_cached,
+        "failed": failed,
+        "tasks": len(tasks),
+    }
+    logger.info(
+        f"缓存预热完成（{trigger}）: 写入 {warmed} 个键，{already_cached} 个已在缓存中，"
+        f"失败 {len(failed)} 项，耗时 {report['duration_seconds']} 秒"
+    )
+    return report
+
+
+def get_last_report() -> Optional[Dict[str, Any]]:
+    """最近一次预热报告（可能由其他 worker 执行；缓存不可用时取当前进程的）"""
+    return get_cache().get(WARMUP_REPORT_KEY) or _last_report
+
+
+def init_cache_warmup(app):
+    """启动后台预热：启动时执行一次，之后每 CACHE_WARMUP_INTERVAL 秒执行一次（0 为只在启动时执行）"""
+    global _scheduler
+    if not app.config.get("CACHE_WARMUP_ENABLED", True) or _scheduler is not None:
+        return
+    interval = int(app.config.get("CACHE_WARMUP_INTERVAL", 1800))
+    _scheduler = BackgroundScheduler(daemon=True)
+    _scheduler.add_job(warm_up, "date", args=[app, "startup"], id="cache-warmup-startup")
+    if interval > 0:
+        _scheduler.add_job(
+            warm_up, "interval", seconds=interval, args=[app, "schedule"], id="cache-warmup",
+            max_instances=1, coalesce=True,
+        )
+    _scheduler.start()
@@ -4,6 +4,7 @@
 """
 from flask_sqlalchemy import SQLAlchemy
 from datetime import datetime
+import json
 import pytz
 
 db = SQLAlchemy()
@@ -205,6 +206,13 @@ class Article(db.Model):
     view_count = db.Column(db.Integer, default=0)
     order = db.Column(db.Integer, default=999999)
     
+    # 写入时预渲染的结果（见 render.engine.render）
+    html_content = db.Column(db.Text)  # 渲染后的HTML
+    headings = db.Column(db.Text)  # 标题大纲（JSON）
+    content_hash = db.Column(db.String(32))  # 渲染时content的md5
+    word_count = db.Column(db.Integer, default=0)
+    reading_time = db.Column(db.Integer, default=0)  # 阅读时间（分钟）
+    
     # 关系
     category = db.relationship('BlogCategory', backref='articles', lazy='select')
     tags = db.relationship('Tag', secondary='article_tags', backref='articles', lazy='dynamic')
@@ -237,6 +245,18 @@ class Article(db.Model):
         if include_content:
             data['content'] = self.content
         return data
+    
+    def apply_render_result(self, result):
+        """保存渲染结果（RenderResult）到当前行"""
+        self.html_content = result.html
+        self.headings = json.dumps(result.headings, ensure_ascii=False)
+        self.content_hash = result.content_hash
+        self.word_count = result.word_count
+        self.reading_time = result.reading_time
+    
+    def get_headings(self):
+        """获取标题大纲列表"""
+        return json.loads(self.headings) if self.headings else []
 
 
 # 博客分类表（树形结构）
@@ -47,6 +47,33 @@ def init_admin_user():
     return admin_user
 
 
+# 后续版本新增的列（SQLite 的 create_all 不会给已存在的表补列）
+ADDED_COLUMNS = {
+    'articles': [
+        ('html_content', 'TEXT'),
+        ('headings', 'TEXT'),
+        ('content_hash', 'VARCHAR(32)'),
+        ('word_count', 'INTEGER DEFAULT 0'),
+        ('reading_time', 'INTEGER DEFAULT 0'),
+    ],
+}
+
+
+def upgrade_schema():
+    """为已存在的表补齐新增列"""
+    inspector = db.inspect(db.engine)
+    existing_tables = inspector.get_table_names()
+    with db.engine.begin() as conn:
+        for table, columns in ADDED_COLUMNS.items():
+            if table not in existing_tables:
+                continue
+            existing = {col['name'] for col in inspector.get_columns(table)}
+            for name, ddl in columns:
+                if name not in existing:
+                    conn.execute(db.text(f'ALTER TABLE "{table}" ADD COLUMN {name} {ddl}'))
+                    print(f"✅ 已为 {table} 表添加列 {name}")
+
+
 def get_china_time():
     """获取北京时间"""
     return datetime.now(pytz.timezone("Asia/Shanghai"))
@@ -69,6 +96,7 @@ def init_database(app):
     with app.app_context():
         # 创建所有表
         db.create_all()
+        upgrade_schema()
         
         # 初始化管理员用户（如果不存在）
         init_admin_user()
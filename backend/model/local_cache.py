@@ -0,0 +1,110 @@
+"""
+进程内缓存
+线程安全的 LRU 缓存，同时按条目数和字节数限制，条目带过期时间。
+作为 BlogCache 的一级缓存，命中时既不访问 Redis 也不需要反序列化。
+"""
+import time
+import fnmatch
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+
+
+class LocalCache:
+    """带 TTL 的进程内 LRU 缓存"""
+
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 64 * 1024 * 1024, default_ttl: int = 60):
+        """
+        Args:
+            max_entries: 最大条目数
+            max_bytes: 所有条目（按序列化后大小计）的总字节数上限
+            default_ttl: 默认过期时间（秒）
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        # key -> (value, size, expires_at)
+        self._data: "OrderedDict[str, Tuple[Any, int, float]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        """读取缓存，过期条目视为不存在（返回的对象与缓存共享，调用方不要修改）"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, size, expires_at = entry
+            if expires_at <= time.monotonic():
+                self._remove(key)
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value: Any, size: int, ttl: Optional[int] = None):
+        """
+        写入缓存
+
+        Args:
+            size: 条目大小（字节），用于总量限制
+            ttl: 过期时间（秒），不超过 default_ttl
+        """
+        ttl = min(ttl or self.default_ttl, self.default_ttl)
+        if ttl <= 0 or size > self.max_bytes:
+            return
+        with self._lock:
+            self._remove(key)
+            self._data[key] = (value, size, time.monotonic() + ttl)
+            self._bytes += size
+            while self._data and (len(self._data) > self.max_entries or self._bytes > self.max_bytes):
+                _, (_, evicted_size, _) = self._data.popitem(last=False)
+                self._bytes -= evicted_size
+
+    def _remove(self, key: str) -> bool:
+        entry = self._data.pop(key, None)
+        if entry is None:
+            return False
+        self._bytes -= entry[1]
+        return True
+
+    def delete(self, key: str) -> bool:
+        with self._lock:
+            return self._remove(key)
+
+    def delete_pattern(self, pattern: str) -> int:
+        """按通配符模式删除（与 Redis KEYS 的 * ? [] 语义一致）"""
+        with self._lock:
+            keys = [key for key in self._data if fnmatch.fnmatchcase(key, pattern)]
+            for key in keys:
+                self._remove(key)
+            return len(keys)
+
+    def count(self, pattern: str = "*") -> int:
+        """匹配模式的条目数（含尚未清理的过期条目）"""
+        with self._lock:
+            if pattern == "*":
+                return len(self._data)
+            return sum(1 for key in self._data if fnmatch.fnmatchcase(key, pattern))
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def info(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._data),
+            "bytes": self._bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "ttl": self.default_ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 4) if total else 0,
+        }
@@ -1,20 +1,15 @@
-import redis
 import json
 import pytz
 from datetime import datetime
 
+from model.redis_pool import init_redis_pool, get_redis
+
 # Redis 连接配置
 
 
 def init_redis(app):
-    global redis_conn
-    redis_conn = redis.Redis(
-        host=app.config["REDIS_HOST"],
-        port=app.config["REDIS_PORT"],
-        db=app.config["REDIS_DB"],
-        password=app.config.get("REDIS_PASSWORD", None),
-        decode_responses=True,
-    )
+    """读取 Redis 连接池配置；各进程在第一次使用时创建自己的连接池（见 model.redis_pool）"""
+    init_redis_pool(app)
 
 
 # 全局键名常量
@@ -41,7 +36,7 @@ class User:
     @classmethod
     def create(cls, openid, nickname, avatar_url, role="user"):
         """创建新用户"""
-        user_id = redis_conn.incr(USER_ID_SEQ)
+        user_id = get_redis().incr(USER_ID_SEQ)
         user_data = {
             "id": user_id,
             "openid": openid,
@@ -52,7 +47,7 @@ class User:
             "last_login": get_china_time(),
         }
 
-        pipeline = redis_conn.pipeline()
+        pipeline = get_redis().pipeline()
         pipeline.hset(f"user:{user_id}", mapping=user_data)
         pipeline.set(f"user:openid:{openid}", user_id)
         pipeline.execute()
@@ -61,7 +56,7 @@ class User:
     @classmethod
     def get(cls, user_id):
         """根据ID获取用户对象"""
-        user_data = redis_conn.hgetall(f"user:{user_id}")
+        user_data = get_redis().hgetall(f"user:{user_id}")
         if user_data:
             # 转换数据类型
             user_data["id"] = int(user_data["id"])
@@ -76,7 +71,7 @@ class User:
     @classmethod
     def getAll(self):
         users = []
-        for key in redis_conn.scan_iter("user:*"):
+        for key in get_redis().scan_iter("user:*"):
             if key.count(":") == 1:
                 user_id = key.split(":")[1]
                 user = User.get(user_id)
@@ -99,14 +94,14 @@ class User:
         user = User.get(user_id)
         if user:
             user.role = role
-            pipeline = redis_conn.pipeline()
+            pipeline = get_redis().pipeline()
             pipeline.hset(f"user:{user_id}", mapping=user)
         return user
 
     @classmethod
     def get_by_openid(cls, openid):
         """通过openid获取用户"""
-        user_id = redis_conn.get(f"user:openid:{openid}")
+        user_id = get_redis().get(f"user:openid:{openid}")
         return cls.get(user_id) if user_id else None
 
 
@@ -114,7 +109,7 @@ class UserToken:
     @classmethod
     def create(cls, user_id, token, expires_at):
         """创建用户令牌"""
-        pipeline = redis_conn.pipeline()
+        pipeline = get_redis().pipeline()
         pipeline.hset(
             f"token:{token}",
             mapping={
@@ -130,14 +125,14 @@ class UserToken:
     @classmethod
     def get(cls, token):
         """获取令牌详情"""
-        return redis_conn.hgetall(f"token:{token}")
+        return get_redis().hgetall(f"token:{token}")
 
 
 class HistoryRecord:
     @classmethod
     def create(cls, user_id, article_id, style, image_urls):
         """创建历史记录"""
-        history_id = redis_conn.incr(HISTORY_ID_SEQ)
+        history_id = get_redis().incr(HISTORY_ID_SEQ)
         record_data = {
             "id": history_id,
             "user_id": user_id,
@@ -148,7 +143,7 @@ class HistoryRecord:
             "is_deleted": "0",
         }
 
-        pipeline = redis_conn.pipeline()
+        pipeline = get_redis().pipeline()
         pipeline.hset(f"history:{history_id}", mapping=record_data)
         pipeline.zadd(
             f"user:{user_id}:history", {history_id: datetime.now().timestamp()}
@@ -159,15 +154,16 @@ class HistoryRecord:
     @classmethod
     def get_user_history(cls, user_id):
         """获取用户历史记录"""
-        history_ids = redis_conn.zrevrange(f"user:{user_id}:history", 0, -1)
-        return [redis_conn.hgetall(f"history:{hid}") for hid in history_ids]
+        client = get_redis()
+        history_ids = client.zrevrange(f"user:{user_id}:history", 0, -1)
+        return [client.hgetall(f"history:{hid}") for hid in history_ids]
 
 
 class Feedback:
     @classmethod
     def create(cls, user_id, content, contact=None):
         """创建反馈记录"""
-        feedback_id = redis_conn.incr(FEEDBACK_ID_SEQ)
+        feedback_id = get_redis().incr(FEEDBACK_ID_SEQ)
         feedback_data = {
             "id": feedback_id,
             "user_id": user_id,
@@ -176,7 +172,7 @@ class Feedback:
             "created_at": get_china_time(),
         }
 
-        pipeline = redis_conn.pipeline()
+        pipeline = get_redis().pipeline()
         pipeline.hset(f"feedback:{feedback_id}", mapping=feedback_data)
         pipeline.sadd(f"user:{user_id}:feedbacks", feedback_id)
         pipeline.execute()
@@ -188,7 +184,7 @@ class UserStatistics:
     def update_stats(cls, date, stats_data):
         """更新用户统计信息"""
         key = f"stats:{date.isoformat()}"
-        pipeline = redis_conn.pipeline()
+        pipeline = get_redis().pipeline()
         pipeline.hincrby(
             key, "total_generations", stats_data.get("total_generations", 0)
         )
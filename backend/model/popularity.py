@@ -0,0 +1,244 @@
+"""
+文章和分类热度
+每次阅读时（与浏览量计数在同一个 Redis 管道中）：
+- 热度有序集合各 ZINCRBY 1：popular（半衰期 POPULARITY_HALF_LIFE_HOURS）和 trending（半衰期 TRENDING_HALF_LIFE_HOURS），
+  文章一份，文章所在分类及其所有上级分类一份；
+- HyperLogLog 记录文章和分类的独立读者（IP + User-Agent 的摘要）；
+- 当前小时的阅读数计入 blog:pop:hour:{小时}:{article|category}，保留 POPULARITY_ROLLUP_HOURS 小时。
+每小时的汇总任务按距上次衰减经过的时间把热度整体乘以 2^(-小时数/半衰期)（ZUNIONSTORE WEIGHTS），
+把最近 24 小时的小时计数合并为 blog:pop:24h:{article|category}，并使分类树缓存失效以更新精选/热门标记。
+排行读取为 ZREVRANGE，O(log n + k)。Redis 不可用时不记录，排行由调用方改用数据库中的浏览量。
+"""
+import time
+import hashlib
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional, Tuple
+
+from apscheduler.schedulers.background import BackgroundScheduler
+from flask import current_app, has_request_context, request
+
+from model.blog_cache import get_cache
+from model.cache_backends import LOCK_PREFIX
+from model.database import Article, BlogCategory
+
+logger = logging.getLogger("rss_app")
+
+PREFIX = "blog:pop:"
+# 热度种类：popular 为长期热度，trending 为近期热度（半衰期短）
+KINDS = ("popular", "trending")
+ENTITIES = ("article", "category")
+# 上次衰减的时间、上次汇总的小时
+DECAYED_AT_KEY = f"{PREFIX}decayed-at"
+ROLLUP_HOUR_KEY = f"{PREFIX}rollup-hour"
+ROLLUP_LOCK_KEY = f"{LOCK_PREFIX}popularity-rollup"
+ROLLUP_LOCK_TTL_MS = 5 * 60 * 1000
+# 衰减后低于该值的成员移出有序集合
+MIN_SCORE = 0.01
+# 文章 -> 分类链的进程内映射的刷新间隔（秒）
+CATEGORY_MAP_TTL = 600
+
+_category_chains: Dict[int, List[int]] = {}
+_category_chains_loaded_at = 0.0
+_category_lock = threading.Lock()
+_scheduler: Optional[BackgroundScheduler] = None
+
+
+def score_key(kind: str, entity: str) -> str:
+    return f"{PREFIX}{kind}:{entity}"
+
+
+def hour_key(entity: str, hour: datetime) -> str:
+    return f"{PREFIX}hour:{hour:%Y%m%d%H}:{entity}"
+
+
+def day_key(entity: str) -> str:
+    return f"{PREFIX}24h:{entity}"
+
+
+def readers_key(entity: str, entity_id: int) -> str:
+    return f"{PREFIX}readers:{entity}:{entity_id}"
+
+
+def _reader_id() -> Optional[str]:
+    """读者标识：客户端 IP（经过代理时取 X-Forwarded-For 第一个）+ User-Agent 的摘要"""
+    if not has_request_context():
+        return None
+    forwarded = request.headers.get("X-Forwarded-For", "")
+    ip = forwarded.split(",")[0].strip() or request.remote_addr or ""
+    agent = request.headers.get("User-Agent", "")
+    return hashlib.md5(f"{ip}|{agent}".encode()).hexdigest()[:16]
+
+
+def _load_category_chains() -> Dict[int, List[int]]:
+    """文章 id -> [所在分类, 上级分类, ...]"""
+    parents = dict(BlogCategory.query.with_entities(BlogCategory.id, BlogCategory.parent_id))
+    chains = {}
+    for article_id, category_id in Article.query.with_entities(Article.id, Article.category_id):
+        chain = []
+        while category_id is not None and category_id in parents and category_id not in chain:
+            chain.append(category_id)
+            category_id = parents[category_id]
+        chains[article_id] = chain
+    return chains
+
+
+def category_chain(article_id: int) -> List[int]:
+    """文章所在分类及其上级分类（进程内映射，过期或遇到新文章时从数据库重新加载）"""
+    global _category_chains, _category_chains_loaded_at
+    now = time.monotonic()
+    expired = now - _category_chains_loaded_at > CATEGORY_MAP_TTL
+    if expired or article_id not in _category_chains:
+        with _category_lock:
+            # 新文章最多每分钟触发一次重新加载
+            if now - _category_chains_loaded_at > (CATEGORY_MAP_TTL if article_id in _category_chains else 60):
+                _category_chains = _load_category_chains()
+                _category_chains_loaded_at = now
+    return _category_chains.get(article_id, [])
+
+
+def queue_view(pipe, article_id: int):
+    """把一次阅读的热度更新加入管道（由 view_counter.record_view 与浏览量计数一起执行）"""
+    reader = _reader_id()
+    hour = datetime.now()
+    retention = int(current_app.config.get("POPULARITY_ROLLUP_HOURS", 168)) * 3600
+    targets = [("article", article_id)] + [("category", category_id) for category_id in category_chain(article_id)]
+    for entity, entity_id in targets:
+        for kind in KINDS:
+            pipe.zincrby(score_key(kind, entity), 1, entity_id)
+        pipe.zincrby(hour_key(entity, hour), 1, entity_id)
+        if reader:
+            pipe.pfadd(readers_key(entity, entity_id), reader)
+    for entity in ENTITIES:
+        pipe.expire(hour_key(entity, hour), retention)
+
+
+def _client():
+    return get_cache().redis_client
+
+
+def top(kind: str, entity: str, limit: int) -> Optional[List[Tuple[int, float]]]:
+    """
+    热度最高的前 limit 个
+
+    Returns:
+        List: [(id, 热度)]；Redis 不可用时为 None
+    """
+    client = _client()
+    if client is None:
+        return None
+    try:
+        items = client.zrevrange(score_key(kind, entity), 0, limit - 1, withscores=True)
+    except Exception as e:
+        logger.warning(f"读取热度排行失败: {e}")
+        return None
+    return [(int(member), score) for member, score in items if score > 0]
+
+
+def scores(kind: str, entity: str, ids: List[int]) -> Optional[Dict[int, float]]:
+    """指定成员的热度（没有阅读记录的为 0）；Redis 不可用时为 None"""
+    client = _client()
+    if client is None:
+        return None
+    try:
+        pipe = client.pipeline(transaction=False)
+        for entity_id in ids:
+            pipe.zscore(score_key(kind, entity), entity_id)
+        values = pipe.execute()
+    except Exception as e:
+        logger.warning(f"读取热度失败: {e}")
+        return None
+    return {entity_id: value or 0 for entity_id, value in zip(ids, values)}
+
+
+def details(entity: str, ids: List[int]) -> Dict[int, Dict[str, int]]:
+    """最近 24 小时阅读数（按小时汇总，每小时更新）和独立读者数"""
+    client = _client()
+    if client is None or not ids:
+        return {}
+    try:
+        pipe = client.pipeline(transaction=False)
+        for entity_id in ids:
+            pipe.zscore(day_key(entity), entity_id)
+            pipe.pfcount(readers_key(entity, entity_id))
+        values = pipe.execute()
+    except Exception as e:
+        logger.warning(f"读取阅读统计失败: {e}")
+        return {}
+    return {
+        entity_id: {"views_24h": int(values[2 * i] or 0), "unique_readers": values[2 * i + 1]}
+        for i, entity_id in enumerate(ids)
+    }
+
+
+def _half_lives(app) -> Dict[str, float]:
+    return {
+        "popular": float(app.config.get("POPULARITY_HALF_LIFE_HOURS", 72)),
+        "trending": float(app.config.get("TRENDING_HALF_LIFE_HOURS", 6)),
+    }
+
+
+def _rollup(app, client, now: datetime) -> Dict[str, Any]:
+    timestamp = now.timestamp()
+    last = client.get(DECAYED_AT_KEY)
+    elapsed_hours = max(0.0, (timestamp - float(last)) / 3600) if last else 0.0
+    pipe = client.pipeline(transaction=True)
+    for kind, half_life in _half_lives(app).items():
+        factor = 0.5 ** (elapsed_hours / half_life)
+        for entity in ENTITIES:
+            key = score_key(kind, entity)
+            if elapsed_hours:
+                pipe.zunionstore(key, {key: factor})
+            pipe.zremrangebyscore(key, "-inf", f"({MIN_SCORE}")
+    pipe.set(DECAYED_AT_KEY, timestamp)
+    hours = [now - timedelta(hours=offset) for offset in range(24)]
+    for entity in ENTITIES:
+        pipe.zunionstore(day_key(entity), [hour_key(entity, hour) for hour in hours])
+    pipe.execute()
+    return {"decayed_hours": round(elapsed_hours, 3)}
+
+
+def rollup(app, force: bool = False) -> Dict[str, Any]:
+    """
+    每小时的汇总：热度衰减、合并最近 24 小时的阅读数、更新分类树中的精选/热门标记
+    多个 worker 的调度同时触发时通过 Redis 锁和已汇总的小时只执行一次
+
+    Args:
+        force: 本小时已汇总过也再执行
+    """
+    with app.app_context():
+        cache = get_cache()
+        client = cache.redis_client
+        if client is None:
+            return {"success": False, "message": "Redis不可用，跳过热度汇总"}
+        try:
+            token = cache.backend.acquire_lock(ROLLUP_LOCK_KEY, ROLLUP_LOCK_TTL_MS)
+            if token is None:
+                return {"success": False, "message": "其他 worker 正在汇总"}
+            try:
+                now = datetime.now()
+                hour = f"{now:%Y%m%d%H}"
+                if not force and client.get(ROLLUP_HOUR_KEY) == hour:
+                    return {"success": True, "message": "本小时已汇总"}
+                report = _rollup(app, client, now)
+                client.set(ROLLUP_HOUR_KEY, hour)
+            finally:
+                cache.backend.release_lock(ROLLUP_LOCK_KEY, token)
+            # 分类树中的精选/热门标记和浏览量随之更新
+            cache.bump_namespaces("categories")
+            logger.info(f"热度汇总完成: 衰减 {report['decayed_hours']} 小时")
+            return dict(report, success=True, hour=hour)
+        except Exception as e:
+            logger.error(f"热度汇总失败: {e}", exc_info=True)
+            return {"success": False, "message": f"热度汇总失败: {e}"}
+
+
+def init_popularity(app):
+    """每小时第 1 分钟执行汇总"""
+    global _scheduler
+    if _scheduler is not None:
+        return
+    _scheduler = BackgroundScheduler(daemon=True)
+    _scheduler.add_job(rollup, "cron", minute=1, args=[app], id="popularity-rollup", max_instances=1, coalesce=True)
+    _scheduler.start()
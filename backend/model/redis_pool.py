@@ -0,0 +1,116 @@
+"""
+Redis 连接池
+每个进程一个按配置创建的连接池：gunicorn fork 之后在 worker 中第一次使用时才创建，不继承父进程的连接。
+model.models、BlogCache 等所有 Redis 使用者都通过 get_redis() 取客户端，共用同一个池和同一套超时设置。
+"""
+import os
+import socket
+import logging
+import threading
+from typing import Dict, Any, Optional
+
+import redis
+
+logger = logging.getLogger("rss_app")
+
+_settings: Dict[str, Any] = {}
+_pool: Optional[redis.ConnectionPool] = None
+_pool_pid: Optional[int] = None
+_pool_lock = threading.Lock()
+
+
+def init_redis_pool(app):
+    """读取连接池配置（应用启动时调用；连接池本身在各进程第一次使用时创建）"""
+    global _pool, _pool_pid
+    config = app.config
+    _settings.update(
+        host=config.get("REDIS_HOST", "localhost"),
+        port=int(config.get("REDIS_PORT", 6379)),
+        db=int(config.get("REDIS_DB", 0)),
+        password=config.get("REDIS_PASSWORD") or None,
+        unix_socket=config.get("REDIS_UNIX_SOCKET") or None,
+        max_connections=int(config.get("REDIS_MAX_CONNECTIONS", 50)),
+        pool_timeout=float(config.get("REDIS_POOL_TIMEOUT", 5)),
+        socket_timeout=float(config.get("REDIS_SOCKET_TIMEOUT", 5)),
+        socket_connect_timeout=float(config.get("REDIS_SOCKET_CONNECT_TIMEOUT", 5)),
+        health_check_interval=int(config.get("REDIS_HEALTH_CHECK_INTERVAL", 30)),
+        socket_keepalive=bool(config.get("REDIS_SOCKET_KEEPALIVE", True)),
+    )
+    # 配置变化后（如测试中重新初始化）下次使用时重建
+    _pool = None
+    _pool_pid = None
+
+
+def _keepalive_options() -> Dict[int, int]:
+    """TCP keepalive 参数：空闲 60 秒后开始探测，间隔 10 秒，3 次无响应断开（平台不支持的选项跳过）"""
+    options = {}
+    for name, value in (("TCP_KEEPIDLE", 60), ("TCP_KEEPINTVL", 10), ("TCP_KEEPCNT", 3)):
+        if hasattr(socket, name):
+            options[getattr(socket, name)] = value
+    return options
+
+
+def _create_pool() -> redis.ConnectionPool:
+    settings = _settings or {"host": "localhost", "port": 6379, "db": 0}
+    kwargs = {
+        "db": settings.get("db", 0),
+        "password": settings.get("password"),
+        "decode_responses": True,
+        "socket_timeout": settings.get("socket_timeout", 5),
+        "socket_connect_timeout": settings.get("socket_connect_timeout", 5),
+        "health_check_interval": settings.get("health_check_interval", 30),
+    }
+    if settings.get("unix_socket"):
+        # 与 Redis 同机部署时走 unix socket，省去 TCP 开销
+        kwargs.update(connection_class=redis.UnixDomainSocketConnection, path=settings["unix_socket"])
+    else:
+        kwargs.update(host=settings.get("host", "localhost"), port=settings.get("port", 6379))
+        if settings.get("socket_keepalive", True):
+            kwargs.update(socket_keepalive=True, socket_keepalive_options=_keepalive_options())
+    # 连接用尽时等待 pool_timeout 秒而不是立即报错
+    return redis.BlockingConnectionPool(
+        max_connections=settings.get("max_connections", 50),
+        timeout=settings.get("pool_timeout", 5),
+        **kwargs,
+    )
+
+
+def get_redis_pool() -> redis.ConnectionPool:
+    """当前进程的连接池（fork 后首次调用时创建）"""
+    global _pool, _pool_pid
+    if _pool is not None and _pool_pid == os.getpid():
+        return _pool
+    with _pool_lock:
+        if _pool is None or _pool_pid != os.getpid():
+            _pool = _create_pool()
+            _pool_pid = os.getpid()
+            logger.debug(f"进程 {_pool_pid} 创建 Redis 连接池")
+    return _pool
+
+
+def get_redis() -> redis.Redis:
+    """使用当前进程连接池的 Redis 客户端（decode_responses=True）"""
+    return redis.Redis(connection_pool=get_redis_pool())
+
+
+def pool_stats() -> Dict[str, Any]:
+    """当前进程连接池的使用情况"""
+    if _pool is None or _pool_pid != os.getpid():
+        return {"pid": os.getpid(), "created": 0}
+    pool = _pool
+    try:
+        created = len(pool._connections)
+        idle = sum(1 for connection in list(pool.pool.queue) if connection is not None)
+    except AttributeError:
+        # 非 BlockingConnectionPool 或 redis-py 内部结构变化
+        return {"pid": os.getpid(), "max_connections": pool.max_connections}
+    in_use = created - idle
+    return {
+        "pid": os.getpid(),
+        "transport": "unix" if _settings.get("unix_socket") else "tcp",
+        "max_connections": pool.max_connections,
+        "created": created,
+        "in_use": in_use,
+        "idle": idle,
+        "utilization": round(in_use / pool.max_connections, 4) if pool.max_connections else 0,
+    }
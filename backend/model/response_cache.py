@@ -0,0 +1,231 @@
+"""
+响应缓存
+保存接口最终输出的 JSON 字节（超过阈值时预先 gzip 压缩），按路由 + 规范化的查询参数索引。
+命中时直接把字节作为响应体返回，不反序列化也不再 jsonify；客户端不接受 gzip 时才解压。
+响应键带有数据所在命名空间的代数并登记相同的失效标签，与数据缓存同时失效。
+
+每个响应带强 ETag（响应体的 MD5，gzip 压缩的表示加 -gzip 后缀）和 Last-Modified。
+ETag 等校验信息另存一份小条目（{响应键}:meta），条件请求只读这一小条目即可返回 304，
+不读取响应体，也不访问数据库。
+"""
+import gzip
+import hashlib
+from datetime import datetime, timezone
+from typing import Any, Iterable, List, Optional, Tuple
+
+import pytz
+from flask import current_app, request
+
+from model import cache_keys
+from model.blog_cache import get_cache
+
+# 条目格式：1 字节标志 + 校验信息行（"ETag 最后修改时间戳\n"）+ 响应体
+FLAG_IDENTITY = b"\x00"
+FLAG_GZIP = b"\x01"
+# 校验信息条目的键后缀
+META_SUFFIX = ":meta"
+# 不影响响应内容的查询参数（前端防缓存的时间戳等）
+IGNORED_ARGS = {"_", "t", "ts", "timestamp", "clear_cache"}
+# 数据库中的时间为北京时间（不带时区）
+CHINA_TZ = pytz.timezone("Asia/Shanghai")
+
+
+def normalized_args(ignore: Iterable[str] = ()) -> List[Tuple[str, str]]:
+    """当前请求的查询参数：去掉空值和不影响结果的参数，按名称排序"""
+    ignored = IGNORED_ARGS.union(ignore)
+    return sorted(
+        (name, value) for name, values in request.args.lists() if name not in ignored
+        for value in values if value != ""
+    )
+
+
+def response_key(namespace: str, cache=None) -> str:
+    """当前请求的响应缓存键"""
+    return cache_keys.response_key(namespace, request.endpoint, request.view_args, normalized_args(), cache)
+
+
+def parse_timestamp(value) -> Optional[datetime]:
+    """数据中的时间（datetime 或 ISO 字符串，不带时区时按北京时间）转为 UTC"""
+    if not value:
+        return None
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value)
+        except ValueError:
+            return None
+    if value.tzinfo is None:
+        value = CHINA_TZ.localize(value)
+    return value.astimezone(timezone.utc)
+
+
+def _accepts_gzip() -> bool:
+    return "gzip" in request.headers.get("Accept-Encoding", "").lower()
+
+
+def _cache_control() -> str:
+    """
+    Cache-Control：浏览器缓存 HTTP_CACHE_MAX_AGE 秒（0 时每次用 ETag 校验）；
+    配置了 CDN_DOMAIN 时允许 CDN 缓存 HTTP_CACHE_S_MAXAGE 秒，并在回源校验期间继续提供旧内容
+    """
+    max_age = int(current_app.config.get("HTTP_CACHE_MAX_AGE", 0))
+    directives = ["public", f"max-age={max_age}"] if max_age else ["no-cache"]
+    if current_app.config.get("CDN_DOMAIN"):
+        s_maxage = int(current_app.config.get("HTTP_CACHE_S_MAXAGE", 300))
+        if not max_age:
+            directives = ["public", "max-age=0"]
+        directives += [f"s-maxage={s_maxage}", f"stale-while-revalidate={s_maxage}"]
+    return ", ".join(directives)
+
+
+def _set_validators(response, etag: str, last_modified: Optional[datetime], compressed: bool):
+    response.set_etag(f"{etag}-gzip" if compressed else etag)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    response.headers["Cache-Control"] = _cache_control()
+    response.headers["Vary"] = "Accept-Encoding"
+
+
+def _is_not_modified(etag: str, last_modified: Optional[datetime]) -> bool:
+    """If-None-Match 优先；没有 If-None-Match 时比较 If-Modified-Since（精确到秒）"""
+    if request.if_none_match:
+        return (
+            request.if_none_match.star_tag
+            or request.if_none_match.contains(etag)
+            or request.if_none_match.contains(f"{etag}-gzip")
+        )
+    if request.if_modified_since and last_modified is not None:
+        return int(last_modified.timestamp()) <= int(request.if_modified_since.timestamp())
+    return False
+
+
+def _not_modified(etag: str, last_modified: Optional[datetime], compressed: bool):
+    response = current_app.response_class(status=304)
+    _set_validators(response, etag, last_modified, compressed and _accepts_gzip())
+    return response
+
+
+def _meta_line(etag: str, last_modified: Optional[datetime]) -> bytes:
+    return f"{etag} {int(last_modified.timestamp()) if last_modified else 0}".encode()
+
+
+def _parse_meta(line: bytes) -> Tuple[str, Optional[datetime]]:
+    etag, timestamp = line.decode().split(" ", 1)
+    timestamp = int(timestamp)
+    return etag, datetime.fromtimestamp(timestamp, timezone.utc) if timestamp else None
+
+
+def check_not_modified(key: str, cache=None):
+    """
+    条件请求：只读校验信息条目判断客户端的副本是否仍然有效
+
+    Returns:
+        Response: 未修改时为 304 响应，否则为 None（继续正常处理）
+    """
+    if not (request.if_none_match or request.if_modified_since):
+        return None
+    if not current_app.config.get("RESPONSE_CACHE_ENABLED", True):
+        return None
+    meta = (cache or get_cache()).get_raw(key + META_SUFFIX)
+    if not meta:
+        return None
+    try:
+        etag, last_modified = _parse_meta(meta[1:])
+    except ValueError:
+        return None
+    if _is_not_modified(etag, last_modified):
+        return _not_modified(etag, last_modified, meta[:1] == FLAG_GZIP)
+    return None
+
+
+def _build_response(body: bytes, compressed: bool, etag: str, last_modified: Optional[datetime]):
+    if compressed and not _accepts_gzip():
+        body, compressed = gzip.decompress(body), False
+    response = current_app.response_class(body, mimetype="application/json")
+    if compressed:
+        response.headers["Content-Encoding"] = "gzip"
+    _set_validators(response, etag, last_modified, compressed)
+    return response
+
+
+def get_response(key: str, cache=None):
+    """
+    读取缓存的响应（先处理条件请求）
+
+    Returns:
+        Response: 未修改时为 304；命中时为直接使用缓存字节的响应（带 X-Cache: HIT）；未命中为 None
+    """
+    if not current_app.config.get("RESPONSE_CACHE_ENABLED", True):
+        return None
+    cache = cache or get_cache()
+    response = check_not_modified(key, cache)
+    if response is not None:
+        return response
+    entry = cache.get_raw(key)
+    if not entry:
+        return None
+    try:
+        meta, body = entry[1:].split(b"\n", 1)
+        etag, last_modified = _parse_meta(meta)
+    except ValueError:
+        # 不带校验信息的旧格式条目，按未命中处理
+        return None
+    response = _build_response(body, entry[:1] == FLAG_GZIP, etag, last_modified)
+    response.headers["X-Cache"] = "HIT"
+    return response
+
+
+def encode(payload: Any) -> bytes:
+    """与 jsonify 相同的编码（含缩进设置和末尾换行）"""
+    return current_app.json.response(payload).get_data()
+
+
+def store_response(key: str, body: bytes, etag: str, last_modified: Optional[datetime],
+                   ttl: Optional[int] = None, tags: Optional[List[str]] = None, cache=None):
+    """把编码好的响应体和校验信息写入缓存（未命中时调用一次）"""
+    if not current_app.config.get("RESPONSE_CACHE_ENABLED", True):
+        return
+    # 数据缓存过期前刷新期间可能返回旧值，响应缓存的 TTL 另设上限，避免旧值长期留在响应缓存中
+    max_ttl = int(current_app.config.get("RESPONSE_CACHE_MAX_TTL", 600))
+    if max_ttl:
+        ttl = min(ttl, max_ttl) if ttl else max_ttl
+    min_size = int(current_app.config.get("RESPONSE_CACHE_GZIP_MIN_SIZE", 1024))
+    flag, stored = FLAG_IDENTITY, body
+    if min_size and len(body) >= min_size:
+        level = int(current_app.config.get("RESPONSE_CACHE_GZIP_LEVEL", 6))
+        # mtime 固定为 0，相同内容压缩结果相同
+        flag, stored = FLAG_GZIP, gzip.compress(body, compresslevel=level, mtime=0)
+    cache = cache or get_cache()
+    meta = flag + _meta_line(etag, last_modified)
+    cache.set_raw(key, meta + b"\n" + stored, ttl, tags)
+    cache.set_raw(key + META_SUFFIX, meta, ttl, tags)
+
+
+def cached_json(key: str, payload: Any, ttl: Optional[int] = None, tags: Optional[List[str]] = None,
+                cache=None, last_modified=None, stale: bool = False):
+    """
+    缓存 payload 的编码结果并返回响应（带 ETag / Last-Modified，客户端副本未变时返回 304）
+
+    payload 带有 "cached" 字段时，缓存中的响应体改为 "cached": true（之后的命中都来自缓存）；
+    本次请求也返回同一份响应体和 ETag（是否刚重建见 X-Cache），客户端第一次校验即可得到 304。
+    不带该字段的 payload 原样编码，不会添加。
+
+    Args:
+        last_modified: 数据的最后修改时间，缺省为当前时间
+        stale: 数据为旧值（get_or_compute_state 返回 STATE_STALE，可能已被失效）：
+            只返回给本次请求，不写入响应缓存，也不带 ETag / Last-Modified
+    """
+    if stale:
+        response = current_app.response_class(encode(payload), mimetype="application/json")
+        response.headers["Cache-Control"] = "no-cache"
+        response.headers["X-Cache"] = "STALE"
+        return response
+    has_flag = "cached" in payload
+    body = encode(dict(payload, cached=True) if has_flag else payload)
+    etag = hashlib.md5(body).hexdigest()
+    last_modified = parse_timestamp(last_modified) or datetime.now(timezone.utc).replace(microsecond=0)
+    store_response(key, body, etag, last_modified, ttl, tags, cache)
+    if _is_not_modified(etag, last_modified):
+        return _not_modified(etag, last_modified, False)
+    response = _build_response(body, False, etag, last_modified)
+    response.headers["X-Cache"] = "MISS"
+    return response
@@ -0,0 +1,192 @@
+"""
+文章浏览量计数
+每次阅读（包括命中缓存和 304）只在 Redis 哈希 blog:views:pending 中 HINCRBY（同一个管道中更新热度），不写数据库；
+后台线程每隔 VIEW_COUNT_FLUSH_INTERVAL 秒把累计的增量用一条批量 UPDATE 写入 articles.view_count。
+Redis 不可用时计入进程内计数，由同一个写入流程直接写入数据库。
+"""
+import os
+import time
+import atexit
+import logging
+import threading
+from collections import Counter
+from datetime import datetime
+from typing import Dict, Any, Optional
+
+from sqlalchemy import bindparam
+
+from model import popularity
+from model.blog_cache import get_cache
+from model.cache_backends import LOCK_PREFIX
+from model.database import db, Article
+
+logger = logging.getLogger("rss_app")
+
+# 待写入的浏览量增量：{文章 id: 增量}
+VIEWS_KEY = "blog:views:pending"
+# 正在写入的一批（写入前从 VIEWS_KEY 改名而来；写库失败时保留，下次重试）
+FLUSHING_KEY = "blog:views:flushing"
+# 多个 worker 之间互斥的写入锁
+FLUSH_LOCK_KEY = f"{LOCK_PREFIX}views-flush"
+FLUSH_LOCK_TTL_MS = 60 * 1000
+
+_app = None
+_local = Counter()
+_local_lock = threading.Lock()
+_flush_lock = threading.Lock()
+_background_pid: Optional[int] = None
+_last_flush: Optional[Dict[str, Any]] = None
+
+# 按主键累加浏览量（Core 语句，不经过 ORM，不触发缓存失效）
+_UPDATE = (
+    Article.__table__.update()
+    .where(Article.__table__.c.id == bindparam("article_id"))
+    .values(view_count=db.func.coalesce(Article.__table__.c.view_count, 0) + bindparam("views"))
+)
+
+
+def record_view(article_id: int):
+    """记录一次阅读"""
+    _ensure_background()
+    client = get_cache().redis_client
+    if client is not None:
+        try:
+            pipe = client.pipeline(transaction=False)
+            pipe.hincrby(VIEWS_KEY, article_id, 1)
+            # 文章和分类的热度、独立读者、小时计数（见 model.popularity）
+            popularity.queue_view(pipe, article_id)
+            pipe.execute()
+            return
+        except Exception as e:
+            logger.debug(f"记录浏览量失败，改为进程内计数: {e}")
+    with _local_lock:
+        _local[article_id] += 1
+
+
+def _take_local() -> Counter:
+    global _local
+    with _local_lock:
+        counts, _local = _local, Counter()
+    return counts
+
+
+def _restore_local(counts: Counter):
+    with _local_lock:
+        _local.update(counts)
+
+
+def _write(counts: Counter):
+    rows = [{"article_id": article_id, "views": views} for article_id, views in counts.items() if views]
+    if not rows:
+        return
+    try:
+        db.session.execute(_UPDATE, rows)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+
+def _take_redis(client) -> Counter:
+    """取出 Redis 中待写入的一批（上次写库失败留下的一批优先）"""
+    # 持有写入锁时只有这里改名，检查后 VIEWS_KEY 不会消失
+    if client.exists(VIEWS_KEY):
+        client.renamenx(VIEWS_KEY, FLUSHING_KEY)
+    return Counter({int(article_id): int(views) for article_id, views in client.hgetall(FLUSHING_KEY).items()})
+
+
+def flush_views() -> Dict[str, Any]:
+    """
+    把累计的浏览量写入数据库（需要应用上下文）
+
+    Returns:
+        Dict: 本次写入的文章数和浏览量
+    """
+    global _last_flush
+    with _flush_lock:
+        cache = get_cache()
+        counts = Counter()
+        client = cache.redis_client
+        token = None
+        if client is not None:
+            try:
+                token = cache.backend.acquire_lock(FLUSH_LOCK_KEY, FLUSH_LOCK_TTL_MS)
+                if token is not None:
+                    counts.update(_take_redis(client))
+            except Exception as e:
+                logger.warning(f"读取 Redis 中的浏览量失败: {e}")
+                client = None
+        local_counts = _take_local()
+        counts.update(local_counts)
+        try:
+            _write(counts)
+            if token is not None and client is not None:
+                client.delete(FLUSHING_KEY)
+        except Exception:
+            # Redis 中的一批留在 FLUSHING_KEY，进程内的放回，下次重试
+            _restore_local(local_counts)
+            raise
+        finally:
+            if token is not None:
+                cache.backend.release_lock(FLUSH_LOCK_KEY, token)
+        _last_flush = {
+            "finished_at": datetime.now().isoformat(),
+            "articles": len(counts),
+            "views": sum(counts.values()),
+        }
+        if counts:
+            logger.debug(f"写入浏览量: {len(counts)} 篇文章，共 {_last_flush['views']} 次")
+        return _last_flush
+
+
+def pending_views() -> Dict[str, Any]:
+    """尚未写入数据库的浏览量"""
+    with _local_lock:
+        local = sum(_local.values())
+    stats = {"local": local, "last_flush": _last_flush}
+    client = get_cache().redis_client
+    if client is not None:
+        try:
+            pending = client.hvals(VIEWS_KEY) + client.hvals(FLUSHING_KEY)
+            stats["redis"] = sum(int(views) for views in pending)
+        except Exception as e:
+            stats["redis_error"] = str(e)
+    return stats
+
+
+def _flush_in_app():
+    with _app.app_context():
+        try:
+            flush_views()
+        except Exception as e:
+            logger.error(f"写入浏览量失败: {e}", exc_info=True)
+
+
+def _flush_loop(interval: float):
+    while True:
+        time.sleep(interval)
+        _flush_in_app()
+
+
+def _ensure_background():
+    """在当前进程中启动定时写入线程（gunicorn fork 后每个 worker 各自启动）"""
+    global _background_pid
+    if _app is None or _background_pid == os.getpid():
+        return
+    with _local_lock:
+        if _background_pid == os.getpid():
+            return
+        _background_pid = os.getpid()
+        # fork 前累加的计数由父进程写入
+        _local.clear()
+    interval = float(_app.config.get("VIEW_COUNT_FLUSH_INTERVAL", 30))
+    threading.Thread(target=_flush_loop, args=(interval,), name="view-counter", daemon=True).start()
+
+
+def init_view_counter(app):
+    """登记应用（后台线程在第一次记录浏览量时启动），进程退出前写入进程内剩余的计数"""
+    global _app
+    if _app is not None:
+        return
+    _app = app
+    atexit.register(_flush_in_app)
@@ -0,0 +1,260 @@
+"""
+块级增量渲染
+按顶层块切分 Markdown，每块的 HTML 按块内容哈希缓存；顶层围栏代码块的 Pygments 高亮结果
+按 (语言, 代码哈希) 缓存。管理员只改了一个错别字时，只有变化的块需要重新渲染。
+"""
+import os
+import re
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Any, Optional, Tuple
+
+from markdown.extensions.codehilite import CodeHilite, CodeHiliteExtension
+from markdown.extensions.toc import unique
+
+from render.postprocess import postprocess_html, find_heading_lines
+
+# 进程内缓存容量（条目数）
+BLOCK_CACHE_SIZE = int(os.environ.get("RENDER_BLOCK_CACHE_SIZE", 4096))
+HIGHLIGHT_CACHE_SIZE = int(os.environ.get("RENDER_HIGHLIGHT_CACHE_SIZE", 2048))
+
+# 顶层围栏（与 fenced_code 扩展一致：只识别行首的围栏）
+FENCE_OPEN_RE = re.compile(r"^(?P<fence>`{3,}|~{3,})[ ]*(?P<info>[^\n]*)$")
+# 只有 "```lang" 这种简单形式走高亮缓存，带 {attrs} / hl_lines 的交给 Markdown 处理
+SIMPLE_FENCE_INFO_RE = re.compile(r"^\.?(?P<lang>[\w#.+-]*)[ ]*$")
+# 空行后这些行仍属于上一块（缩进续行、列表项、引用）
+CONTINUATION_RE = re.compile(r"^(?:[ \t]|[-*+][ \t]|\d+[.)][ \t]|>)")
+# 行首块级 HTML 开始标签
+HTML_BLOCK_OPEN_RE = re.compile(r"^<([a-zA-Z][a-zA-Z0-9]*)[\s>]")
+HTML_VOID_TAGS = {"area", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "wbr"}
+# 依赖整篇文档上下文的语法：引用式链接定义、[TOC] 标记
+CROSS_BLOCK_RE = re.compile(r"^(?: {0,3}\[[^\]\n]+\]:|\[TOC\]\s*$)", re.MULTILINE)
+
+
+class LRUCache:
+    """线程安全的定长 LRU 缓存"""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            try:
+                value = self._data.pop(key)
+            except KeyError:
+                self.misses += 1
+                return None
+            self._data[key] = value
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data.pop(key, None)
+            self._data[key] = value
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def info(self) -> Dict[str, int]:
+        return {"size": len(self._data), "maxsize": self.maxsize, "hits": self.hits, "misses": self.misses}
+
+
+block_cache = LRUCache(BLOCK_CACHE_SIZE)
+highlight_cache = LRUCache(HIGHLIGHT_CACHE_SIZE)
+
+_codehilite_config = None
+
+
+def _get_codehilite_config() -> dict:
+    """取 codehilite 扩展的实际配置，保证单独高亮与整篇渲染输出一致"""
+    global _codehilite_config
+    if _codehilite_config is None:
+        from render.engine import MARKDOWN_EXTENSION_CONFIGS
+
+        _codehilite_config = CodeHiliteExtension(
+            **MARKDOWN_EXTENSION_CONFIGS.get("codehilite", {})
+        ).getConfigs()
+    return _codehilite_config
+
+
+def _hash(text: str) -> str:
+    return hashlib.md5(text.encode()).hexdigest()
+
+
+def highlight_code(code: str, lang: Optional[str]) -> str:
+    """
+    用 Pygments 高亮代码，结果按 (语言, 代码哈希) 缓存
+
+    Args:
+        code: 代码原文（不含围栏）
+        lang: 语言，None 时由 Pygments 猜测
+
+    Returns:
+        str: 高亮后的HTML
+    """
+    key = (lang or "", _hash(code))
+    html = highlight_cache.get(key)
+    if html is None:
+        config = _get_codehilite_config().copy()
+        style = config.pop("pygments_style", "default")
+        html = CodeHilite(code, lang=lang, style=style, **config).hilite(shebang=False)
+        highlight_cache.set(key, html)
+    return html
+
+
+def split_blocks(content: str) -> Optional[List[Tuple[str, Optional[Tuple[str, str]], int]]]:
+    """
+    把 Markdown 切分为顶层块
+
+    只在切开后渲染结果不变的位置切分：空行之后、下一行不是缩进续行/列表项/引用，
+    且不在围栏代码块或未闭合的 HTML 块内。前后都是空行的顶层围栏代码块单独成块。
+
+    Args:
+        content: Markdown 原文（已处理过 mermaid 代码块）
+
+    Returns:
+        list: [(块文本, (语言, 代码) 或 None, 起始行下标), ...]，只有可直接高亮的围栏代码块带第二项；
+              文档使用了跨块语法时返回 None，由调用方整篇渲染。
+    """
+    if CROSS_BLOCK_RE.search(content):
+        return None
+
+    lines = content.split("\n")
+    blocks = []
+    current = []
+    current_start = 0
+    blank_before = True
+    i = 0
+    while i < len(lines):
+        line = lines[i]
+
+        fence_match = FENCE_OPEN_RE.match(line)
+        if fence_match:
+            fence = fence_match.group("fence")
+            end = i + 1
+            while end < len(lines) and lines[end].rstrip(" ") != fence:
+                end += 1
+            if end < len(lines):
+                fence_text = "\n".join(lines[i:end + 1])
+                blank_after = end + 1 >= len(lines) or not lines[end + 1].strip()
+                if blank_before and blank_after and not _open_html_block(current):
+                    if current:
+                        blocks.append(("\n".join(current), None, current_start))
+                        current = []
+                    info_match = SIMPLE_FENCE_INFO_RE.match(fence_match.group("info"))
+                    if info_match:
+                        code = "\n".join(lines[i + 1:end]) + "\n"
+                        blocks.append((fence_text, (info_match.group("lang"), code), i))
+                    else:
+                        blocks.append((fence_text, None, i))
+                    current_start = end + 1
+                else:
+                    current.append(fence_text)
+                i = end + 1
+                blank_before = False
+                continue
+
+        if not line.strip():
+            blank_before = True
+            current.append(line)
+            i += 1
+            continue
+
+        if blank_before and current and not CONTINUATION_RE.match(line) and not _open_html_block(current):
+            blocks.append(("\n".join(current), None, current_start))
+            current = []
+            current_start = i
+        current.append(line)
+        blank_before = False
+        i += 1
+
+    if current:
+        blocks.append(("\n".join(current), None, current_start))
+    return [block for block in blocks if block[0].strip()]
+
+
+def _open_html_block(block_lines: List[str]) -> bool:
+    """块是否以尚未闭合的块级 HTML 标签（或注释）开始"""
+    for line in block_lines:
+        if line.strip():
+            text = "\n".join(block_lines)
+            if line.startswith("<!--"):
+                return "-->" not in text
+            match = HTML_BLOCK_OPEN_RE.match(line)
+            if not match or match.group(1).lower() in HTML_VOID_TAGS:
+                return False
+            return f"</{match.group(1)}" not in text
+    return False
+
+
+def _render_block(text: str, convert) -> Tuple[str, List[Dict[str, Any]]]:
+    """渲染单块（带缓存），标题的 line 为块内行下标，无法对应时为 None"""
+    key = _hash(text)
+    cached = block_cache.get(key)
+    if cached is None:
+        html, headings = convert(text)
+        lines = find_heading_lines(text)
+        matched = len(lines) == len(headings)
+        for index, heading in enumerate(headings):
+            heading["line"] = lines[index] if matched else None
+        cached = (html, headings)
+        block_cache.set(key, cached)
+    return cached
+
+
+def render_blocks(content: str, convert) -> Tuple[str, List[Dict[str, Any]]]:
+    """
+    按块渲染并拼接HTML
+
+    Args:
+        content: Markdown 原文（已处理过 mermaid 代码块）
+        convert: 单块 Markdown → (HTML, 扁平标题列表) 的函数
+
+    Returns:
+        tuple: (HTML, 标题列表)；标题的 line 是 content 中从1开始的行号，无法确定时为0
+    """
+    blocks = split_blocks(content)
+    if blocks is None:
+        # 不适合分块，整篇作为一块
+        blocks = [(content, None, 0)]
+
+    html_parts = []
+    headings = []
+    used_ids = set()
+    for text, fence, start in blocks:
+        if fence is not None:
+            lang, code = fence
+            html_parts.append(highlight_code(code, lang or None))
+            continue
+
+        html, block_headings = _render_block(text, convert)
+        # 跨块保证标题 id 唯一（与 toc 扩展的 _1/_2 后缀规则一致）
+        id_map = {}
+        for heading in block_headings:
+            anchor = unique(heading["anchor"], used_ids)
+            if anchor != heading["anchor"]:
+                id_map[heading["anchor"]] = anchor
+            line = heading["line"]
+            headings.append(dict(heading, anchor=anchor, line=start + line + 1 if line is not None else 0))
+        if id_map:
+            html = postprocess_html(html, id_map)
+        html_parts.append(html)
+
+    # 块之间只可能差出空白行，不影响HTML语义
+    return "\n".join(part for part in html_parts if part).strip(), headings
+
+
+def get_cache_info() -> Dict[str, Dict[str, int]]:
+    """块缓存和高亮缓存的命中情况"""
+    return {"blocks": block_cache.info(), "highlight": highlight_cache.info()}
@@ -0,0 +1,218 @@
+"""
+批量重新渲染
+修改 Markdown 扩展或代码高亮样式后，用进程池并行重新渲染所有文章并分批写回数据库。
+进度（最后处理的文章 id）保存在 data 目录下的断点文件中，中断后可从断点继续（与缓存后端无关，重启后仍有效）。
+"""
+import os
+import json
+import time
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Any, Optional, Callable
+
+from config.config import logger
+from model.database import db, Article
+from render.engine import render, compute_content_hash
+
+# 断点文件
+CHECKPOINT_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "rerender_checkpoint.json")
+
+
+def _render_batch(items):
+    """进程池中执行：渲染一批 (id, content)，返回可直接用于批量 UPDATE 的字典"""
+    rows = []
+    for article_id, content in items:
+        result = render(content)
+        rows.append({
+            "id": article_id,
+            "html_content": result.html,
+            "headings": result.headings,
+            "content_hash": result.content_hash,
+            "word_count": result.word_count,
+            "reading_time": result.reading_time,
+        })
+    return rows
+
+
+def iter_article_batches(start_after: int, batch_size: int, force: bool):
+    """
+    按主键分页读取待渲染的文章
+
+    SQLite 在读游标未关闭时会持有共享锁，导致同一进程中的批量写入提交失败，
+    因此不用 yield_per 保持长游标，而是每页读完即释放，只加载渲染所需的列。
+
+    Yields:
+        tuple: (本页最后一个id, 本页读取的行数, [(id, content, updated_at), ...])
+    """
+    last_id = start_after
+    while True:
+        rows = db.session.query(
+            Article.id,
+            Article.content,
+            Article.updated_at,
+            Article.content_hash,
+            Article.html_content.is_(None).label("missing_html"),
+        ).filter(Article.id > last_id).order_by(Article.id).limit(batch_size).all()
+        db.session.rollback()
+        if not rows:
+            return
+        last_id = rows[-1].id
+        batch = [
+            (row.id, row.content, row.updated_at)
+            for row in rows
+            if force or row.missing_html or row.content_hash != compute_content_hash(row.content)
+        ]
+        yield last_id, len(rows), batch
+
+
+class BulkRenderJob:
+    """一次批量渲染任务及其进度"""
+
+    def __init__(self, workers: Optional[int] = None, batch_size: int = 50,
+                 start_after: int = 0, force: bool = True):
+        self.workers = workers or max(1, (os.cpu_count() or 2) - 1)
+        self.batch_size = max(1, batch_size)
+        self.start_after = start_after
+        self.force = force
+        self.status = "pending"
+        self.total = 0
+        self.processed = 0
+        self.rendered = 0
+        self.last_id = start_after
+        self.started_at = None
+        self.finished_at = None
+        self.error = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        elapsed = ((self.finished_at or time.time()) - self.started_at) if self.started_at else 0
+        return {
+            "status": self.status,
+            "total": self.total,
+            "processed": self.processed,
+            "rendered": self.rendered,
+            "last_id": self.last_id,
+            "workers": self.workers,
+            "elapsed_seconds": round(elapsed, 2),
+            "articles_per_second": round(self.rendered / elapsed, 2) if elapsed else 0,
+            "error": self.error,
+        }
+
+    def _write_batch(self, rows: List[Dict[str, Any]], updated_at: Dict[int, Any]):
+        """单个事务写回一批渲染结果，保留原 updated_at（重新渲染不算内容修改）"""
+        for row in rows:
+            row["headings"] = json.dumps(row["headings"], ensure_ascii=False)
+            row["updated_at"] = updated_at[row["id"]]
+        # 提交后由 model.cache_invalidation 按主键失效这批文章的缓存
+        db.session.execute(db.update(Article), rows)
+        db.session.commit()
+
+    def _save_checkpoint(self):
+        # 先写临时文件再替换，中途退出不会留下写了一半的断点
+        os.makedirs(os.path.dirname(CHECKPOINT_FILE), exist_ok=True)
+        tmp_path = f"{CHECKPOINT_FILE}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"last_id": self.last_id, "status": self.status}, f)
+        os.replace(tmp_path, CHECKPOINT_FILE)
+
+    def run(self, progress: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """
+        执行任务
+
+        Args:
+            progress: 每写完一批后调用，参数为当前进度字典
+
+        Returns:
+            Dict: 最终进度
+        """
+        self.status = "running"
+        self.started_at = time.time()
+        self.total = Article.query.filter(Article.id > self.start_after).count()
+        db.session.rollback()
+
+        try:
+            # spawn 而不是 fork：在 gunicorn 的多线程 worker 中 fork 不安全
+            context = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=self.workers, mp_context=context) as executor:
+                pending = []
+                for last_id, scanned, batch in iter_article_batches(self.start_after, self.batch_size, self.force):
+                    updated_at = {article_id: value for article_id, _, value in batch}
+                    items = [(article_id, content) for article_id, content, _ in batch]
+                    future = executor.submit(_render_batch, items) if items else None
+                    pending.append((future, updated_at, last_id, scanned))
+                    # 最多保持 workers * 2 个批次在途，控制内存
+                    while len(pending) >= self.workers * 2:
+                        self._finish(pending.pop(0), progress)
+                while pending:
+                    self._finish(pending.pop(0), progress)
+            self.status = "completed"
+        except Exception as e:
+            db.session.rollback()
+            self.status = "failed"
+            self.error = str(e)
+            logger.error(f"批量渲染失败（可从文章 {self.last_id} 之后继续）: {e}", exc_info=True)
+        finally:
+            self.finished_at = time.time()
+            self._save_checkpoint()
+
+        logger.info(f"批量渲染结束: {self.to_dict()}")
+        return self.to_dict()
+
+    def _finish(self, entry, progress):
+        future, updated_at, last_id, scanned = entry
+        rows = future.result() if future else []
+        if rows:
+            self._write_batch(rows, updated_at)
+        self.rendered += len(rows)
+        # 按提交顺序推进断点，断点之前的文章都已写回
+        self.processed += scanned
+        self.last_id = last_id
+        self._save_checkpoint()
+        if progress:
+            progress(self.to_dict())
+
+
+def get_checkpoint() -> int:
+    """上次批量渲染中断时最后写回的文章 id"""
+    try:
+        with open(CHECKPOINT_FILE, encoding="utf-8") as f:
+            checkpoint = json.load(f)
+    except FileNotFoundError:
+        return 0
+    except (OSError, ValueError) as e:
+        logger.warning(f"读取批量渲染断点失败: {e}")
+        return 0
+    if checkpoint and checkpoint.get("status") != "completed":
+        return int(checkpoint.get("last_id", 0))
+    return 0
+
+
+# 后台任务（管理接口使用），每个进程同时只运行一个
+_current_job: Optional[BulkRenderJob] = None
+_job_lock = threading.Lock()
+
+
+def start_background_job(app, **kwargs) -> BulkRenderJob:
+    """
+    在后台线程中启动批量渲染
+
+    Returns:
+        BulkRenderJob: 新任务；已有任务在运行时返回该任务
+    """
+    global _current_job
+    with _job_lock:
+        if _current_job and _current_job.status in ("pending", "running"):
+            return _current_job
+        job = BulkRenderJob(**kwargs)
+        _current_job = job
+
+    def target():
+        with app.app_context():
+            job.run()
+
+    threading.Thread(target=target, name="bulk-render", daemon=True).start()
+    return job
+
+
+def get_current_job() -> Optional[BulkRenderJob]:
+    return _current_job
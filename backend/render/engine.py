@@ -0,0 +1,199 @@
+"""
+Markdown 渲染引擎
+每个进程维护一组预先配置好的 Markdown 实例，reset 后复用，避免每次渲染都重新构建扩展
+"""
+import os
+import re
+import queue
+import hashlib
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, List, Any, Tuple
+
+import markdown
+
+from render.blocks import render_blocks
+from render.postprocess import postprocess_html, flatten_toc_tokens, build_toc_tree
+
+# Markdown 扩展配置（与原 convert_markdown_to_html 保持一致）
+MARKDOWN_EXTENSIONS = ["toc", "codehilite", "tables", "fenced_code", "attr_list"]
+MARKDOWN_EXTENSION_CONFIGS = {"toc": {"permalink": True, "permalink_title": "永久链接"}}
+
+MERMAID_BLOCK_RE = re.compile(r"```mermaid\s*\n(.*?)```", re.DOTALL)
+
+# 每个进程最多保留的 Markdown 实例数
+DEFAULT_POOL_SIZE = int(os.environ.get("MARKDOWN_POOL_SIZE", 4))
+
+
+@dataclass
+class RenderResult:
+    """一次渲染的结果"""
+
+    html: str
+    headings: List[Dict[str, Any]] = field(default_factory=list)  # 扁平标题列表
+    toc: List[Dict[str, Any]] = field(default_factory=list)  # 嵌套目录树
+    content_hash: str = ""
+    word_count: int = 0
+    reading_time: int = 0
+
+
+def compute_content_hash(content: str) -> str:
+    """计算 Markdown 原文的哈希（与 blog:article_html 缓存键使用的 md5 一致）"""
+    return hashlib.md5(content.encode()).hexdigest() if content else ""
+
+
+def compute_word_count(content: str) -> int:
+    """字数（按字符数统计）"""
+    return len(content) if content else 0
+
+
+def compute_reading_time(content: str) -> int:
+    """阅读时间（分钟），按每分钟250字估算"""
+    return max(1, len(content) // 250) if content else 0
+
+
+def create_markdown() -> markdown.Markdown:
+    """创建一个按博客配置初始化的 Markdown 实例"""
+    return markdown.Markdown(
+        extensions=MARKDOWN_EXTENSIONS,
+        extension_configs=MARKDOWN_EXTENSION_CONFIGS,
+    )
+
+
+class MarkdownPool:
+    """
+    Markdown 实例池
+
+    实例不是线程安全的，借出期间由单个线程独占；归还前调用 reset() 清理 toc 等状态。
+    gunicorn fork 之后检测到 pid 变化会丢弃父进程遗留的实例。
+    """
+
+    def __init__(self, size: int = DEFAULT_POOL_SIZE):
+        self.size = max(1, size)
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        self._idle = queue.LifoQueue(maxsize=self.size)
+
+    def _check_fork(self):
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._idle = queue.LifoQueue(maxsize=self.size)
+                    self._pid = os.getpid()
+
+    def acquire(self) -> markdown.Markdown:
+        """借出一个实例，池为空时新建"""
+        self._check_fork()
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            return create_markdown()
+
+    def release(self, md: markdown.Markdown):
+        """重置并归还实例，池已满时直接丢弃"""
+        md.reset()
+        try:
+            self._idle.put_nowait(md)
+        except queue.Full:
+            pass
+
+    def convert(self, content: str) -> Tuple[str, List[Dict[str, Any]]]:
+        """转换 Markdown，返回 HTML 和 toc 扩展收集的扁平标题列表"""
+        md = self.acquire()
+        try:
+            return md.convert(content), flatten_toc_tokens(md.toc_tokens)
+        finally:
+            self.release(md)
+
+
+_pool = MarkdownPool()
+
+
+def get_pool() -> MarkdownPool:
+    """获取当前进程的 Markdown 实例池"""
+    return _pool
+
+
+def mermaid_block_id(mermaid_code: str) -> str:
+    """Mermaid 块的 id（页面中 div 的 id 和批量渲染结果的键）"""
+    return "mermaid-" + hashlib.md5(mermaid_code.encode()).hexdigest()[:8]
+
+
+def extract_mermaid_blocks(content: str) -> Dict[str, str]:
+    """提取文章中的 Mermaid 代码，返回 {块id: 代码}（相同代码只保留一份）"""
+    blocks = {}
+    for match in MERMAID_BLOCK_RE.finditer(content or ""):
+        mermaid_code = match.group(1).strip()
+        blocks[mermaid_block_id(mermaid_code)] = mermaid_code
+    return blocks
+
+
+def process_mermaid_blocks(content):
+    """
+    处理Mermaid代码块，将其转换为HTML div
+
+    Returns:
+        tuple: (处理后的内容, [(处理后内容中的行下标, 此后行号需要加上的偏移), ...])
+    """
+    parts = []
+    line_shifts = []
+    last_end = 0
+    new_line = 0
+    shift = 0
+    for match in MERMAID_BLOCK_RE.finditer(content):
+        mermaid_code = match.group(1).strip()
+        replacement = f'<div class="mermaid" id="{mermaid_block_id(mermaid_code)}">\n{mermaid_code}\n</div>'
+        before = content[last_end:match.start()]
+        parts.append(before)
+        parts.append(replacement)
+        new_line += before.count("\n") + replacement.count("\n")
+        shift += match.group(0).count("\n") - replacement.count("\n")
+        line_shifts.append((new_line, shift))
+        last_end = match.end()
+    parts.append(content[last_end:])
+    return "".join(parts), line_shifts
+
+
+def _source_line(line, line_shifts):
+    """把 mermaid 处理后内容中的行号换算回原文行号"""
+    if not line:
+        return 0
+    shift = 0
+    for after_line, total_shift in line_shifts:
+        if line - 1 <= after_line:
+            break
+        shift = total_shift
+    return line + shift
+
+
+def _convert_block(content):
+    html_content, headings = _pool.convert(content)
+    return postprocess_html(html_content), headings
+
+
+def render(content: str) -> RenderResult:
+    """
+    渲染 Markdown 文章
+
+    Args:
+        content: Markdown 原文
+
+    Returns:
+        RenderResult: HTML、标题大纲（含原文行号）、目录树和内容哈希
+    """
+    if not content:
+        return RenderResult(html="")
+
+    processed, line_shifts = process_mermaid_blocks(content)
+    html_content, headings = render_blocks(processed, _convert_block)
+    for heading in headings:
+        heading["line"] = _source_line(heading["line"], line_shifts)
+
+    return RenderResult(
+        html=html_content,
+        headings=headings,
+        toc=build_toc_tree(headings),
+        content_hash=compute_content_hash(content),
+        word_count=compute_word_count(content),
+        reading_time=compute_reading_time(content),
+    )
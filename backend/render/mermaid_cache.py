@@ -0,0 +1,231 @@
+"""
+Mermaid SVG 磁盘缓存
+以 (图表代码, 渲染参数) 的哈希为键，把渲染好的 SVG 存在本地目录；按总大小做 LRU 淘汰，
+同一张图并发请求时通过文件锁保证只渲染一次（跨 gunicorn worker 也生效）。
+"""
+import os
+import json
+import fcntl
+import hashlib
+import time
+import tempfile
+import threading
+from typing import Dict, Any, Optional, Callable, Tuple
+
+from flask import current_app
+
+from config.config import logger
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "mermaid_cache")
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024
+# 淘汰时删到上限的这个比例，避免每次写入都触发扫描
+EVICT_TARGET_RATIO = 0.9
+# 缓存内容格式版本，改变存储格式（如压缩方式）时递增，旧文件随 LRU 淘汰
+CACHE_FORMAT_VERSION = 2
+# 其他 worker 也在写入同一目录，进程内累计的总大小每隔这么多秒按磁盘重新统计一次
+SIZE_RESCAN_INTERVAL = 60
+
+
+def mermaid_cache_key(code: str, options: Optional[Dict[str, Any]] = None) -> str:
+    """图表代码 + 渲染参数的内容哈希"""
+    payload = json.dumps(
+        {"code": code, "options": options or {}, "version": CACHE_FORMAT_VERSION},
+        sort_keys=True, ensure_ascii=False
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class MermaidSvgCache:
+    """内容寻址的 SVG 磁盘缓存"""
+
+    def __init__(self, directory: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(self.directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._key_locks: Dict[str, threading.Lock] = {}
+        self._size = self._scan_size()
+        self._scanned_at = time.monotonic()
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.svg")
+
+    def _scan(self):
+        for shard in os.scandir(self.directory):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if entry.name.endswith(".svg"):
+                    yield entry
+
+    def _scan_size(self) -> int:
+        return sum(entry.stat().st_size for entry in self._scan())
+
+    def contains(self, key: str) -> bool:
+        """是否已缓存（不读取内容，不计入命中统计）"""
+        return os.path.exists(self._path(key))
+
+    def get(self, key: str) -> Optional[str]:
+        """读取缓存，命中时刷新 mtime 作为 LRU 访问时间"""
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                svg = f.read()
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        self.hits += 1
+        return svg
+
+    def put(self, key: str, svg: str):
+        """原子写入：先写临时文件再 rename，读者不会看到半个文件"""
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(svg)
+            try:
+                # 覆盖已有文件时只计入大小的差值
+                replaced = os.path.getsize(path)
+            except FileNotFoundError:
+                replaced = 0
+            os.replace(temp_path, path)
+        except Exception:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+            raise
+
+        with self._lock:
+            if time.monotonic() - self._scanned_at > SIZE_RESCAN_INTERVAL:
+                self._size = self._scan_size()
+                self._scanned_at = time.monotonic()
+            else:
+                self._size += len(svg.encode("utf-8")) - replaced
+            over_limit = self._size > self.max_bytes
+        if over_limit:
+            self.evict()
+
+    def evict(self) -> int:
+        """按 mtime 从旧到新删除，直到总大小降到上限的 90%"""
+        with self._lock:
+            entries = []
+            for entry in self._scan():
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+            total = sum(size for _, size, _ in entries)
+            target = int(self.max_bytes * EVICT_TARGET_RATIO)
+            removed = 0
+            for _, size, path in sorted(entries):
+                if total <= target:
+                    break
+                for stale in (path, path + ".lock"):
+                    try:
+                        os.unlink(stale)
+                    except FileNotFoundError:
+                        pass
+                total -= size
+                removed += 1
+            self._size = total
+            self._scanned_at = time.monotonic()
+        if removed:
+            logger.info(f"Mermaid 缓存淘汰 {removed} 个文件，当前 {total} 字节")
+        return removed
+
+    def _key_lock(self, key: str) -> threading.Lock:
+        with self._lock:
+            lock = self._key_locks.get(key)
+            if lock is None:
+                lock = self._key_locks[key] = threading.Lock()
+            return lock
+
+    def get_or_render(self, key: str, render_func: Callable[[], str]) -> Tuple[str, bool]:
+        """
+        读取缓存，未命中时渲染并写入
+
+        同一进程内用线程锁、跨进程用文件锁串行化同一个键的渲染，
+        等锁的请求拿到锁后会直接命中别人刚写入的结果。
+
+        Returns:
+            tuple: (SVG, 是否命中缓存)
+        """
+        svg = self.get(key)
+        if svg is not None:
+            return svg, True
+
+        key_lock = self._key_lock(key)
+        with key_lock:
+            lock_path = self._path(key) + ".lock"
+            os.makedirs(os.path.dirname(lock_path), exist_ok=True)
+            lock_file = self._lock_file(lock_path)
+            try:
+                svg = self.get(key)
+                if svg is not None:
+                    return svg, True
+                try:
+                    svg = render_func()
+                    self.put(key, svg)
+                except Exception:
+                    # 渲染失败时不留下锁文件（成功时保留，随缓存一起淘汰）
+                    try:
+                        os.unlink(lock_path)
+                    except FileNotFoundError:
+                        pass
+                    raise
+                return svg, False
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+                lock_file.close()
+                with self._lock:
+                    self._key_locks.pop(key, None)
+
+    @staticmethod
+    def _lock_file(lock_path: str):
+        """
+        打开锁文件并加排他锁
+
+        等锁期间文件可能被删除（持有者渲染失败或被淘汰），这时锁住的是已删除的文件，
+        与之后新建锁文件的进程并不互斥，需要重新打开
+        """
+        while True:
+            lock_file = open(lock_path, "w")
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                if os.fstat(lock_file.fileno()).st_ino == os.stat(lock_path).st_ino:
+                    return lock_file
+            except FileNotFoundError:
+                pass
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+            lock_file.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "directory": self.directory,
+            "size_bytes": self._size,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+_cache: Optional[MermaidSvgCache] = None
+
+
+def get_mermaid_cache() -> MermaidSvgCache:
+    """获取当前进程的 Mermaid 缓存实例"""
+    global _cache
+    if _cache is None:
+        _cache = MermaidSvgCache(
+            directory=current_app.config.get("MERMAID_CACHE_DIR") or DEFAULT_CACHE_DIR,
+            max_bytes=int(current_app.config.get("MERMAID_CACHE_MAX_BYTES") or DEFAULT_MAX_BYTES),
+        )
+    return _cache
@@ -0,0 +1,360 @@
+"""
+Mermaid 常驻渲染进程池
+每个进程（render/mermaid_worker.mjs）启动一次 Chromium 后持续通过 stdin/stdout 接收任务，
+替代每个请求都冷启动一次 mmdc。池子提供：有界等待队列、单任务超时、空闲进程健康检查、
+崩溃或超时进程自动重启，以及队列满时的快速拒绝（接口返回 503 + Retry-After）。
+"""
+import os
+import json
+import queue
+import shlex
+import threading
+import subprocess
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple
+
+from flask import current_app
+
+from config.config import logger
+from render.engine import extract_mermaid_blocks
+from render.mermaid_cache import get_mermaid_cache, mermaid_cache_key
+from render.svg_minify import minify_svg
+
+WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "mermaid_worker.mjs")
+DEFAULT_COMMAND = f"node {WORKER_SCRIPT}"
+
+
+class MermaidRenderError(Exception):
+    """Mermaid 渲染失败（图表语法错误、渲染超时或渲染进程崩溃）"""
+
+
+class MermaidPoolBusyError(Exception):
+    """并发渲染数和等待队列都已满"""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Mermaid 渲染繁忙，请稍后重试")
+        self.retry_after = retry_after
+
+
+class MermaidWorker:
+    """一个常驻渲染进程，同一时间只处理一个任务"""
+
+    _ids = itertools.count(1)
+
+    def __init__(self, command: List[str], start_timeout: float):
+        self.command = command
+        self.start_timeout = start_timeout
+        self.jobs = 0
+        self.broken = False
+        self.timed_out = False
+        self._messages: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue()
+        # 未安装 node 时抛出 FileNotFoundError，由调用方处理
+        self.process = subprocess.Popen(
+            command,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            encoding="utf-8",
+            bufsize=1,
+        )
+        threading.Thread(target=self._read_stdout, daemon=True).start()
+        threading.Thread(target=self._drain_stderr, daemon=True).start()
+
+        ready = self._wait(start_timeout)
+        if not ready or not ready.get("ready"):
+            self.kill()
+            raise MermaidRenderError("Mermaid 渲染进程启动失败")
+
+    @property
+    def pid(self) -> int:
+        return self.process.pid
+
+    def _read_stdout(self):
+        for line in self.process.stdout:
+            try:
+                self._messages.put(json.loads(line))
+            except ValueError:
+                logger.warning(f"Mermaid 渲染进程 {self.pid} 输出无法解析: {line.strip()[:200]}")
+        # stdout 关闭说明进程已退出，唤醒正在等待的任务
+        self._messages.put(None)
+
+    def _drain_stderr(self):
+        for line in self.process.stderr:
+            logger.debug(f"Mermaid 渲染进程 {self.pid}: {line.rstrip()}")
+
+    def _wait(self, timeout: float) -> Optional[Dict[str, Any]]:
+        try:
+            return self._messages.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def is_alive(self) -> bool:
+        return self.process.poll() is None
+
+    def request(self, message: Dict[str, Any], timeout: float) -> Dict[str, Any]:
+        """发送一个任务并等待对应的响应"""
+        message = dict(message, id=next(self._ids))
+        try:
+            self.process.stdin.write(json.dumps(message, ensure_ascii=False) + "\n")
+            self.process.stdin.flush()
+        except (BrokenPipeError, OSError, ValueError) as e:
+            self.broken = True
+            raise MermaidRenderError(f"Mermaid 渲染进程已退出: {e}")
+
+        while True:
+            response = self._wait(timeout)
+            if response is None:
+                self.broken = True
+                if self.is_alive():
+                    self.timed_out = True
+                    raise MermaidRenderError(f"Mermaid 渲染超时（{timeout} 秒）")
+                raise MermaidRenderError("Mermaid 渲染进程已退出")
+            if response.get("id") == message["id"]:
+                self.jobs += 1
+                return response
+
+    def render(self, code: str, options: Dict[str, Any], timeout: float) -> str:
+        response = self.request({"type": "render", "code": code, "options": options}, timeout)
+        if not response.get("ok"):
+            raise MermaidRenderError(response.get("error") or "渲染失败")
+        return response["svg"]
+
+    def ping(self, timeout: float) -> bool:
+        try:
+            return bool(self.request({"type": "ping"}, timeout).get("ok"))
+        except MermaidRenderError:
+            return False
+
+    def kill(self):
+        if self.is_alive():
+            self.process.kill()
+        try:
+            self.process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            pass
+
+
+class MermaidRendererPool:
+    """常驻渲染进程池"""
+
+    def __init__(self, command: Optional[List[str]] = None, size: int = 2, queue_size: int = 8,
+                 job_timeout: float = 10, start_timeout: float = 30, health_interval: float = 30):
+        self.command = command or shlex.split(DEFAULT_COMMAND)
+        self.size = max(1, size)
+        self.queue_size = max(0, queue_size)
+        self.job_timeout = job_timeout
+        self.start_timeout = start_timeout
+        self.health_interval = health_interval
+        self.pid = os.getpid()
+
+        self._idle: "queue.Queue[Optional[MermaidWorker]]" = queue.Queue()
+        # 正在渲染 + 排队等待的任务总数上限
+        self._admission = threading.BoundedSemaphore(self.size + self.queue_size)
+        self._lock = threading.Lock()
+        self._workers: List[MermaidWorker] = []
+        self._stopped = threading.Event()
+        self.rejected = 0
+        self.restarts = 0
+        self.timeouts = 0
+
+        # 进程按需启动：空位用 None 占位，取到时再启动
+        for _ in range(self.size):
+            self._idle.put(None)
+        if self.health_interval:
+            threading.Thread(target=self._health_loop, name="mermaid-health", daemon=True).start()
+
+    def _start_worker(self) -> MermaidWorker:
+        worker = MermaidWorker(self.command, self.start_timeout)
+        with self._lock:
+            self._workers.append(worker)
+        logger.info(f"Mermaid 渲染进程已启动: pid={worker.pid}")
+        return worker
+
+    def _discard(self, worker: Optional[MermaidWorker]):
+        if worker is None:
+            return
+        worker.kill()
+        with self._lock:
+            if worker in self._workers:
+                self._workers.remove(worker)
+            self.restarts += 1
+
+    def _retry_after(self) -> int:
+        """按当前积压估算的重试等待秒数"""
+        return max(1, int(self.job_timeout * (self.queue_size + self.size) / self.size / 2))
+
+    def render(self, code: str, options: Optional[Dict[str, Any]] = None) -> str:
+        """
+        渲染一张图，返回 SVG 文本
+
+        Raises:
+            MermaidPoolBusyError: 并发和队列已满
+            MermaidRenderError: 渲染失败或超时
+            FileNotFoundError: 未安装 node
+        """
+        if not self._admission.acquire(blocking=False):
+            self.rejected += 1
+            raise MermaidPoolBusyError(self._retry_after())
+        try:
+            try:
+                # 排队时间最多等待队列中所有任务各执行一次
+                wait = self.job_timeout * (self.queue_size // self.size + 1)
+                worker = self._idle.get(timeout=wait)
+            except queue.Empty:
+                self.rejected += 1
+                raise MermaidPoolBusyError(self._retry_after())
+
+            try:
+                if worker is None or not worker.is_alive():
+                    self._discard(worker)
+                    worker = None
+                    worker = self._start_worker()
+                return worker.render(code, options or {}, self.job_timeout)
+            finally:
+                self._release(worker)
+        finally:
+            self._admission.release()
+
+    def _release(self, worker: Optional[MermaidWorker]):
+        """归还进程；超时或崩溃的进程状态不可信，杀掉后留空位下次重启（图表语法错误不影响进程）"""
+        if worker is not None and (worker.broken or not worker.is_alive()):
+            if worker.timed_out:
+                self.timeouts += 1
+            logger.warning(f"Mermaid 渲染进程 {worker.pid} 异常，将重启")
+            self._discard(worker)
+            worker = None
+        self._idle.put(worker)
+
+    def _health_loop(self):
+        while not self._stopped.wait(self.health_interval):
+            self.check_health()
+
+    def check_health(self) -> int:
+        """逐个检查当前空闲的进程，失活或不响应 ping 的进程下次使用时重启"""
+        replaced = 0
+        for _ in range(self._idle.qsize()):
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            if worker is not None and not worker.ping(self.job_timeout):
+                logger.warning(f"Mermaid 渲染进程 {worker.pid} 健康检查失败，将重启")
+                self._discard(worker)
+                worker = None
+                replaced += 1
+            self._idle.put(worker)
+        return replaced
+
+    def shutdown(self):
+        self._stopped.set()
+        with self._lock:
+            workers = list(self._workers)
+            self._workers.clear()
+        for worker in workers:
+            worker.kill()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            workers = [{"pid": w.pid, "alive": w.is_alive(), "jobs": w.jobs} for w in self._workers]
+        return {
+            "size": self.size,
+            "queue_size": self.queue_size,
+            "idle": self._idle.qsize(),
+            "workers": workers,
+            "rejected": self.rejected,
+            "restarts": self.restarts,
+            "timeouts": self.timeouts,
+        }
+
+
+_pool: Optional[MermaidRendererPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_mermaid_pool() -> MermaidRendererPool:
+    """获取当前进程的渲染进程池（gunicorn fork 后在子进程中重新创建）"""
+    global _pool
+    with _pool_lock:
+        if _pool is None or _pool.pid != os.getpid():
+            config = current_app.config
+            command = config.get("MERMAID_RENDERER_COMMAND")
+            _pool = MermaidRendererPool(
+                command=shlex.split(command) if command else None,
+                size=int(config.get("MERMAID_POOL_SIZE") or 2),
+                queue_size=int(config.get("MERMAID_QUEUE_SIZE") or 8),
+                job_timeout=float(config.get("MERMAID_RENDER_TIMEOUT") or 10),
+                health_interval=float(config.get("MERMAID_HEALTH_INTERVAL") or 30),
+            )
+        return _pool
+
+
+def render_svg(code: str, options: Optional[Dict[str, Any]] = None) -> Tuple[str, bool]:
+    """
+    先查磁盘缓存，未命中再交给进程池渲染（缓存的是压缩后的 SVG）
+
+    Returns:
+        tuple: (SVG, 是否命中缓存)
+    """
+    pool = get_mermaid_pool()
+    return get_mermaid_cache().get_or_render(
+        mermaid_cache_key(code, options), lambda: minify_svg(pool.render(code, options))
+    )
+
+
+def render_many(diagrams: Dict[str, str], options: Optional[Dict[str, Any]] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    并发渲染多张图，并发数不超过进程池大小（不会仅凭一个批量请求就占满等待队列）
+
+    Args:
+        diagrams: {块id: Mermaid代码}
+
+    Returns:
+        Dict: {块id: {"svg", "cached"} 或 {"error", "retry_after"}}
+    """
+    if not diagrams:
+        return {}
+    # 工作线程没有应用上下文，先在当前线程取到缓存和进程池
+    cache = get_mermaid_cache()
+    pool = get_mermaid_pool()
+
+    def render_one(code):
+        try:
+            svg, cached = cache.get_or_render(
+                mermaid_cache_key(code, options), lambda: minify_svg(pool.render(code, options))
+            )
+            return {"svg": svg, "cached": cached}
+        except MermaidPoolBusyError as e:
+            return {"error": str(e), "retry_after": e.retry_after}
+        except FileNotFoundError:
+            return {"error": "mermaid-cli 未安装，请运行: npm install -g @mermaid-js/mermaid-cli"}
+        except Exception as e:
+            return {"error": str(e)}
+
+    with ThreadPoolExecutor(max_workers=min(len(diagrams), pool.size), thread_name_prefix="mermaid-batch") as executor:
+        futures = {block_id: executor.submit(render_one, code) for block_id, code in diagrams.items()}
+        return {block_id: future.result() for block_id, future in futures.items()}
+
+
+def prerender_article(content: str) -> Dict[str, Any]:
+    """
+    预渲染文章中的所有 Mermaid 图（默认渲染参数），结果写入磁盘缓存
+
+    Returns:
+        Dict: {"total": 图表数, "rendered": 成功数, "failed": {块id: 错误}}
+    """
+    results = render_many(extract_mermaid_blocks(content))
+    failed = {block_id: result["error"] for block_id, result in results.items() if "error" in result}
+    return {"total": len(results), "rendered": len(results) - len(failed), "failed": failed}
+
+
+def get_prerendered_svgs(content: str) -> Dict[str, str]:
+    """文章中已有缓存的 Mermaid 图，返回 {块id: 缓存键}（未渲染的不返回，前端照常渲染）"""
+    cache = get_mermaid_cache()
+    result = {}
+    for block_id, code in extract_mermaid_blocks(content).items():
+        key = mermaid_cache_key(code)
+        if cache.contains(key):
+            result[block_id] = key
+    return result
@@ -0,0 +1,82 @@
+/**
+ * 常驻 Mermaid 渲染进程
+ * 启动时打开一个 Chromium，之后从 stdin 逐行读取 JSON 任务、向 stdout 逐行写回结果，
+ * 避免每张图都冷启动 Node 和 Puppeteer。由 render/mermaid_pool.py 管理。
+ *
+ * 协议（每行一个 JSON）:
+ *   启动完成: {"ready": true}
+ *   请求:     {"id": 1, "type": "render", "code": "graph TD...", "options": {"theme": "default"}}
+ *             {"id": 2, "type": "ping"}
+ *   响应:     {"id": 1, "ok": true, "svg": "<svg ...>"} / {"id": 1, "ok": false, "error": "..."}
+ *
+ * 依赖全局安装的 mermaid-cli: npm install -g @mermaid-js/mermaid-cli
+ */
+import fs from 'node:fs';
+import path from 'node:path';
+import readline from 'node:readline';
+import { execSync } from 'node:child_process';
+import { createRequire } from 'node:module';
+import { pathToFileURL } from 'node:url';
+
+function globalPackageDir(name) {
+  const root = process.env.MERMAID_CLI_ROOT || execSync('npm root -g').toString().trim();
+  return path.join(root, name);
+}
+
+async function importMermaidCli() {
+  try {
+    return { cli: await import('@mermaid-js/mermaid-cli'), require: createRequire(import.meta.url) };
+  } catch (e) {
+    // ESM 不读取 NODE_PATH，全局安装时按 package.json 的 exports 手动定位入口
+    const dir = globalPackageDir('@mermaid-js/mermaid-cli');
+    const pkg = JSON.parse(fs.readFileSync(path.join(dir, 'package.json'), 'utf-8'));
+    let entry = pkg.exports?.['.'] ?? pkg.exports ?? pkg.main;
+    if (typeof entry === 'object') entry = entry.import ?? entry.default;
+    const cli = await import(pathToFileURL(path.join(dir, entry)).href);
+    return { cli, require: createRequire(path.join(dir, 'package.json')) };
+  }
+}
+
+const { cli, require } = await importMermaidCli();
+const puppeteer = (await import(pathToFileURL(require.resolve('puppeteer')).href)).default;
+
+const puppeteerConfig = process.env.MERMAID_PUPPETEER_CONFIG
+  ? JSON.parse(fs.readFileSync(process.env.MERMAID_PUPPETEER_CONFIG, 'utf-8'))
+  : {};
+const browser = await puppeteer.launch({ headless: 'new', ...puppeteerConfig });
+browser.on('disconnected', () => process.exit(1));
+
+function send(message) {
+  process.stdout.write(JSON.stringify(message) + '\n');
+}
+
+send({ ready: true });
+
+const decoder = new TextDecoder();
+const lines = readline.createInterface({ input: process.stdin });
+for await (const line of lines) {
+  if (!line.trim()) continue;
+  let job;
+  try {
+    job = JSON.parse(line);
+  } catch (e) {
+    send({ id: null, ok: false, error: `invalid request: ${e.message}` });
+    continue;
+  }
+  if (job.type === 'ping') {
+    send({ id: job.id, ok: true });
+    continue;
+  }
+  const options = job.options || {};
+  try {
+    const { data } = await cli.renderMermaid(browser, job.code, 'svg', {
+      backgroundColor: options.backgroundColor || 'white',
+      mermaidConfig: options.theme ? { theme: options.theme } : {},
+    });
+    send({ id: job.id, ok: true, svg: decoder.decode(data) });
+  } catch (e) {
+    send({ id: job.id, ok: false, error: String(e?.message || e) });
+  }
+}
+
+await browser.close();
@@ -0,0 +1,129 @@
+"""
+HTML 后处理
+一次扫描完成内部文章链接改写和标题 id 重命名；标题大纲直接取自 toc 扩展的 toc_tokens，
+并补上标题在 Markdown 原文中的行号。
+"""
+import re
+import html
+from typing import Dict, List, Any, Optional
+
+from markdown.extensions.toc import nest_toc_tokens
+
+# 只匹配需要处理的两类开始标签：<a ...> 和 <h1-6 ...>
+TAG_RE = re.compile(r"<(a|h[1-6])(\s[^>]*)?>")
+HREF_RE = re.compile(r'href="([^"]*)"')
+ID_RE = re.compile(r'id="([^"]*)"')
+
+# 行首 ATX 标题（Python-Markdown 不要求 # 后有空格），允许在引用块内
+ATX_HEADING_RE = re.compile(r"^(?:>[ ]?)*#{1,6}")
+SETEXT_UNDERLINE_RE = re.compile(r"^[=-]+[ ]*$")
+FENCE_RE = re.compile(r"^(`{3,}|~{3,})")
+MERMAID_DIV_OPEN = '<div class="mermaid"'
+
+
+def _rewrite_attrs(tag: str, attrs: str, id_map: Optional[Dict[str, str]]) -> str:
+    if tag == "a":
+        href_match = HREF_RE.search(attrs)
+        if not href_match:
+            return attrs
+        href = href_match.group(1)
+        # 内部文章链接（格式：/blog/article/{id}）
+        if href.startswith("/blog/article/") or href.startswith("article/"):
+            article_id = href.split("/")[-1]
+            return attrs.replace(
+                f'href="{href}"',
+                f'href="#" data-article-id="{article_id}" class="internal-article-link"'
+            )
+        # 标题永久链接跟随标题 id 重命名
+        if id_map and href.startswith("#") and href[1:] in id_map:
+            return attrs.replace(f'href="{href}"', f'href="#{id_map[href[1:]]}"')
+        return attrs
+
+    if id_map:
+        id_match = ID_RE.search(attrs)
+        if id_match and id_match.group(1) in id_map:
+            return attrs.replace(f'id="{id_match.group(1)}"', f'id="{id_map[id_match.group(1)]}"')
+    return attrs
+
+
+def postprocess_html(html_content: str, id_map: Optional[Dict[str, str]] = None) -> str:
+    """
+    单次扫描处理HTML
+
+    Args:
+        html_content: Markdown 转换后的HTML
+        id_map: 标题 id 重命名表 {旧id: 新id}，同时改写对应的永久链接
+
+    Returns:
+        str: 处理后的HTML
+    """
+
+    def replace(match):
+        attrs = match.group(2)
+        if not attrs:
+            return match.group(0)
+        new_attrs = _rewrite_attrs(match.group(1), attrs, id_map)
+        if new_attrs == attrs:
+            return match.group(0)
+        return f"<{match.group(1)}{new_attrs}>"
+
+    return TAG_RE.sub(replace, html_content)
+
+
+def flatten_toc_tokens(toc_tokens: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """把 toc 扩展的嵌套 toc_tokens 展开为按文档顺序排列的扁平标题列表"""
+    headings = []
+
+    def walk(tokens):
+        for token in tokens:
+            headings.append({
+                "level": token["level"],
+                "title": html.unescape(token["name"]).strip(),
+                "anchor": token["id"],
+                "line": 0
+            })
+            walk(token.get("children", []))
+
+    walk(toc_tokens)
+    return headings
+
+
+def find_heading_lines(text: str) -> List[int]:
+    """
+    找出 Markdown 文本中标题所在的行（从0开始），跳过围栏代码块和 mermaid 块
+
+    Returns:
+        list: 按出现顺序排列的行下标
+    """
+    lines = text.split("\n")
+    result = []
+    fence = None
+    in_mermaid = False
+    previous_blank = True
+    for index, line in enumerate(lines):
+        if fence:
+            if line.rstrip(" ") == fence:
+                fence = None
+            previous_blank = False
+            continue
+        if in_mermaid:
+            in_mermaid = not line.startswith("</div>")
+            previous_blank = False
+            continue
+        fence_match = FENCE_RE.match(line)
+        if fence_match:
+            fence = fence_match.group(1)
+        elif line.startswith(MERMAID_DIV_OPEN):
+            in_mermaid = True
+        elif ATX_HEADING_RE.match(line):
+            result.append(index)
+        elif (previous_blank and line.strip() and index + 1 < len(lines)
+              and SETEXT_UNDERLINE_RE.match(lines[index + 1])):
+            result.append(index)
+        previous_blank = not line.strip()
+    return result
+
+
+def build_toc_tree(headings: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """由扁平标题列表构建嵌套目录树（每个节点带 children）"""
+    return nest_toc_tokens([dict(heading) for heading in headings])
@@ -0,0 +1,66 @@
+"""
+SVG 压缩
+去掉 mermaid 输出中的注释、排版用的换行缩进、默认值属性、空属性，合并 style 属性中重复的声明，
+压缩内嵌 <style> 中的 CSS。只做不改变渲染结果的文本级处理。
+"""
+import re
+
+COMMENT_RE = re.compile(r"<!--.*?-->", re.DOTALL)
+XML_DECL_RE = re.compile(r"^\s*<\?xml[^>]*\?>\s*")
+# 只去掉含换行的标签间空白（排版缩进）；同一行内的空格可能是文字内容（foreignObject 中的 HTML）
+LAYOUT_WHITESPACE_RE = re.compile(r">\s*\n\s*<")
+EMPTY_ATTR_RE = re.compile(r'\s(?:style|class|transform)=""')
+# 取值等于 SVG 默认值的属性
+DEFAULT_ATTR_RE = re.compile(
+    r'\s(?:fill-opacity|stroke-opacity|opacity)="1"'
+    r'|\sstroke-dasharray="none"'
+    r'|\stransform="translate\(0,\s*0\)"'
+)
+STYLE_ATTR_RE = re.compile(r'\sstyle="([^"]*)"')
+STYLE_TAG_RE = re.compile(r"(<style[^>]*>)(.*?)(</style>)", re.DOTALL)
+CSS_COMMENT_RE = re.compile(r"/\*.*?\*/", re.DOTALL)
+CSS_SPACE_RE = re.compile(r"\s*([{};,>])\s*")
+# 声明块（最内层的 {...}）；冒号两侧的空白只在声明块内去掉，选择器中的 " :root" 与 ":root" 含义不同
+CSS_BLOCK_RE = re.compile(r"\{([^{}]*)\}")
+CSS_COLON_RE = re.compile(r"\s*:\s*")
+XLINK_NS = ' xmlns:xlink="http://www.w3.org/1999/xlink"'
+
+
+def _dedupe_style(match) -> str:
+    """style 属性中同名声明只保留最后一个（与浏览器的生效规则一致）"""
+    if "url(" in match.group(1):
+        # url() 中可能有分号，不拆分
+        return match.group(0)
+    declarations = {}
+    for declaration in match.group(1).split(";"):
+        name, sep, value = declaration.partition(":")
+        name = name.strip()
+        if not sep or not name:
+            continue
+        declarations.pop(name, None)
+        declarations[name] = value.strip()
+    if not declarations:
+        return ""
+    return ' style="' + ";".join(f"{name}:{value}" for name, value in declarations.items()) + '"'
+
+
+def _minify_css(match) -> str:
+    css = CSS_COMMENT_RE.sub("", match.group(2))
+    css = CSS_SPACE_RE.sub(r"\1", css.strip())
+    css = CSS_BLOCK_RE.sub(lambda block: "{" + CSS_COLON_RE.sub(":", block.group(1)) + "}", css)
+    css = re.sub(r"\s+", " ", css).replace(";}", "}")
+    return match.group(1) + css + match.group(3)
+
+
+def minify_svg(svg: str) -> str:
+    """压缩 SVG 文本"""
+    svg = XML_DECL_RE.sub("", svg)
+    svg = COMMENT_RE.sub("", svg)
+    svg = STYLE_TAG_RE.sub(_minify_css, svg)
+    svg = LAYOUT_WHITESPACE_RE.sub("><", svg)
+    svg = STYLE_ATTR_RE.sub(_dedupe_style, svg)
+    svg = DEFAULT_ATTR_RE.sub("", svg)
+    svg = EMPTY_ATTR_RE.sub("", svg)
+    if XLINK_NS in svg and "xlink:" not in svg.replace(XLINK_NS, ""):
+        svg = svg.replace(XLINK_NS, "")
+    return svg.strip()
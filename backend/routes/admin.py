@@ -1,15 +1,43 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from auth.auth_utils import admin_required
 from model.database import (
     db, User, Category, Question, Tag, Article, 
     ArticleQuestionRelation, QuestionFavorite, BlogCategory, Feedback
 )
 from config.config import logger
+from render.engine import render
+from render.bulk import start_background_job, get_current_job, get_checkpoint
+from render.mermaid_pool import prerender_article
+from model.blog_cache import get_cache
+import os
 import math
 
 admin_bp = Blueprint("admin", __name__, url_prefix="/api/v1/admin")
 
 
+def prerender_article_mermaid(article, data):
+    """
+    保存文章后预渲染其中的 Mermaid 图（请求体 prerender_mermaid 优先，默认取 MERMAID_PRERENDER_ON_SAVE）
+    渲染失败不影响保存，结果附在响应里供后台提示
+
+    Returns:
+        dict: 预渲染结果，未开启时为 None
+    """
+    enabled = data.get("prerender_mermaid", current_app.config.get("MERMAID_PRERENDER_ON_SAVE", False))
+    if not enabled or not article.content:
+        return None
+    try:
+        result = prerender_article(article.content)
+    except Exception as e:
+        logger.error(f"预渲染文章 {article.id} 的 Mermaid 图失败: {e}", exc_info=True)
+        return {"error": str(e)}
+    if result["total"]:
+        # 让文章详情缓存重新生成，带上预渲染的 SVG 引用
+        get_cache().invalidate_article_cache(article.id)
+        logger.info(f"文章 {article.id} Mermaid 预渲染: {result['rendered']}/{result['total']}")
+    return result
+
+
 def sync_question_article_relations(question, article_ids):
     """同步题目与文章的关联关系"""
     if article_ids is None:
@@ -477,6 +505,8 @@ def create_article():
             category_id=data.get("category_id"),
             order=data.get("order", 999999)
         )
+        # 写入时渲染，读取时直接使用
+        article.apply_render_result(render(article.content))
         db.session.add(article)
         db.session.flush()
         
@@ -500,7 +530,11 @@ def create_article():
                 db.session.add(relation)
         
         db.session.commit()
-        return jsonify({"success": True, "data": article.to_dict(include_content=True)}), 201
+        result = article.to_dict(include_content=True)
+        mermaid = prerender_article_mermaid(article, data)
+        if mermaid is not None:
+            result["mermaid"] = mermaid
+        return jsonify({"success": True, "data": result}), 201
     except Exception as e:
         db.session.rollback()
         logger.error(f"创建文章失败: {e}", exc_info=True)
@@ -533,6 +567,7 @@ def update_article(article_id):
             article.description = data["description"]
         if "content" in data:
             article.content = data["content"]
+            article.apply_render_result(render(article.content))
         if "category_id" in data:
             article.category_id = data.get("category_id")
         if "order" in data:
@@ -568,7 +603,12 @@ def update_article(article_id):
                 db.session.add(relation)
         
         db.session.commit()
-        return jsonify({"success": True, "data": article.to_dict(include_content=True)})
+        result = article.to_dict(include_content=True)
+        if "content" in data or "prerender_mermaid" in data:
+            mermaid = prerender_article_mermaid(article, data)
+            if mermaid is not None:
+                result["mermaid"] = mermaid
+        return jsonify({"success": True, "data": result})
     except Exception as e:
         db.session.rollback()
         logger.error(f"更新文章失败: {e}", exc_info=True)
@@ -595,6 +635,51 @@ def delete_article(article_id):
         return jsonify({"success": False, "error": str(e)}), 500
 
 
+@admin_bp.route("/articles/rerender", methods=["POST"])
+@admin_required
+def rerender_articles():
+    """后台并行重新渲染所有文章（修改渲染配置后使用）"""
+    try:
+        data = request.get_json(silent=True) or {}
+        try:
+            workers = data.get("workers")
+            workers = int(workers) if workers is not None else None
+            batch_size = int(data.get("batch_size", 50))
+            start_after = int(data.get("start_after", 0))
+        except (TypeError, ValueError):
+            return jsonify({"success": False, "error": "workers、batch_size、start_after 必须为整数"}), 400
+        if workers is not None and not 1 <= workers <= (os.cpu_count() or 1) * 2:
+            return jsonify({"success": False, "error": f"workers 必须在 1 到 {(os.cpu_count() or 1) * 2} 之间"}), 400
+        if not 1 <= batch_size <= 1000:
+            return jsonify({"success": False, "error": "batch_size 必须在 1 到 1000 之间"}), 400
+        if start_after < 0:
+            return jsonify({"success": False, "error": "start_after 不能为负数"}), 400
+        if data.get("resume"):
+            start_after = get_checkpoint()
+        
+        job = start_background_job(
+            current_app._get_current_object(),
+            workers=workers,
+            batch_size=batch_size,
+            start_after=start_after,
+            force=True
+        )
+        return jsonify({"success": True, "data": job.to_dict()}), 202
+    except Exception as e:
+        logger.error(f"启动批量渲染失败: {e}", exc_info=True)
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
+@admin_bp.route("/articles/rerender", methods=["GET"])
+@admin_required
+def get_rerender_progress():
+    """查询批量渲染进度"""
+    job = get_current_job()
+    if not job:
+        return jsonify({"success": True, "data": {"status": "idle", "last_id": get_checkpoint()}})
+    return jsonify({"success": True, "data": job.to_dict()})
+
+
 # ==================== 关联管理 ====================
 
 @admin_bp.route("/articles/<int:article_id>/questions", methods=["GET"])
@@ -1,92 +1,142 @@
 """
 博客相关API路由（数据库版本）
 """
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, request, jsonify, current_app, url_for
 from model.database import db, Article, Tag, ArticleQuestionRelation, Question, BlogCategory
-from model.blog_cache import get_cache
+from model.blog_cache import get_cache, STATE_COMPUTED, STATE_STALE
+from model import cache_keys, response_cache, popularity
+from model.cache_warmup import warm_up, get_last_report
+from model.view_counter import record_view, pending_views
 from config.config import logger
-import markdown
-import re
-import hashlib
+from auth.auth_utils import admin_required
+from render.engine import render, compute_content_hash
+from render.postprocess import build_toc_tree
+from render.mermaid_pool import get_prerendered_svgs
 import math
-from markdown.extensions import toc, codehilite, tables, fenced_code
 
 blog_bp = Blueprint("blog", __name__, url_prefix="/api/v1/blog")
 
 
-def convert_markdown_to_html(content):
-    """将markdown转换为HTML"""
-    # 处理Mermaid代码块
-    content = process_mermaid_blocks(content)
-
-    md = markdown.Markdown(
-        extensions=["toc", "codehilite", "tables", "fenced_code", "attr_list"],
-        extension_configs={"toc": {"permalink": True, "permalink_title": "永久链接"}},
-    )
-
-    html_content = md.convert(content)
-
-    # 处理文章内部链接
-    html_content = process_article_links(html_content)
-
-    return html_content
-
-
-def process_mermaid_blocks(content):
-    """处理Mermaid代码块，将其转换为HTML div"""
-    pattern = r"```mermaid\s*\n(.*?)```"
+def build_category_list():
+    """从数据库构建博客分类树（含每个分类下的文章列表和数量）"""
+    # 从 blog_categories 表获取所有分类（树形结构）
+    all_categories = BlogCategory.query.order_by(BlogCategory.order, BlogCategory.id).all()
+
+    # 构建分类字典
+    category_dict = {}
+    root_categories = []
+
+    # 第一遍：创建所有分类节点
+    for cat in all_categories:
+        category_dict[cat.id] = {
+            'id': cat.id,
+            'name': cat.name,
+            'description': cat.description,
+            'order': cat.order,
+            'parent_id': cat.parent_id,
+            'children': [],
+            'items': [],
+            'count': 0,
+            'views': 0,
+            'last_updated': None
+        }
 
-    def replace_mermaid(match):
-        mermaid_code = match.group(1).strip()
-        mermaid_id = hashlib.md5(mermaid_code.encode()).hexdigest()[:8]
-        return f'<div class="mermaid" id="mermaid-{mermaid_id}">\n{mermaid_code}\n</div>'
+    # 第二遍：建立父子关系
+    for cat in all_categories:
+        cat_data = category_dict[cat.id]
+        if cat.parent_id is None:
+            root_categories.append(cat_data)
+        else:
+            if cat.parent_id in category_dict:
+                category_dict[cat.parent_id]['children'].append(cat_data)
+            else:
+                logger.warning(f"分类 {cat.id} 的父分类 {cat.parent_id} 不存在")
+
+    # 第三遍：统计文章数量并添加文章列表
+    articles = Article.query.all()
+    for article in articles:
+        if article.category_id and article.category_id in category_dict:
+            cat_data = category_dict[article.category_id]
+            cat_data['count'] += 1
+            cat_data['views'] += article.view_count or 0
+            if article.updated_at and (cat_data['last_updated'] is None or article.updated_at > cat_data['last_updated']):
+                cat_data['last_updated'] = article.updated_at
+            cat_data['items'].append({
+                'id': article.id,
+                'title': article.title,
+                'category_id': article.category_id
+            })
 
-    return re.sub(pattern, replace_mermaid, content, flags=re.DOTALL)
+    # 递归计算总数量、总浏览量和最后更新时间（包括子分类的文章）
+    def count_total(cat_data):
+        total = cat_data['count']
+        for child in cat_data['children']:
+            total += count_total(child)
+            cat_data['views'] += child['views']
+            if child['last_updated'] and (cat_data['last_updated'] is None or child['last_updated'] > cat_data['last_updated']):
+                cat_data['last_updated'] = child['last_updated']
+        cat_data['total_count'] = total
+        return total
+
+    for cat_data in root_categories:
+        count_total(cat_data)
+
+    # 递归转换分类数据，确保子分类也包含 items
+    def convert_category_data(cat_data):
+        result = {
+            "name": cat_data['name'],
+            "id": cat_data['id'],
+            "count": cat_data['count'],
+            "total_count": cat_data.get('total_count', cat_data['count']),
+            "items": cat_data['items'],
+            "children": [],
+            "description": cat_data.get('description') or f"{cat_data['name']}相关文章",
+            "order": cat_data.get('order', 0),
+            "lastUpdated": cat_data['last_updated'].isoformat() if cat_data['last_updated'] else None,
+            "featured": False,
+            "trending": False,
+            "latest": False,
+            "views": cat_data['views'],
+            "popularTags": []
+        }
+        # 递归处理子分类
+        if cat_data['children']:
+            result['children'] = [convert_category_data(child) for child in cat_data['children']]
+        return result
+
+    # 转换为列表格式（保持向后兼容）
+    category_list = []
+    for cat_data in root_categories:
+        category_list.append(convert_category_data(cat_data))
+
+    # 精选 / 热门：长期 / 近期热度最高的几个一级分类（热度每小时汇总后分类树缓存失效）；
+    # 还没有热度数据（Redis 不可用或刚部署）时精选按数据库中的浏览量，不标记热门
+    latest_count = current_app.config.get("BLOG_LATEST_COUNT", 1)
+    root_ids = [category["id"] for category in category_list]
+    popular_scores = popularity.scores("popular", "category", root_ids)
+    if not popular_scores or not any(popular_scores.values()):
+        popular_scores = {category["id"]: category["views"] for category in category_list}
+    trending_scores = popularity.scores("trending", "category", root_ids) or {}
+    for flag, scores, count in (
+        ("featured", popular_scores, int(current_app.config.get("BLOG_FEATURED_COUNT", 2))),
+        ("trending", trending_scores, int(current_app.config.get("BLOG_TRENDING_COUNT", 3))),
+    ):
+        ranked = sorted((cid for cid in root_ids if scores.get(cid, 0) > 0), key=lambda cid: scores[cid], reverse=True)
+        for category in category_list:
+            if category["id"] in ranked[:count]:
+                category[flag] = True
 
+    # 设置最新标签
+    categories_with_date = [c for c in category_list if c.get("lastUpdated")]
+    if categories_with_date:
+        categories_with_date.sort(key=lambda x: x["lastUpdated"], reverse=True)
+        for i in range(min(latest_count, len(categories_with_date))):
+            for category in category_list:
+                if category["name"] == categories_with_date[i]["name"]:
+                    category["latest"] = True
+                    break
 
-def process_article_links(html_content):
-    """处理HTML中的文章内部链接"""
-    def replace_link_href(match):
-        a_tag = match.group(0)
-        href_match = re.search(r'href="([^"]*)"', a_tag)
-        if href_match:
-            href = href_match.group(1)
-            
-            # 处理内部文章链接（格式：/blog/article/{id}）
-            if href.startswith('/blog/article/') or href.startswith('article/'):
-                article_id = href.split('/')[-1]
-                new_a_tag = a_tag.replace(
-                    f'href="{href}"',
-                    f'href="#" data-article-id="{article_id}" class="internal-article-link"'
-                )
-                return new_a_tag
-        
-        return a_tag
-
-    html_content = re.sub(r"<a[^>]*>", replace_link_href, html_content)
-    return html_content
-
-
-def extract_headings_from_html(html_content):
-    """从HTML内容中提取标题信息"""
-    headings = []
-    pattern = r'<h([1-6])[^>]*id="([^"]*)"[^>]*>(.*?)</h[1-6]>'
-    matches = re.findall(pattern, html_content, re.DOTALL)
-    
-    for match in matches:
-        level = int(match[0])
-        anchor_id = match[1]
-        title_html = match[2]
-        title_text = re.sub(r"<a[^>]*>.*?</a>", "", title_html).strip()
-        
-        headings.append({
-            "level": level,
-            "title": title_text,
-            "anchor": anchor_id,
-            "line": 0
-        })
-    
-    return headings
+    return category_list
 
 
 @blog_bp.route("/categories", methods=["GET"])
@@ -94,130 +144,84 @@ def get_categories():
     """获取所有分类（基于新的树形结构）"""
     try:
         cache = get_cache()
-        cache_key = "blog:categories"
+        cache_key = cache_keys.blog_categories_key(cache)
+        resp_key = response_cache.response_key("categories", cache)
         clear_cache = request.args.get("clear_cache", "false").lower() == "true"
         
         if clear_cache:
-            cache.delete(cache_key)
+            cache.delete_many([cache_key, resp_key])
             logger.info("已清除分类缓存")
-        
-        cached_data = cache.get(cache_key)
-        if cached_data and not clear_cache:
-            logger.info("从缓存获取分类列表")
-            return jsonify({"success": True, "data": cached_data, "cached": True})
-
-        # 从 blog_categories 表获取所有分类（树形结构）
-        all_categories = BlogCategory.query.order_by(BlogCategory.order, BlogCategory.id).all()
-        
-        # 构建分类字典
-        category_dict = {}
-        root_categories = []
-        
-        # 第一遍：创建所有分类节点
-        for cat in all_categories:
-            category_dict[cat.id] = {
-                'id': cat.id,
-                'name': cat.name,
-                'description': cat.description,
-                'order': cat.order,
-                'parent_id': cat.parent_id,
-                'children': [],
-                'items': [],
-                'count': 0
-            }
-        
-        # 第二遍：建立父子关系
-        for cat in all_categories:
-            cat_data = category_dict[cat.id]
-            if cat.parent_id is None:
-                root_categories.append(cat_data)
-            else:
-                if cat.parent_id in category_dict:
-                    category_dict[cat.parent_id]['children'].append(cat_data)
-                else:
-                    logger.warning(f"分类 {cat.id} 的父分类 {cat.parent_id} 不存在")
-        
-        # 第三遍：统计文章数量并添加文章列表
-        articles = Article.query.all()
-        for article in articles:
-            if article.category_id and article.category_id in category_dict:
-                cat_data = category_dict[article.category_id]
-                cat_data['count'] += 1
-                cat_data['items'].append({
-                    'id': article.id,
-                    'title': article.title,
-                    'category_id': article.category_id
-                })
-        
-        # 递归计算总数量（包括子分类的文章）
-        def count_total(cat_data):
-            total = cat_data['count']
-            for child in cat_data['children']:
-                total += count_total(child)
-            cat_data['total_count'] = total
-            return total
-        
-        for cat_data in root_categories:
-            count_total(cat_data)
-        
-        # 递归转换分类数据，确保子分类也包含 items
-        def convert_category_data(cat_data):
-            result = {
-                "name": cat_data['name'],
-                "id": cat_data['id'],
-                "count": cat_data['count'],
-                "total_count": cat_data.get('total_count', cat_data['count']),
-                "items": cat_data['items'],
-                "children": [],
-                "description": cat_data.get('description') or f"{cat_data['name']}相关文章",
-                "order": cat_data.get('order', 0),
-                "lastUpdated": None,  # 可以后续添加
-                "featured": False,
-                "trending": False,
-                "latest": False,
-                "views": cat_data.get('total_count', cat_data['count']) * 100,
-                "popularTags": []
-            }
-            # 递归处理子分类
-            if cat_data['children']:
-                result['children'] = [convert_category_data(child) for child in cat_data['children']]
-            return result
-        
-        # 转换为列表格式（保持向后兼容）
-        category_list = []
-        for cat_data in root_categories:
-            category_list.append(convert_category_data(cat_data))
-
-        # 根据配置设置分类标签
-        featured_categories = current_app.config.get("BLOG_FEATURED_CATEGORIES", [])
-        trending_categories = current_app.config.get("BLOG_TRENDING_CATEGORIES", [])
-        latest_count = current_app.config.get("BLOG_LATEST_COUNT", 1)
-        
-        for category in category_list:
-            if category["name"] in featured_categories:
-                category["featured"] = True
-            if category["name"] in trending_categories:
-                category["trending"] = True
-        
-        # 设置最新标签
-        categories_with_date = [c for c in category_list if c.get("lastUpdated")]
-        if categories_with_date:
-            categories_with_date.sort(key=lambda x: x["lastUpdated"], reverse=True)
-            for i in range(min(latest_count, len(categories_with_date))):
-                for category in category_list:
-                    if category["name"] == categories_with_date[i]["name"]:
-                        category["latest"] = True
-                        break
-        
-        # 缓存2小时
-        cache.set(cache_key, category_list, 7200)
-
-        return jsonify({"success": True, "data": category_list, "cached": False})
+        else:
+            # 响应缓存命中：直接返回编码好的字节
+            response = response_cache.get_response(resp_key, cache)
+            if response is not None:
+                return response
+        
+        # 未命中时只有一个请求重建分类树，其余请求等待它的结果或拿旧值
+        category_list, state = cache.get_or_compute_state(cache_key, build_category_list, 7200)
+        if state != STATE_COMPUTED:
+            logger.debug("从缓存获取分类列表")
+
+        return response_cache.cached_json(
+            resp_key, {"success": True, "data": category_list, "cached": state != STATE_COMPUTED}, 7200,
+            cache=cache, stale=state == STATE_STALE,
+        )
     except Exception as e:
         logger.error(f"获取分类失败: {e}", exc_info=True)
         return jsonify({"success": False, "error": str(e)}), 500
 
 
+def build_article_page(category_id=None, tag="", search="", page=1, page_size=20):
+    """从数据库查询一页文章列表，返回 {"data": 文章列表, "pagination": 分页信息}"""
+    # 构建查询
+    query = Article.query
+
+    # 分类筛选
+    if category_id:
+        query = query.filter_by(category_id=category_id)
+
+    # 标签筛选
+    if tag:
+        tag_obj = Tag.query.filter_by(name=tag).first()
+        if tag_obj:
+            query = query.filter(Article.tags.contains(tag_obj))
+
+    # 搜索（标题和描述）
+    if search:
+        query = query.filter(
+            db.or_(
+                Article.title.like(f"%{search}%"),
+                Article.description.like(f"%{search}%")
+            )
+        )
+
+    # 总数
+    total = query.count()
+
+    # 分页（列表不需要正文和HTML，避免加载大字段）
+    articles = query.options(
+        db.defer(Article.content), db.defer(Article.html_content), db.defer(Article.headings)
+    ).order_by(Article.order, Article.created_at.desc()).offset((page - 1) * page_size).limit(page_size).all()
+
+    result = [a.to_dict(include_content=False) for a in articles]
+
+    # 阅读时间和字数（写入时已计算）
+    for article_data, article_obj in zip(result, articles):
+        if article_obj.word_count:
+            article_data["reading_time"] = article_obj.reading_time
+            article_data["word_count"] = article_obj.word_count
+
+    return {
+        "data": result,
+        "pagination": {
+            "page": page,
+            "page_size": page_size,
+            "total": total,
+            "total_pages": math.ceil(total / page_size) if page_size > 0 else 0
+        }
+    }
+
+
 @blog_bp.route("/articles", methods=["GET"])
 def get_articles():
     """获取文章列表"""
@@ -227,141 +231,137 @@ def get_articles():
         tag = request.args.get("tag", "")
         page = request.args.get("page", 1, type=int)
         page_size = request.args.get("page_size", 20, type=int)
-        
-        # 构建查询
-        query = Article.query
-        
-        # 分类筛选（支持 category_id 或 category 名称）
+
+        # 分类筛选（支持 category_id 或 category 名称），名称先换成 ID，同一分类只对应一个缓存键
         category_id = request.args.get("category_id", type=int)
-        if category_id:
-            query = query.filter_by(category_id=category_id)
-        elif category:
-            # 如果传入的是分类名称，先查找分类 ID
+        if not category_id and category:
             blog_category = BlogCategory.query.filter_by(name=category).first()
-            if blog_category:
-                query = query.filter_by(category_id=blog_category.id)
-            else:
-                # 如果找不到分类，返回空结果
-                query = query.filter(Article.id == -1)  # 永远不匹配的条件
-        
-        # 标签筛选
-        if tag:
-            tag_obj = Tag.query.filter_by(name=tag).first()
-            if tag_obj:
-                query = query.filter(Article.tags.contains(tag_obj))
+            # 找不到分类时用不存在的 ID，返回空结果
+            category_id = blog_category.id if blog_category else -1
 
-        # 搜索（标题和描述）
         if search:
-            query = query.filter(
-                db.or_(
-                    Article.title.like(f"%{search}%"),
-                    Article.description.like(f"%{search}%")
-                )
-            )
-        
-        # 总数
-        total = query.count()
-        
-        # 分页
-        articles = query.order_by(Article.order, Article.created_at.desc()).offset((page - 1) * page_size).limit(page_size).all()
-        
-        result = [a.to_dict(include_content=False) for a in articles]
-        
-        # 估算阅读时间
-        for article_data, article_obj in zip(result, articles):
-            if article_obj.content:
-                article_data["reading_time"] = max(1, len(article_obj.content) // 250)
-                article_data["word_count"] = len(article_obj.content)
+            # 搜索词组合无限，不缓存
+            page_data = build_article_page(category_id, tag, search, page, page_size)
+            return jsonify({"success": True, **page_data})
 
-        return jsonify({
-            "success": True, 
-            "data": result,
-            "pagination": {
-                "page": page,
-                "page_size": page_size,
-                "total": total,
-                "total_pages": math.ceil(total / page_size) if page_size > 0 else 0
-            }
-        })
+        cache = get_cache()
+        resp_key = response_cache.response_key("articles", cache)
+        response = response_cache.get_response(resp_key, cache)
+        if response is not None:
+            return response
+
+        cache_key = cache_keys.article_page_key(category_id, tag, page, page_size, cache)
+        page_data, state = cache.get_or_compute_state(
+            cache_key,
+            lambda: build_article_page(category_id, tag, "", page, page_size),
+            cache.cache_ttl["articles"],
+        )
+        return response_cache.cached_json(
+            resp_key, {"success": True, **page_data}, cache.cache_ttl["articles"], cache=cache,
+            stale=state == STATE_STALE,
+        )
     except Exception as e:
         logger.error(f"获取文章列表失败: {e}", exc_info=True)
         return jsonify({"success": False, "error": str(e)}), 500
 
 
+def build_article_detail(article_id):
+    """从数据库构建文章详情（未命中缓存时调用；浏览量由 model.view_counter 另行累计）"""
+    # 从数据库获取
+    article = Article.query.get_or_404(article_id)
+
+    # 写入时已渲染；旧数据或绕过后台直接改库的行在这里临时渲染，不回写数据库
+    # （读请求不产生写入，也不触发缓存失效；由 backfill-articles 或后台保存时持久化）
+    if article.html_content is None or article.content_hash != compute_content_hash(article.content):
+        result = render(article.content)
+        html_content, headings = result.html, result.headings
+        reading_time, word_count = result.reading_time, result.word_count
+    else:
+        html_content, headings = article.html_content, article.get_headings()
+        reading_time, word_count = article.reading_time, article.word_count
+
+    # 保存时已预渲染的 Mermaid 图：{块id: SVG 地址}，前端可直接引用而不必再调用渲染接口
+    mermaid_svgs = {
+        block_id: url_for("mermaid.get_cached_svg", cache_key=key)
+        for block_id, key in get_prerendered_svgs(article.content).items()
+    }
+
+    # 获取关联的题目
+    related_questions = []
+    relations = ArticleQuestionRelation.query.filter_by(article_id=article_id).all()
+    for relation in relations:
+        question = relation.question
+        related_questions.append({
+            "id": question.id,
+            "title": question.title,
+            "type": question.type,
+            "difficulty": question.difficulty,
+            "tags": [tag.name for tag in question.tags] if question.tags else []
+        })
+
+    # 构建文章详情
+    article_detail = {
+        "id": article.id,
+        "title": article.title,
+        "description": article.description,
+        "tags": [tag.name for tag in article.tags] if article.tags else [],
+        "category_id": article.category_id,
+        "category": article.category.name if article.category else None,
+        "createdAt": article.created_at.isoformat() if article.created_at else None,
+        "updatedAt": article.updated_at.isoformat() if article.updated_at else None,
+        "content": article.content,
+        "html_content": html_content,
+        "headings": headings,
+        "toc": build_toc_tree(headings),
+        "mermaid_svgs": mermaid_svgs,
+        "reading_time": reading_time,
+        "word_count": word_count,
+        "view_count": article.view_count,
+        "related_questions": related_questions
+    }
+
+    return article_detail
+
+
+def article_dependency_tags(article_detail):
+    """文章详情里带有分类名、标签名和关联题目，这些数据变更时同样需要失效"""
+    tags = [cache_keys.article_tag(article_detail["id"]), cache_keys.category_tag(article_detail["category_id"])]
+    if article_detail["tags"]:
+        tag_ids = Tag.query.with_entities(Tag.id).filter(Tag.name.in_(article_detail["tags"])).all()
+        tags += [cache_keys.tag_tag(tag_id) for tag_id, in tag_ids]
+    tags += [cache_keys.question_tag(question["id"]) for question in article_detail["related_questions"]]
+    return tags
+
+
 @blog_bp.route("/articles/<int:article_id>", methods=["GET"])
 def get_article(article_id):
     """获取单篇文章"""
     try:
         cache = get_cache()
-        cache_key = f"blog:article:{article_id}"
-        cached_data = cache.get(cache_key)
-
-        if cached_data:
-            logger.info(f"从缓存获取文章详情: {article_id}")
-            return jsonify({"success": True, "data": cached_data, "cached": True})
-
-        # 从数据库获取
-        article = Article.query.get_or_404(article_id)
-        
-        # 增加浏览量
-        article.view_count += 1
-        db.session.commit()
-        
-        # 生成内容哈希
-        content_hash = hashlib.md5(article.content.encode()).hexdigest() if article.content else ""
-        
-        # 转换Markdown为HTML（如果未缓存或内容已更新）
-        cache_html_key = f"blog:article_html:{article_id}:{content_hash}"
-        html_content = cache.get(cache_html_key)
-        
-        if not html_content:
-            html_content = convert_markdown_to_html(article.content)
-            # 缓存HTML内容（8小时）
-            cache.set(cache_html_key, html_content, 28800)
-
-        # 从HTML中提取标题大纲
-        headings = extract_headings_from_html(html_content)
-
-        # 计算阅读时间和字数
-        reading_time = max(1, len(article.content) // 250) if article.content else 0
-        word_count = len(article.content) if article.content else 0
-        
-        # 获取关联的题目
-        related_questions = []
-        relations = ArticleQuestionRelation.query.filter_by(article_id=article_id).all()
-        for relation in relations:
-            question = relation.question
-            related_questions.append({
-                "id": question.id,
-                "title": question.title,
-                "type": question.type,
-                "difficulty": question.difficulty,
-                "tags": [tag.name for tag in question.tags] if question.tags else []
-            })
-
-        # 构建文章详情
-        article_detail = {
-            "id": article.id,
-            "title": article.title,
-            "description": article.description,
-            "tags": [tag.name for tag in article.tags] if article.tags else [],
-            "category_id": article.category_id,
-            "category": article.category.name if article.category else None,
-            "createdAt": article.created_at.isoformat() if article.created_at else None,
-            "updatedAt": article.updated_at.isoformat() if article.updated_at else None,
-            "content": article.content,
-            "html_content": html_content,
-            "headings": headings,
-            "reading_time": reading_time,
-            "word_count": word_count,
-            "view_count": article.view_count,
-            "related_questions": related_questions
-        }
-
-        # 缓存文章详情（4小时）
-        cache.set(cache_key, article_detail, 14400)
-
-        return jsonify({"success": True, "data": article_detail, "cached": False})
+        resp_key = response_cache.response_key("article", cache)
+        # 响应缓存命中：直接返回编码好（大文章预先 gzip）的字节，不反序列化
+        response = response_cache.get_response(resp_key, cache)
+        if response is not None:
+            # 命中缓存（包括 304）同样计入浏览量
+            record_view(article_id)
+            return response
+
+        cache_key = cache_keys.article_key(article_id, cache)
+        # 未命中时只有一个请求重建（渲染 Markdown），其余请求等待它的结果或拿旧值
+        article_detail, state = cache.get_or_compute_state(
+            cache_key, lambda: build_article_detail(article_id), 14400, tags=article_dependency_tags
+        )
+        if state != STATE_COMPUTED:
+            logger.debug(f"从缓存获取文章详情: {article_id}")
+        record_view(article_id)
+
+        # 旧值（其他 worker 正在重建或已软过期）不写入响应缓存，不必计算依赖标签
+        stale = state == STATE_STALE
+        return response_cache.cached_json(
+            resp_key, {"success": True, "data": article_detail, "cached": state != STATE_COMPUTED}, 14400,
+            None if stale else article_dependency_tags(article_detail), cache,
+            last_modified=article_detail.get("updatedAt"), stale=stale,
+        )
     except Exception as e:
         logger.error(f"获取文章详情失败: {e}", exc_info=True)
         return jsonify({"success": False, "error": str(e)}), 500
@@ -421,6 +421,110 @@ def search_articles():
         return jsonify({"success": False, "error": str(e)}), 500
 
 
+SUMMARY_FIELDS = ("id", "title", "description", "category_id", "category", "view_count")
+
+
+def _article_summaries(ids):
+    """按给定顺序取文章摘要：缓存中已有详情的文章一次 MGET 取回，其余的一次查询数据库"""
+    cache = get_cache()
+    keys = {article_id: cache_keys.article_key(article_id, cache) for article_id in ids}
+    details = cache.get_many(list(keys.values()))
+    summaries = {
+        article_id: {field: details[key][field] for field in SUMMARY_FIELDS}
+        for article_id, key in keys.items() if key in details
+    }
+    missing = [article_id for article_id in ids if article_id not in summaries]
+    if missing:
+        for article in Article.query.filter(Article.id.in_(missing)):
+            summaries[article.id] = {
+                "id": article.id,
+                "title": article.title,
+                "description": article.description,
+                "category_id": article.category_id,
+                "category": article.category.name if article.category else None,
+                "view_count": article.view_count,
+            }
+    return [summaries[article_id] for article_id in ids if article_id in summaries]
+
+
+def _category_summaries(ids):
+    categories = {category.id: category for category in BlogCategory.query.filter(BlogCategory.id.in_(ids))}
+    return [
+        {"id": category.id, "name": category.name, "parent_id": category.parent_id}
+        for category in (categories.get(category_id) for category_id in ids) if category is not None
+    ]
+
+
+def _with_stats(items, entity, ranked):
+    """补充热度、最近 24 小时阅读数和独立读者数"""
+    scores = dict(ranked)
+    stats = popularity.details(entity, [item["id"] for item in items])
+    for item in items:
+        item["score"] = round(scores[item["id"]], 2)
+        item.update(stats.get(item["id"], {}))
+    return items
+
+
+def build_ranking(kind, limit):
+    """
+    热度排行：文章和分类按 popular（长期）或 trending（近期）热度排序
+    Redis 不可用时按数据库中的累计浏览量
+    """
+    ranked_articles = popularity.top(kind, "article", limit)
+    ranked_categories = popularity.top(kind, "category", limit)
+    if ranked_articles is None or ranked_categories is None:
+        top_articles = Article.query.with_entities(Article.id).order_by(Article.view_count.desc(), Article.id).limit(limit)
+        category_views = dict(
+            db.session.query(Article.category_id, db.func.sum(Article.view_count))
+            .filter(Article.category_id.isnot(None))
+            .group_by(Article.category_id)
+            .order_by(db.func.sum(Article.view_count).desc())
+            .limit(limit)
+            .all()
+        )
+        categories = _category_summaries(list(category_views))
+        for category in categories:
+            category["views"] = category_views[category["id"]] or 0
+        return {
+            "kind": kind,
+            "source": "database",
+            "articles": _article_summaries([article_id for article_id, in top_articles]),
+            "categories": categories,
+        }
+    return {
+        "kind": kind,
+        "source": "redis",
+        "articles": _with_stats(_article_summaries([i for i, _ in ranked_articles]), "article", ranked_articles),
+        "categories": _with_stats(_category_summaries([i for i, _ in ranked_categories]), "category", ranked_categories),
+    }
+
+
+def _ranking_response(kind):
+    try:
+        limit = min(max(request.args.get("limit", 10, type=int), 1), 50)
+        cache = get_cache()
+        ttl = int(current_app.config.get("POPULARITY_CACHE_TTL", 60))
+        data, cached = cache.get_or_compute(
+            cache_keys.ranking_key(kind, limit, cache), lambda: build_ranking(kind, limit), ttl
+        )
+        return jsonify({"success": True, "data": data, "cached": cached})
+    except Exception as e:
+        logger.error(f"获取热度排行失败: {e}", exc_info=True)
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
+@blog_bp.route("/popular", methods=["GET"])
+def get_popular():
+    """长期热度排行（半衰期 POPULARITY_HALF_LIFE_HOURS）"""
+    return _ranking_response("popular")
+
+
+@blog_bp.route("/trending", methods=["GET"])
+def get_trending():
+    """近期热度排行（半衰期 TRENDING_HALF_LIFE_HOURS）"""
+    return _ranking_response("trending")
+
+
 # 缓存管理API
 @blog_bp.route("/cache/stats", methods=["GET"])
 def get_cache_stats():
@@ -428,11 +532,26 @@ def get_cache_stats():
     try:
         cache = get_cache()
         stats = cache.get_cache_stats()
+        stats["warmup"] = get_last_report()
+        stats["pending_views"] = pending_views()
         return jsonify({"success": True, "data": stats})
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
 
 
+@blog_bp.route("/cache/stats/reset", methods=["POST"])
+@admin_required
+def reset_cache_stats():
+    """清零各命名空间的缓存命中和耗时统计"""
+    try:
+        cache = get_cache()
+        if not cache.reset_metrics():
+            return jsonify({"success": False, "error": "清零缓存统计失败"}), 500
+        return jsonify({"success": True, "data": {"message": "缓存统计已清零"}})
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
 @blog_bp.route("/cache/clear", methods=["POST"])
 def clear_cache():
     """清理所有博客缓存"""
@@ -445,3 +564,14 @@ def clear_cache():
         })
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
+
+
+@blog_bp.route("/cache/warmup", methods=["POST"])
+@admin_required
+def warm_up_cache():
+    """立即预热缓存（分类树、热门文章详情、文章列表第一页）"""
+    try:
+        report = warm_up(current_app._get_current_object(), trigger="manual")
+        return jsonify({"success": report.get("success", False), "data": report})
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
@@ -1,16 +1,81 @@
 """
 Mermaid 图表渲染 API
-使用本地 mermaid-cli 进行渲染
+使用本地 mermaid-cli 进行渲染（常驻渲染进程池，见 render/mermaid_pool.py）
 """
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, Response
 from config.config import logger
+from render.engine import mermaid_block_id
+from render.blocks import LRUCache
+from render.mermaid_cache import get_mermaid_cache, mermaid_cache_key
+from render.mermaid_pool import render_svg, render_many, MermaidPoolBusyError
+import re
+import gzip
 import base64
-import subprocess
-import tempfile
-import os
 
 mermaid_bp = Blueprint("mermaid", __name__, url_prefix="/api/v1/mermaid")
 
+# 单次批量渲染的最大图表数
+MAX_BATCH_SIZE = 50
+CACHE_KEY_RE = re.compile(r"^[0-9a-f]{64}$")
+
+# 已压缩的 gzip 响应体 {缓存键: bytes}，热门图表不必每次重新压缩
+gzip_cache = LRUCache(256)
+
+
+def get_render_options(data):
+    """从请求中取渲染参数（参与缓存键计算）"""
+    options = {}
+    if data.get("theme"):
+        options["theme"] = str(data["theme"])
+    if data.get("backgroundColor"):
+        options["backgroundColor"] = str(data["backgroundColor"])
+    return options
+
+
+def get_response_format(data=None):
+    """响应格式：json（默认，base64 data URL）或 svg（直接返回 image/svg+xml）"""
+    value = request.args.get("format") or (data or {}).get("format") or "json"
+    return str(value).lower()
+
+
+def svg_data_url(svg_content):
+    """SVG 转为 base64 data URL"""
+    svg_base64 = base64.b64encode(svg_content.encode('utf-8')).decode('utf-8')
+    return f"data:image/svg+xml;base64,{svg_base64}"
+
+
+def svg_etags(cache_key):
+    """强 ETag：由图表哈希得出；gzip 与未压缩是不同的字节，各有一个 ETag"""
+    return cache_key, f"{cache_key}-gzip"
+
+
+def svg_not_modified(cache_key):
+    """If-None-Match 命中时返回 304 响应，否则返回 None（无需读取或渲染 SVG）"""
+    if not any(request.if_none_match.contains(etag) for etag in svg_etags(cache_key)):
+        return None
+    response = Response(status=304)
+    response.set_etag(svg_etags(cache_key)[1 if "gzip" in request.accept_encodings else 0])
+    response.vary.add("Accept-Encoding")
+    return response
+
+
+def svg_response(svg_content, cache_key):
+    """返回 image/svg+xml 响应，客户端支持时 gzip 压缩"""
+    identity_etag, gzip_etag = svg_etags(cache_key)
+    if "gzip" in request.accept_encodings:
+        body = gzip_cache.get(cache_key)
+        if body is None:
+            body = gzip.compress(svg_content.encode("utf-8"), 6)
+            gzip_cache.set(cache_key, body)
+        response = Response(body, mimetype="image/svg+xml")
+        response.headers["Content-Encoding"] = "gzip"
+        response.set_etag(gzip_etag)
+    else:
+        response = Response(svg_content, mimetype="image/svg+xml")
+        response.set_etag(identity_etag)
+    response.vary.add("Accept-Encoding")
+    return response
+
 
 @mermaid_bp.route("/render", methods=["POST"])
 def render_mermaid():
@@ -19,17 +84,26 @@ def render_mermaid():
     
     请求体:
     {
-        "code": "graph TD\n    A-->B"
+        "code": "graph TD\n    A-->B",
+        "theme": "default",            // 可选
+        "backgroundColor": "white"     // 可选
     }
     
     返回:
     {
         "success": true,
         "data": {
-            "imageUrl": "data:image/svg+xml;base64,..."
+            "imageUrl": "data:image/svg+xml;base64,...",
+            "cached": false
         }
     }
     
+    ?format=svg（或请求体 "format": "svg"）时直接返回压缩后的 image/svg+xml，
+    支持 gzip，带由图表哈希得出的强 ETag，If-None-Match 命中时返回 304 且不渲染。
+    
+    渲染结果按 (代码, 参数) 的哈希缓存在本地磁盘，相同图表不会重复调用 mermaid-cli。
+    渲染进程和等待队列都满时返回 503，并在 Retry-After 头中给出建议的重试秒数。
+    
     注意: 需要系统安装 mermaid-cli
     安装命令: npm install -g @mermaid-js/mermaid-cli
     """
@@ -42,58 +116,20 @@ def render_mermaid():
         if not code:
             return jsonify({"success": False, "error": "mermaid 代码为空"}), 400
         
-        # 使用本地 mermaid-cli 渲染
-        # 需要系统安装: npm install -g @mermaid-js/mermaid-cli
+        options = get_render_options(data)
+        response_format = get_response_format(data)
+        if response_format == "svg":
+            not_modified = svg_not_modified(mermaid_cache_key(code, options))
+            if not_modified is not None:
+                return not_modified
+        
         try:
-            # 创建临时文件
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.mmd', delete=False, encoding='utf-8') as f:
-                f.write(code)
-                temp_file = f.name
-            
-            output_file = None
-            try:
-                # 使用 mermaid-cli 渲染
-                output_file = temp_file.replace('.mmd', '.svg')
-                result = subprocess.run(
-                    ['mmdc', '-i', temp_file, '-o', output_file],
-                    capture_output=True,
-                    text=True,
-                    timeout=10
-                )
-                
-                if result.returncode == 0 and os.path.exists(output_file):
-                    # 读取 SVG 文件
-                    with open(output_file, 'r', encoding='utf-8') as f:
-                        svg_content = f.read()
-                    
-                    # 转为 base64
-                    svg_base64 = base64.b64encode(svg_content.encode('utf-8')).decode('utf-8')
-                    image_url = f"data:image/svg+xml;base64,{svg_base64}"
-                    
-                    logger.info("Mermaid 图表渲染成功")
-                    return jsonify({
-                        "success": True,
-                        "data": {
-                            "imageUrl": image_url,
-                            "source": "local_mermaid_cli"
-                        }
-                    })
-                else:
-                    error_msg = result.stderr if result.stderr else "渲染失败"
-                    logger.error(f"mermaid-cli 渲染失败: {error_msg}")
-                    raise Exception(f"mermaid-cli 渲染失败: {error_msg}")
-            finally:
-                # 确保清理临时文件
-                if os.path.exists(temp_file):
-                    try:
-                        os.unlink(temp_file)
-                    except Exception as e:
-                        logger.warning(f"清理临时文件失败: {e}")
-                if output_file and os.path.exists(output_file):
-                    try:
-                        os.unlink(output_file)
-                    except Exception as e:
-                        logger.warning(f"清理输出文件失败: {e}")
+            svg_content, cached = render_svg(code, options)
+        except MermaidPoolBusyError as e:
+            logger.warning(f"Mermaid 渲染繁忙，拒绝请求（Retry-After {e.retry_after}s）")
+            response = jsonify({"success": False, "error": str(e)})
+            response.headers["Retry-After"] = str(e.retry_after)
+            return response, 503
         except FileNotFoundError:
             error_msg = "mermaid-cli 未安装，请运行: npm install -g @mermaid-js/mermaid-cli"
             logger.error(error_msg)
@@ -109,7 +145,100 @@ def render_mermaid():
                 "error": error_msg
             }), 500
         
+        if not cached:
+            logger.info("Mermaid 图表渲染成功")
+        if response_format == "svg":
+            return svg_response(svg_content, mermaid_cache_key(code, options))
+        return jsonify({
+            "success": True,
+            "data": {
+                "imageUrl": svg_data_url(svg_content),
+                "source": "local_mermaid_cli",
+                "cached": cached
+            }
+        })
+        
     except Exception as e:
         logger.error(f"渲染 mermaid 图表时发生错误: {str(e)}", exc_info=True)
         return jsonify({"success": False, "error": str(e)}), 500
 
+
+@mermaid_bp.route("/render/batch", methods=["POST"])
+def render_mermaid_batch():
+    """
+    批量渲染 Mermaid 图表（并发渲染，一篇文章的所有图表一次请求）
+    
+    请求体:
+    {
+        "diagrams": ["graph TD\n    A-->B", ...],   // 或 [{"code": "..."}, ...]
+        "theme": "default",                        // 可选，作用于所有图表
+        "backgroundColor": "white",                // 可选
+        "format": "svg"                            // 可选，返回 SVG 文本（"svg" 字段）而不是 base64 的 imageUrl
+    }
+    
+    返回（键与文章 HTML 中 mermaid div 的 id 一致，即 "mermaid-" + md5(代码)[:8]）:
+    {
+        "success": true,
+        "data": {
+            "mermaid-1a2b3c4d": {"success": true, "imageUrl": "data:image/svg+xml;base64,...", "cached": true},
+            "mermaid-5e6f7a8b": {"success": false, "error": "..."}
+        }
+    }
+    """
+    try:
+        data = request.get_json()
+        if not data or not isinstance(data.get("diagrams"), list):
+            return jsonify({"success": False, "error": "缺少 diagrams 列表"}), 400
+        if len(data["diagrams"]) > MAX_BATCH_SIZE:
+            return jsonify({"success": False, "error": f"单次最多渲染 {MAX_BATCH_SIZE} 个图表"}), 400
+        
+        diagrams = {}
+        for item in data["diagrams"]:
+            code = item.get("code", "") if isinstance(item, dict) else item
+            code = (code or "").strip()
+            if code:
+                diagrams[mermaid_block_id(code)] = code
+        if not diagrams:
+            return jsonify({"success": False, "error": "mermaid 代码为空"}), 400
+        
+        raw_svg = get_response_format(data) == "svg"
+        results = {}
+        for block_id, result in render_many(diagrams, get_render_options(data)).items():
+            if "svg" in result:
+                results[block_id] = {"success": True, "cached": result["cached"]}
+                if raw_svg:
+                    results[block_id]["svg"] = result["svg"]
+                else:
+                    results[block_id]["imageUrl"] = svg_data_url(result["svg"])
+            else:
+                results[block_id] = {"success": False, "error": result["error"]}
+                if result.get("retry_after"):
+                    results[block_id]["retryAfter"] = result["retry_after"]
+        
+        failed = sum(1 for result in results.values() if not result["success"])
+        if failed:
+            logger.warning(f"Mermaid 批量渲染: {len(results)} 个图表中 {failed} 个失败")
+        return jsonify({"success": True, "data": results})
+        
+    except Exception as e:
+        logger.error(f"批量渲染 mermaid 图表时发生错误: {str(e)}", exc_info=True)
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
+@mermaid_bp.route("/svg/<cache_key>", methods=["GET"])
+def get_cached_svg(cache_key):
+    """
+    按缓存键获取已渲染的 SVG（文章保存时预渲染，get_article 返回的 mermaid_svgs 指向这里）
+    
+    内容按哈希寻址，永不变化，可长期缓存。
+    """
+    if not CACHE_KEY_RE.match(cache_key):
+        return jsonify({"success": False, "error": "无效的缓存键"}), 400
+    response = svg_not_modified(cache_key)
+    if response is None:
+        svg_content = get_mermaid_cache().get(cache_key)
+        if svg_content is None:
+            return jsonify({"success": False, "error": "图表未渲染"}), 404
+        response = svg_response(svg_content, cache_key)
+    response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+    return response
@@ -3,7 +3,8 @@
 """
 from flask import Blueprint, request, jsonify, current_app
 from model.database import db, Category, Question, Tag, QuestionFavorite
-from model.blog_cache import get_cache
+from model.blog_cache import get_cache, STATE_COMPUTED, STATE_STALE
+from model import cache_keys, response_cache
 from auth.auth_utils import login_required
 from config.config import logger
 import math
@@ -11,95 +12,103 @@ import math
 question_bank_bp = Blueprint("question_bank", __name__, url_prefix="/api/v1/question-bank")
 
 
+def build_category_tree():
+    """从数据库构建题库分类树（含每个分类的题目数，叶子分类附带题目列表）"""
+    # 从数据库获取
+    categories = Category.query.order_by(Category.order, Category.id).all()
+
+    if not categories:
+        logger.warning("数据库中没有分类数据")
+        return []
+
+    # 构建分类树
+    category_dict = {}
+    root_categories = []
+
+    # 第一遍：创建所有分类节点
+    for cat in categories:
+        cat_data = cat.to_dict()
+        cat_data['children'] = []
+        category_dict[cat.id] = cat_data
+
+    # 第二遍：建立父子关系
+    for cat in categories:
+        cat_data = category_dict[cat.id]
+        if cat.parent_id is None:
+            root_categories.append(cat_data)
+        else:
+            if cat.parent_id in category_dict:
+                category_dict[cat.parent_id]['children'].append(cat_data)
+            else:
+                logger.warning(f"分类 {cat.id} 的父分类 {cat.parent_id} 不存在")
+
+    # 计算每个分类的题目总数（包括子分类），并添加题目列表
+    def count_questions(cat_data, cat_id):
+        # 获取该分类下的题目
+        questions = Question.query.filter_by(category_id=cat_id).all()
+        current_count = len(questions)
+
+        # 如果是叶子分类（没有子分类），添加题目列表作为 items
+        if not cat_data.get('children') or len(cat_data['children']) == 0:
+            cat_data['items'] = [
+                {
+                    'id': q.id,
+                    'title': q.title,
+                    'type': q.type,
+                    'difficulty': q.difficulty
+                }
+                for q in questions
+            ]
+
+        # 递归处理子分类，累加子分类的题目数
+        total_count = current_count
+        for child in cat_data.get('children', []):
+            child_cat = Category.query.get(child['id'])
+            if child_cat:
+                total_count += count_questions(child, child_cat.id)
+
+        # question_count 是当前分类的题目数
+        cat_data['question_count'] = current_count
+        # total_question_count 是包括子分类的总数
+        cat_data['total_question_count'] = total_count
+        return total_count
+
+    for cat_data in root_categories:
+        root_cat = Category.query.get(cat_data['id'])
+        if root_cat:
+            count_questions(cat_data, root_cat.id)
+
+    return root_categories
+
+
 @question_bank_bp.route("/categories", methods=["GET"])
 def get_categories():
     """获取题库分类列表"""
     try:
         cache = get_cache()
-        cache_key = f"question_bank:categories"
+        cache_key = cache_keys.question_bank_categories_key(cache)
+        resp_key = response_cache.response_key("question_bank", cache)
         
         # 检查是否需要清除缓存（可以通过查询参数控制）
         clear_cache = request.args.get("clear_cache", "false").lower() == "true"
         if clear_cache:
-            cache.delete(cache_key)
+            cache.delete_many([cache_key, resp_key])
             logger.info("已清除分类缓存")
-        
-        cached_data = cache.get(cache_key)
-        
-        if cached_data and not clear_cache:
-            logger.info("从缓存获取分类列表")
-            return jsonify({"success": True, "data": cached_data, "cached": True})
-        
-        # 从数据库获取
-        categories = Category.query.order_by(Category.order, Category.id).all()
-        
-        if not categories:
-            logger.warning("数据库中没有分类数据")
-            return jsonify({"success": True, "data": [], "cached": False})
-        
-        # 构建分类树
-        category_dict = {}
-        root_categories = []
-        
-        # 第一遍：创建所有分类节点
-        for cat in categories:
-            cat_data = cat.to_dict()
-            cat_data['children'] = []
-            category_dict[cat.id] = cat_data
-        
-        # 第二遍：建立父子关系
-        for cat in categories:
-            cat_data = category_dict[cat.id]
-            if cat.parent_id is None:
-                root_categories.append(cat_data)
-            else:
-                if cat.parent_id in category_dict:
-                    category_dict[cat.parent_id]['children'].append(cat_data)
-                else:
-                    logger.warning(f"分类 {cat.id} 的父分类 {cat.parent_id} 不存在")
-        
-        # 计算每个分类的题目总数（包括子分类），并添加题目列表
-        def count_questions(cat_data, cat_id):
-            # 获取该分类下的题目
-            questions = Question.query.filter_by(category_id=cat_id).all()
-            current_count = len(questions)
-            
-            # 如果是叶子分类（没有子分类），添加题目列表作为 items
-            if not cat_data.get('children') or len(cat_data['children']) == 0:
-                cat_data['items'] = [
-                    {
-                        'id': q.id,
-                        'title': q.title,
-                        'type': q.type,
-                        'difficulty': q.difficulty
-                    }
-                    for q in questions
-                ]
-            
-            # 递归处理子分类，累加子分类的题目数
-            total_count = current_count
-            for child in cat_data.get('children', []):
-                child_cat = Category.query.get(child['id'])
-                if child_cat:
-                    total_count += count_questions(child, child_cat.id)
-            
-            # question_count 是当前分类的题目数
-            cat_data['question_count'] = current_count
-            # total_question_count 是包括子分类的总数
-            cat_data['total_question_count'] = total_count
-            return total_count
-        
-        for cat_data in root_categories:
-            root_cat = Category.query.get(cat_data['id'])
-            if root_cat:
-                count_questions(cat_data, root_cat.id)
-        
-        result = root_categories
-        
-        # 缓存5分钟
-        cache.set(cache_key, result, 300)
-        
-        return jsonify({"success": True, "data": result, "cached": False})
+        else:
+            # 响应缓存命中：直接返回编码好的字节
+            response = response_cache.get_response(resp_key, cache)
+            if response is not None:
+                return response
+        
+        # 未命中时只有一个请求重建分类树，其余请求等待它的结果或拿旧值
+        result, state = cache.get_or_compute_state(cache_key, build_category_tree, 300)
+        if state != STATE_COMPUTED:
+            logger.debug("从缓存获取分类列表")
+
+        return response_cache.cached_json(
+            resp_key, {"success": True, "data": result, "cached": state != STATE_COMPUTED}, 300,
+            cache=cache, stale=state == STATE_STALE,
+        )
     except Exception as e:
         logger.error(f"获取分类列表失败: {e}", exc_info=True)
         return jsonify({"success": False, "error": str(e)}), 500
@@ -0,0 +1,141 @@
+"""
+缓存编码基准
+对每种编码（json / orjson / msgpack，各自压缩与不压缩）把同一批文章详情写入 Redis，
+报告单条大小、Redis 实际占用（MEMORY USAGE 之和）、编码/解码耗时和 SET/GET 往返耗时。
+未安装的编码自动跳过；基准使用独立的键前缀，结束后删除。
+
+用法（在 backend 目录下）:
+    python scripts/bench_cache_codec.py --top 20 --repeat 50
+    python scripts/bench_cache_codec.py --redis-url redis://localhost:6379/0
+"""
+import os
+import sys
+import time
+import sqlite3
+import argparse
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import redis  # noqa: E402
+from model.cache_codec import CacheSerializer, available_codecs  # noqa: E402
+
+DEFAULT_DB = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "ds_blog.db")
+KEY_PREFIX = "bench:codec:"
+
+
+def sample_detail(i):
+    """数据库不可用时使用的合成文章详情（结构与 /api/v1/blog/articles/<id> 的缓存值一致）"""
+    content = "\n".join(
+        f"## 第{n}节 标题\n\n这是一段正文，包含`行内代码`和[链接](/blog/article/{n})。\n\n"
+        "```java\npublic class Demo {\n    public static void main(String[] args) {}\n}\n```\n"
+        for n in range(60)
+    )
+    html = content.replace("## ", "<h2>").replace("\n\n", "</p><p>")
+    headings = [{"level": 2, "title": f"第{n}节 标题", "anchor": f"section-{n}", "line": n} for n in range(60)]
+    return {
+        "id": i, "title": f"合成文章 {i}", "description": "描述", "tags": ["java", "并发"],
+        "category_id": 1, "category": "Java", "createdAt": "2024-01-01T00:00:00", "updatedAt": None,
+        "content": content, "html_content": html, "headings": headings, "toc": headings,
+        "mermaid_svgs": {}, "reading_time": 5, "word_count": len(content), "view_count": 100,
+        "related_questions": [],
+    }
+
+
+def load_details(db_path, top):
+    if not os.path.exists(db_path):
+        return []
+    conn = sqlite3.connect(db_path)
+    try:
+        rows = conn.execute(
+            "SELECT id, title, description, content, html_content, headings, reading_time, word_count, view_count "
+            "FROM articles WHERE content IS NOT NULL ORDER BY length(content) DESC LIMIT ?",
+            (top,),
+        ).fetchall()
+    finally:
+        conn.close()
+    details = []
+    for article_id, title, description, content, html, headings, reading_time, word_count, views in rows:
+        details.append({
+            "id": article_id, "title": title, "description": description, "tags": [],
+            "content": content, "html_content": html, "headings": headings,
+            "reading_time": reading_time, "word_count": word_count, "view_count": views,
+            "related_questions": [],
+        })
+    return details
+
+
+def median_ms(timings):
+    return statistics.median(timings) * 1000
+
+
+def bench_codec(client, serializer, details, repeat):
+    encoded = [serializer.dumps(detail) for detail in details]
+    keys = [f"{KEY_PREFIX}{i}" for i in range(len(details))]
+
+    encode_timings, decode_timings, set_timings, get_timings = [], [], [], []
+    for _ in range(repeat):
+        for detail, data, key in zip(details, encoded, keys):
+            start = time.perf_counter()
+            serializer.dumps(detail)
+            encode_timings.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            serializer.loads(data)
+            decode_timings.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            client.set(key, data, ex=600)
+            set_timings.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            client.get(key)
+            get_timings.append(time.perf_counter() - start)
+
+    memory = sum(client.memory_usage(key) or 0 for key in keys)
+    client.delete(*keys)
+    return {
+        "bytes": sum(len(data) for data in encoded) / len(encoded),
+        "memory": memory,
+        "encode": median_ms(encode_timings),
+        "decode": median_ms(decode_timings),
+        "set": median_ms(set_timings),
+        "get": median_ms(get_timings),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="缓存编码基准")
+    parser.add_argument("--db", default=DEFAULT_DB, help="SQLite 数据库路径")
+    parser.add_argument("--top", type=int, default=20, help="取内容最长的前 N 篇文章")
+    parser.add_argument("--repeat", type=int, default=20, help="每篇文章重复次数")
+    parser.add_argument("--redis-url", default=os.environ.get("REDIS_URL", "redis://localhost:6379/0"))
+    parser.add_argument("--threshold", type=int, default=4096, help="压缩阈值（字节）")
+    args = parser.parse_args()
+
+    details = load_details(args.db, args.top)
+    if not details:
+        print(f"未找到数据库 {args.db}，使用合成文章")
+        details = [sample_detail(i) for i in range(args.top)]
+
+    client = redis.Redis.from_url(args.redis_url)
+    client.ping()
+
+    print(f"{len(details)} 篇文章，每篇重复 {args.repeat} 次，压缩阈值 {args.threshold} 字节")
+    print(f"{'编码':<16} {'单条(B)':>10} {'Redis占用(KB)':>14} {'编码(ms)':>10} {'解码(ms)':>10} "
+          f"{'SET(ms)':>9} {'GET(ms)':>9}")
+    baseline = None
+    for name in available_codecs():
+        for threshold in (0, args.threshold):
+            serializer = CacheSerializer(codec=name, compress_threshold=threshold)
+            result = bench_codec(client, serializer, details, args.repeat)
+            label = f"{name}+zlib" if threshold else name
+            baseline = baseline or result
+            ratio = f"   占用为 json 的 {result['memory'] / baseline['memory']:.0%}" if baseline["memory"] else ""
+            print(f"{label:<16} {result['bytes']:>10.0f} {result['memory'] / 1024:>14.1f} "
+                  f"{result['encode']:>10.3f} {result['decode']:>10.3f} {result['set']:>9.3f} {result['get']:>9.3f}"
+                  f"{ratio}")
+
+
+if __name__ == "__main__":
+    main()
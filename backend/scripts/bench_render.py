@@ -0,0 +1,165 @@
+"""
+Markdown 渲染微基准
+对比原 convert_markdown_to_html（每次新建 Markdown 实例、运行时编译正则）与 render.engine.render，
+engine 分别测冷缓存（清空块缓存和高亮缓存）和改动一个字符后的增量渲染
+
+用法（在 backend 目录下）:
+    python scripts/bench_render.py --top 5 --repeat 20
+"""
+import os
+import re
+import sys
+import time
+import sqlite3
+import hashlib
+import argparse
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import markdown  # noqa: E402
+from render import engine, blocks  # noqa: E402
+
+DEFAULT_DB = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "ds_blog.db")
+
+
+def legacy_convert(content):
+    """重构前 routes/blog.convert_markdown_to_html 的实现 + extract_headings_from_html"""
+
+    def replace_mermaid(match):
+        mermaid_code = match.group(1).strip()
+        mermaid_id = hashlib.md5(mermaid_code.encode()).hexdigest()[:8]
+        return f'<div class="mermaid" id="mermaid-{mermaid_id}">\n{mermaid_code}\n</div>'
+
+    content = re.sub(r"```mermaid\s*\n(.*?)```", replace_mermaid, content, flags=re.DOTALL)
+    md = markdown.Markdown(
+        extensions=["toc", "codehilite", "tables", "fenced_code", "attr_list"],
+        extension_configs={"toc": {"permalink": True, "permalink_title": "永久链接"}},
+    )
+    html_content = md.convert(content)
+
+    def replace_link_href(match):
+        a_tag = match.group(0)
+        href_match = re.search(r'href="([^"]*)"', a_tag)
+        if href_match:
+            href = href_match.group(1)
+            if href.startswith('/blog/article/') or href.startswith('article/'):
+                article_id = href.split('/')[-1]
+                return a_tag.replace(
+                    f'href="{href}"',
+                    f'href="#" data-article-id="{article_id}" class="internal-article-link"'
+                )
+        return a_tag
+
+    html_content = re.sub(r"<a[^>]*>", replace_link_href, html_content)
+
+    headings = []
+    for match in re.findall(r'<h([1-6])[^>]*id="([^"]*)"[^>]*>(.*?)</h[1-6]>', html_content, re.DOTALL):
+        headings.append({
+            "level": int(match[0]),
+            "title": re.sub(r"<a[^>]*>.*?</a>", "", match[2]).strip(),
+            "anchor": match[1],
+            "line": 0
+        })
+    return html_content, headings
+
+
+def sample_article():
+    """数据库不可用时使用的合成文章"""
+    parts = []
+    for i in range(40):
+        parts.append(f"## 第{i}节 标题\n\n这是一段正文，包含[内部链接](/blog/article/{i})和`行内代码`。\n")
+        parts.append("```java\npublic class Demo {\n    public static void main(String[] args) {\n"
+                     "        System.out.println(\"hello\");\n    }\n}\n```\n")
+        parts.append("| 列A | 列B |\n| --- | --- |\n| 1 | 2 |\n")
+        if i % 10 == 0:
+            parts.append(f"```mermaid\ngraph TD\n    A{i}-->B{i}\n```\n")
+    return "\n".join(parts)
+
+
+def load_largest_articles(db_path, top):
+    if not os.path.exists(db_path):
+        return []
+    conn = sqlite3.connect(db_path)
+    try:
+        rows = conn.execute(
+            "SELECT id, title, content FROM articles WHERE content IS NOT NULL "
+            "ORDER BY length(content) DESC LIMIT ?",
+            (top,),
+        ).fetchall()
+    finally:
+        conn.close()
+    return rows
+
+
+def bench(func, content, repeat, setup=None):
+    timings = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        func(content)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+def clear_render_caches():
+    blocks.block_cache.clear()
+    blocks.highlight_cache.clear()
+
+
+def edit_one_char(content, n):
+    """在文章中间的一个普通段落里改一个字，n 不同得到的内容不同"""
+    middle = len(content) // 2
+    index = content.find("\n\n", middle)
+    index = index + 2 if index != -1 else middle
+    return content[:index] + chr(0x4e00 + n) + content[index:]
+
+
+def normalize(html):
+    """忽略块之间的空白行差异"""
+    return re.sub(r"\n+", "\n", html)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Markdown 渲染微基准")
+    parser.add_argument("--db", default=DEFAULT_DB, help="SQLite 数据库路径")
+    parser.add_argument("--top", type=int, default=5, help="取内容最长的前 N 篇文章")
+    parser.add_argument("--repeat", type=int, default=20, help="每篇文章重复次数")
+    args = parser.parse_args()
+
+    articles = load_largest_articles(args.db, args.top)
+    if not articles:
+        print(f"未找到数据库 {args.db}，使用合成文章")
+        articles = [(0, "synthetic", sample_article())]
+
+    # 预热，排除首次导入 pygments lexer 的开销
+    legacy_convert(articles[0][2])
+    engine.render(articles[0][2])
+
+    print(f"{'id':>6} {'字数':>8} {'legacy(ms)':>12} {'cold(ms)':>10} {'edit(ms)':>10} {'cold加速':>8} {'edit加速':>8}")
+    for article_id, title, content in articles:
+        legacy_html, legacy_headings = legacy_convert(content)
+        result = engine.render(content)
+        outline = [(h["level"], h["anchor"]) for h in result.headings]
+        legacy_outline = [(h["level"], h["anchor"]) for h in legacy_headings]
+        if normalize(legacy_html) != normalize(result.html) or legacy_outline != outline:
+            print(f"警告: 文章 {article_id} 渲染结果不一致")
+
+        legacy_ms = bench(legacy_convert, content, args.repeat)
+        cold_ms = bench(engine.render, content, args.repeat, setup=clear_render_caches)
+        # 每次改动都不同，保证被改的块确实未命中缓存
+        engine.render(content)
+        edit_timings = []
+        for n in range(args.repeat):
+            edited = edit_one_char(content, n)
+            start = time.perf_counter()
+            engine.render(edited)
+            edit_timings.append(time.perf_counter() - start)
+        edit_ms = statistics.median(edit_timings) * 1000
+        print(f"{article_id:>6} {len(content):>8} {legacy_ms:>12.2f} {cold_ms:>10.2f} {edit_ms:>10.2f} "
+              f"{legacy_ms / cold_ms:>7.2f}x {legacy_ms / edit_ms:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -62,6 +62,11 @@ CREATE TABLE "articles"
     author      TEXT,
     cover       TEXT,
     is_top      INTEGER DEFAULT 0,
+    html_content TEXT,
+    headings     TEXT,
+    content_hash VARCHAR(32),
+    word_count   INTEGER DEFAULT 0,
+    reading_time INTEGER DEFAULT 0,
     FOREIGN KEY (category_id) REFERENCES blog_categories (id) ON DELETE SET NULL
 );
 
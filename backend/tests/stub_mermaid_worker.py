@@ -0,0 +1,31 @@
+"""
+测试用的渲染进程：与 render/mermaid_worker.mjs 相同的 stdin/stdout 协议，不需要 node 和 Chromium
+代码为 "crash" 时直接退出，"sleep 秒数" 时先等待再返回
+"""
+import sys
+import json
+import time
+
+
+def send(message):
+    sys.stdout.write(json.dumps(message) + "\n")
+    sys.stdout.flush()
+
+
+def main():
+    send({"ready": True})
+    for line in sys.stdin:
+        job = json.loads(line)
+        if job["type"] == "ping":
+            send({"id": job["id"], "ok": True})
+            continue
+        code = job["code"]
+        if code == "crash":
+            sys.exit(1)
+        if code.startswith("sleep "):
+            time.sleep(float(code.split()[1]))
+        send({"id": job["id"], "ok": True, "svg": f"<svg><text>{code}</text></svg>"})
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""Mermaid 渲染进程池：崩溃/超时后重启，队列满时接口返回 503 + Retry-After"""
+import os
+import sys
+import threading
+import time
+
+import pytest
+from flask import Flask
+
+from render import mermaid_cache, mermaid_pool
+from render.mermaid_cache import MermaidSvgCache
+from render.mermaid_pool import MermaidPoolBusyError, MermaidRenderError, MermaidRendererPool
+from routes.mermaid import mermaid_bp
+
+STUB_WORKER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "stub_mermaid_worker.py")
+
+
+def make_pool(**kwargs):
+    options = dict(size=1, queue_size=0, job_timeout=5, start_timeout=10, health_interval=0)
+    options.update(kwargs)
+    return MermaidRendererPool(command=[sys.executable, STUB_WORKER], **options)
+
+
+@pytest.fixture
+def pool():
+    pool = make_pool()
+    yield pool
+    pool.shutdown()
+
+
+def worker_pids(pool):
+    return [worker["pid"] for worker in pool.stats()["workers"]]
+
+
+def wait_until_busy(pool):
+    """等到唯一的渲染进程被占用"""
+    deadline = time.monotonic() + 10
+    while pool.stats()["idle"] and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def test_render_reuses_worker(pool):
+    assert pool.render("graph TD") == "<svg><text>graph TD</text></svg>"
+    pids = worker_pids(pool)
+    pool.render("graph LR")
+    assert worker_pids(pool) == pids
+    assert pool.stats()["workers"][0]["jobs"] == 2
+
+
+def test_crashed_worker_is_restarted(pool):
+    pool.render("graph TD")
+    [crashed_pid] = worker_pids(pool)
+
+    with pytest.raises(MermaidRenderError):
+        pool.render("crash")
+    assert pool.stats()["restarts"] == 1
+    assert worker_pids(pool) == []
+
+    assert pool.render("graph LR") == "<svg><text>graph LR</text></svg>"
+    [pid] = worker_pids(pool)
+    assert pid != crashed_pid
+
+
+def test_timed_out_worker_is_restarted():
+    pool = make_pool(job_timeout=0.5)
+    try:
+        with pytest.raises(MermaidRenderError):
+            pool.render("sleep 5")
+        stats = pool.stats()
+        assert stats["timeouts"] == 1
+        assert stats["restarts"] == 1
+        assert pool.render("graph TD") == "<svg><text>graph TD</text></svg>"
+    finally:
+        pool.shutdown()
+
+
+def test_full_pool_rejects_with_retry_after(pool):
+    busy = threading.Thread(target=pool.render, args=("sleep 1",))
+    busy.start()
+    try:
+        wait_until_busy(pool)
+        with pytest.raises(MermaidPoolBusyError) as excinfo:
+            pool.render("graph TD")
+        assert excinfo.value.retry_after == pool._retry_after()
+        assert pool.stats()["rejected"] == 1
+    finally:
+        busy.join()
+
+
+@pytest.fixture
+def client(pool, tmp_path, monkeypatch):
+    monkeypatch.setattr(mermaid_pool, "_pool", pool)
+    monkeypatch.setattr(mermaid_cache, "_cache", MermaidSvgCache(str(tmp_path)))
+    app = Flask(__name__)
+    app.register_blueprint(mermaid_bp)
+    return app.test_client()
+
+
+def test_render_endpoint_returns_503_when_busy(pool, client):
+    busy = threading.Thread(target=pool.render, args=("sleep 1",))
+    busy.start()
+    try:
+        wait_until_busy(pool)
+        response = client.post("/api/v1/mermaid/render", json={"code": "graph TD\n    A-->B"})
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == str(pool._retry_after())
+        assert response.get_json()["success"] is False
+    finally:
+        busy.join()
+
+    response = client.post("/api/v1/mermaid/render", json={"code": "graph TD\n    A-->B"})
+    assert response.status_code == 200
+    assert response.get_json()["data"]["cached"] is False